@@ -356,12 +356,22 @@ class DeviceApi(Api):
         })
 
     def get_skill_settings(self):
-        """Get the remote skill settings for all skills on this device."""
+        """Get the remote skill settings for all skills on this device.
+
+        Repeated downloads send the ETag of the previous download, the
+        backend only sends the settings again if they have changed.
+        """
         return self.request({
             "method": "GET",
             "path": "/" + UUID + "/skill/settings",
         })
 
+    @property
+    def skill_settings_etag(self):
+        """ETag of the last downloaded skill settings, None if unknown."""
+        path = self.path + "/" + self.identity.uuid + "/skill/settings"
+        return self.params_to_etag.get((path, frozenset()))
+
     def upload_skill_metadata(self, settings_meta):
         """Upload skill metadata.
 
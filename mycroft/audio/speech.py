@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+from inspect import signature
 import re
 import time
 from threading import Lock
@@ -24,12 +25,18 @@ from mycroft.util.log import LOG
 from mycroft.messagebus.message import Message
 from mycroft.tts.remote_tts import RemoteTTSException
 from mycroft.tts.mimic_tts import Mimic
+from mycroft.tts.speech_queue import SpeechPriority
 
 bus = None  # Mycroft messagebus connection
 config = None
 tts = None
 tts_hash = None
-lock = Lock()
+# Utterances are serialized per priority class, the playback queue orders
+# the audio of the different classes.
+locks = {priority: Lock() for priority in SpeechPriority}
+tts_lock = Lock()
+# TTS engines aren't thread safe, only one chunk is synthesized at a time
+execute_lock = Lock()
 mimic_fallback_obj = None
 
 _last_stop_signal = 0
@@ -38,7 +45,9 @@ _last_stop_signal = 0
 def handle_speak(event):
     """Handle "speak" message
 
-    Parse sentences and invoke text to speech service.
+    Parse sentences and invoke text to speech service. The optional
+    "priority" field of the message ("high", "normal" or "low") selects the
+    priority class of the speech.
     """
     config = Configuration.get()
     Configuration.set_config_update_handlers(bus)
@@ -58,8 +67,9 @@ def handle_speak(event):
     else:
         ident = 'unknown'
 
+    priority = SpeechPriority.from_value(event.data.get('priority'))
     start = time.time()  # Time of speech request
-    with lock:
+    with locks[priority]:
         stopwatch = Stopwatch()
         stopwatch.start()
         utterance = event.data['utterance']
@@ -86,43 +96,51 @@ def handle_speak(event):
                     tts.playback.clear()
                     break
                 try:
-                    mute_and_speak(chunk, ident, listen)
+                    mute_and_speak(chunk, ident, listen, priority)
                 except KeyboardInterrupt:
                     raise
                 except Exception:
                     LOG.error('Error in mute_and_speak', exc_info=True)
         else:
-            mute_and_speak(utterance, ident, listen)
+            mute_and_speak(utterance, ident, listen, priority)
 
         stopwatch.stop()
-    report_timing(ident, 'speech', stopwatch, {'utterance': utterance,
-                                               'tts': tts.__class__.__name__})
+    report_timing(ident, 'speech', stopwatch,
+                  {'utterance': utterance,
+                   'tts': tts.__class__.__name__,
+                   'priority': priority.name.lower()})
 
 
-def mute_and_speak(utterance, ident, listen=False):
+def mute_and_speak(utterance, ident, listen=False,
+                   priority=SpeechPriority.NORMAL):
     """Mute mic and start speaking the utterance using selected tts backend.
 
     Args:
         utterance:  The sentence to be spoken
         ident:      Ident tying the utterance to the source query
+        listen:     True if listening should be triggered afterwards
+        priority:   SpeechPriority class of the utterance
     """
     global tts_hash
-    # update TTS object if configuration has changed
-    if tts_hash != hash(str(config.get('tts', ''))):
-        global tts
-        # Create new tts instance
-        if tts:
-            tts.playback.detach_tts(tts)
-        tts = TTSFactory.create()
-        tts.init(bus)
-        tts_hash = hash(str(config.get('tts', '')))
+    global tts
+    with tts_lock:
+        # update TTS object if configuration has changed
+        if tts_hash != hash(str(config.get('tts', ''))):
+            # Create new tts instance
+            if tts:
+                tts.playback.detach_tts(tts)
+                tts.shutdown()
+            tts = TTSFactory.create()
+            tts.init(bus)
+            tts_hash = hash(str(config.get('tts', '')))
+        current_tts = tts
 
     LOG.info("Speak: " + utterance)
     try:
-        tts.execute(utterance, ident, listen)
+        tts_execute(current_tts, utterance, ident, listen, priority)
     except RemoteTTSException as e:
         LOG.error(e)
-        mimic_fallback_tts(utterance, ident, listen)
+        mimic_fallback_tts(utterance, ident, listen, priority)
     except Exception:
         LOG.exception('TTS execution failed.')
 
@@ -142,17 +160,52 @@ def _get_mimic_fallback():
     return mimic_fallback_obj
 
 
-def mimic_fallback_tts(utterance, ident, listen):
+def mimic_fallback_tts(utterance, ident, listen,
+                       priority=SpeechPriority.NORMAL):
     """Speak utterance using fallback TTS if connection is lost.
 
     Args:
         utterance (str): sentence to speak
         ident (str): interaction id for metrics
         listen (bool): True if interaction should end with mycroft listening
+        priority (SpeechPriority): priority class of the utterance
     """
-    tts = _get_mimic_fallback()
+    with tts_lock:
+        tts = _get_mimic_fallback()
     LOG.debug("Mimic fallback, utterance : " + str(utterance))
-    tts.execute(utterance, ident, listen)
+    tts_execute(tts, utterance, ident, listen, priority)
+
+
+def _accepts_priority(execute):
+    """Check if a TTS execute method takes the priority argument."""
+    try:
+        signature(execute).bind('', None, False, SpeechPriority.NORMAL)
+    except TypeError:
+        return False
+    except ValueError:  # No signature available, assume it's current
+        pass
+    return True
+
+
+def tts_execute(engine, utterance, ident, listen, priority):
+    """Let a TTS engine speak an utterance.
+
+    TTS plugins may override execute() without the priority argument added
+    in later versions, those are called without it and their speech is
+    played with normal priority.
+
+    Args:
+        engine (TTS): engine to speak the utterance
+        utterance (str): sentence to speak
+        ident (str): interaction id for metrics
+        listen (bool): True if interaction should end with mycroft listening
+        priority (SpeechPriority): priority class of the utterance
+    """
+    with execute_lock:
+        if _accepts_priority(engine.execute):
+            engine.execute(utterance, ident, listen, priority)
+        else:
+            engine.execute(utterance, ident, listen)
 
 
 def handle_stop(event):
@@ -199,6 +252,8 @@ def shutdown():
     if tts:
         tts.playback.stop()
         tts.playback.join()
+        tts.shutdown()
     if mimic_fallback_obj:
         mimic_fallback_obj.playback.stop()
         mimic_fallback_obj.playback.join()
+        mimic_fallback_obj.shutdown()
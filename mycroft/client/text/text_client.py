@@ -914,7 +914,7 @@ help_struct = [('Log Scrolling shortcuts',
                      "control logging of messagebus messages")]),
                ("Skill Debugging Commands",
                 [(":skills",
-                  "list installed Skills"),
+                  "list installed Skills and their load times"),
                  (":api SKILL",
                     "show Skill's public API"),
                     (":activate SKILL",
@@ -1020,8 +1020,12 @@ def show_next_help():
 ##############################################################################
 # Skill debugging
 
-def show_skills(skills):
-    """Show list of loaded Skills in as many column as necessary."""
+def show_skills(skills, load_report=None):
+    """Show list of loaded Skills in as many column as necessary.
+
+    If the load time profiles of the Skills are available a table with the
+    time spent loading each Skill is shown instead, slowest first.
+    """
     global scr
     global screen_mode
 
@@ -1029,6 +1033,9 @@ def show_skills(skills):
         return
 
     screen_mode = SCR_SKILLS
+    if load_report:
+        show_skill_load_report(skills, load_report)
+        return
 
     row = 2
     column = 0
@@ -1077,6 +1084,55 @@ def show_skills(skills):
     scr.refresh()
 
 
+def show_skill_load_report(skills, load_report):
+    """Show table of the time spent loading each Skill."""
+    global scr
+
+    columns = [('import', 'import'), ('create', 'create'),
+               ('data_files', 'data'), ('initialize', 'init'),
+               ('settings', 'settings'), ('total', 'total')]
+    # Shorten the Skill names if needed to fit the timings on screen
+    name_width = max(len(entry['id']) for entry in load_report)
+    name_width = min(name_width,
+                     max(10, curses.COLS - 3 - 9 * len(columns) - 15))
+    header = "  {}".format("Skill".ljust(name_width))
+    for _, title in columns:
+        header += "{:>9}".format(title)
+    header += "{:>8}{:>7}".format("intents", "vocab")
+
+    def prepare_page():
+        scr.erase()
+        scr.addstr(0, 0, center(25) + "Skill Load Times (seconds)",
+                   CLR_CMDLINE)
+        scr.addstr(1, 1, "=" * (curses.COLS - 2), CLR_CMDLINE)
+        scr.addstr(2, 0, header[:curses.COLS - 1], CLR_HEADING)
+        return 3
+
+    row = prepare_page()
+    for entry in load_report:
+        skill = skills.get(entry['id'], {})
+        if skill.get('active'):
+            color = curses.color_pair(4)
+        else:
+            color = curses.color_pair(2)
+        line = "  {}".format(entry['id'][:name_width].ljust(name_width))
+        for key, _ in columns:
+            line += "{:>9.2f}".format(entry[key])
+        line += "{:>8}{:>7}".format(entry['intents'], entry['vocab'])
+        scr.addstr(row, 0, line[:curses.COLS - 1], color)
+        row += 1
+        if row == curses.LINES - 2 and entry != load_report[-1]:
+            scr.addstr(curses.LINES - 1, 0,
+                       center(23) + "Press any key to continue", CLR_HEADING)
+            scr.refresh()
+            wait_for_any_key()
+            row = prepare_page()
+
+    scr.addstr(curses.LINES - 1, 0, center(23) + "Press any key to return",
+               CLR_HEADING)
+    scr.refresh()
+
+
 def show_skill_api(skill, data):
     """Show available help on Skill's API."""
     global scr
@@ -1252,9 +1308,11 @@ def handle_cmd(cmd):
         # List loaded skill
         message = bus.wait_for_response(
             Message('skillmanager.list'), reply_type='mycroft.skills.list')
+        report = bus.wait_for_response(Message('skillmanager.load.report'))
 
         if message:
-            show_skills(message.data)
+            load_report = report.data['skills'] if report else None
+            show_skills(message.data, load_report)
             wait_for_any_key()
 
             screen_mode = SCR_MAIN
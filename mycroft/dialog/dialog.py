@@ -19,20 +19,57 @@ with custom data.
 import random
 import os
 import re
+import string
+from collections import deque
 from pathlib import Path
 from os.path import join
+from threading import Lock
+from time import monotonic
 
 from mycroft.util import resolve_resource_file
 from mycroft.util.format import expand_options
 from mycroft.util.log import LOG
 
+# Seconds before get() checks a cached dialog file for changes again
+DIALOG_CHECK_INTERVAL = 10
+
+# Mustache placeholder, "{{ key }}" is converted to python's "{key}"
+MUSTACHE_PLACEHOLDER = re.compile(r'\{\{+\s*(.*?)\s*\}\}+')
+
+
+class _CompiledTemplate:
+    """Template line expanded into all its options.
+
+    Options with placeholders are filled in using str.format when rendered,
+    options without are formatted once up front.
+
+    Args:
+        template_text (str): template in python format string syntax
+    """
+    def __init__(self, template_text):
+        self.options = []
+        for option in expand_options(template_text):
+            try:
+                if not any(field is not None for _, field, _, _
+                           in string.Formatter().parse(option)):
+                    self.options.append((option.format(), False))
+                    continue
+            except ValueError:
+                pass  # Malformed, fails the same way when rendered
+            self.options.append((option, True))
+
+    def render(self, context):
+        option, has_fields = random.choice(self.options)
+        return option.format(**context) if has_fields else option
+
 
 class MustacheDialogRenderer:
     """A dialog template renderer based on the mustache templating language."""
 
     def __init__(self):
         self.templates = {}
-        self.recent_phrases = []
+        self._compiled = {}  # template name -> list of _CompiledTemplate
+        self._recent = {}  # template name -> recently used template indexes
 
         # TODO magic numbers are bad!
         self.max_recent_phrases = 3
@@ -66,10 +103,21 @@ class MustacheDialogRenderer:
                     # double (or more) '{' followed by any number of
                     # whitespace followed by actual key followed by any number
                     # of whitespace followed by double (or more) '}'
-                    template_text = re.sub(r'\{\{+\s*(.*?)\s*\}\}+', r'{\1}',
-                                           template_text)
+                    template_text = MUSTACHE_PLACEHOLDER.sub(r'{\1}',
+                                                             template_text)
 
                     self.templates[template_name].append(template_text)
+        self._compile(template_name)
+
+    def _compile(self, template_name):
+        """Compile the templates of a group not compiled yet."""
+        templates = self.templates.get(template_name, [])
+        compiled = self._compiled.setdefault(template_name, [])
+        if len(compiled) > len(templates):
+            del compiled[:]
+        compiled += [_CompiledTemplate(text)
+                     for text in templates[len(compiled):]]
+        return compiled
 
     def render(self, template_name, context=None, index=None):
         """
@@ -95,29 +143,27 @@ class MustacheDialogRenderer:
             # "record not found" literal.
             return template_name.replace('.', ' ')
 
-        # Get the .dialog file's contents, minus any which have been spoken
-        # recently.
-        template_functions = self.templates.get(template_name)
+        compiled = self._compiled.get(template_name)
+        if compiled is None or len(compiled) != len(
+                self.templates[template_name]):
+            compiled = self._compile(template_name)
 
         if index is None:
-            template_functions = ([t for t in template_functions
-                                   if t not in self.recent_phrases] or
-                                  template_functions)
-            line = random.choice(template_functions)
-        else:
-            line = template_functions[index % len(template_functions)]
+            # Pick a line of the .dialog file not spoken recently
+            recent = self._recent.setdefault(template_name, deque())
+            choices = ([i for i in range(len(compiled)) if i not in recent] or
+                       range(len(compiled)))
+            index = random.choice(choices)
+            # Here's where we keep track of what we've said recently.
+            # Remember, this is by line in the .dialog file, not by exact
+            # phrase
+            recent.append(index)
+            max_recent = min(self.max_recent_phrases,
+                             len(compiled) - self.loop_prevention_offset)
+            while len(recent) > max(max_recent, 0):
+                recent.popleft()
         # Replace {key} in line with matching values from context
-        line = line.format(**context)
-        line = random.choice(expand_options(line))
-
-        # Here's where we keep track of what we've said recently. Remember,
-        # this is by line in the .dialog file, not by exact phrase
-        self.recent_phrases.append(line)
-        if (len(self.recent_phrases) >
-                min(self.max_recent_phrases, len(self.templates.get(
-                    template_name)) - self.loop_prevention_offset)):
-            self.recent_phrases.pop(0)
-        return line
+        return compiled[index % len(compiled)].render(context)
 
 
 def load_dialogs(dialog_dir, renderer=None):
@@ -145,12 +191,55 @@ def load_dialogs(dialog_dir, renderer=None):
     return renderer
 
 
+class _CachedDialog:
+    """Parsed dialog file of a phrase, as used by get().
+
+    Args:
+        lang (str): language of the dialog
+        phrase (str): phrase the dialog file is named after
+    """
+    def __init__(self, lang, phrase):
+        self.filename = join('text', lang.lower(), phrase + '.dialog')
+        self.path = None
+        self.mtime = None
+        self.renderer = None
+        self.checked = None
+        self.refresh()
+
+    def refresh(self):
+        """Reload the dialog if the file or its modification time changed."""
+        self.checked = monotonic()
+        path = resolve_resource_file(self.filename)
+        try:
+            mtime = os.stat(path).st_mtime_ns if path else None
+        except OSError:
+            path = mtime = None
+        if path == self.path and mtime == self.mtime:
+            return
+
+        self.path, self.mtime = path, mtime
+        if path:
+            self.renderer = MustacheDialogRenderer()
+            self.renderer.load_template_file('template', path)
+        else:
+            LOG.debug('Resource file not found: {}'.format(self.filename))
+            self.renderer = None
+
+
+# Dialogs used by get(), keyed by (lang, phrase)
+_dialog_cache = {}
+_dialog_cache_lock = Lock()
+
+
 def get(phrase, lang=None, context=None):
     """Looks up a resource file for the given phrase.
 
     If no file is found, the requested phrase is returned as the string. This
     will use the default language for translations.
 
+    The parsed dialog files are cached, the cache is checked against the
+    file system at most every DIALOG_CHECK_INTERVAL seconds.
+
     Args:
         phrase (str): resource phrase to retrieve/translate
         lang (str): the language to use
@@ -164,14 +253,14 @@ def get(phrase, lang=None, context=None):
         from mycroft.configuration import Configuration
         lang = Configuration.get().get('lang')
 
-    filename = join('text', lang.lower(), phrase + '.dialog')
-    template = resolve_resource_file(filename)
-    if not template:
-        LOG.debug('Resource file not found: {}'.format(filename))
-        return phrase
-
-    stache = MustacheDialogRenderer()
-    stache.load_template_file('template', template)
-    if not context:
-        context = {}
-    return stache.render('template', context)
+    with _dialog_cache_lock:
+        dialog = _dialog_cache.get((lang, phrase))
+        if dialog is None:
+            dialog = _CachedDialog(lang, phrase)
+            _dialog_cache[(lang, phrase)] = dialog
+        elif monotonic() - dialog.checked > DIALOG_CHECK_INTERVAL:
+            dialog.refresh()
+
+        if dialog.renderer is None:
+            return phrase
+        return dialog.renderer.render('template', context or {})
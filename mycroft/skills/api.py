@@ -15,8 +15,34 @@
 
 The skill api allows skills interact with eachother over the message bus
 just like interacting with any other object.
+
+Skills loaded in the same process as the caller are called directly instead
+of over the message bus, arguments and results are still copied as if they
+were sent over the bus.
 """
+import json
+
 from mycroft.messagebus.message import Message
+from mycroft.util.log import LOG
+
+
+def _bus_copy(data):
+    """Copy data the way sending it over the messagebus would."""
+    return json.loads(json.dumps(data))
+
+
+def _call_local(method_type, func, args, kwargs):
+    """Call an api method of a skill loaded in this process.
+
+    Behaves like the call over the messagebus, exceptions raised by the
+    method are logged and None is returned as no response would be sent.
+    """
+    data = _bus_copy({'args': args, 'kwargs': kwargs})
+    try:
+        return _bus_copy(func(*data['args'], **data['kwargs']))
+    except Exception:
+        LOG.exception('Failed to call api method {}'.format(method_type))
+        return None
 
 
 class SkillApi():
@@ -25,18 +51,47 @@ class SkillApi():
     Methods are built from a method_dict provided when initializing the skill.
     """
     bus = None
+    # Public api of the skills loaded in this process by skill id
+    local_apis = {}
+    # Api methods of the skills loaded in this process by message type
+    local_methods = {}
 
     @classmethod
     def connect_bus(cls, mycroft_bus):
         """Registers the bus object to use."""
         cls.bus = mycroft_bus
 
+    @classmethod
+    def register_local(cls, skill_id, public_api, methods):
+        """Make the api of a skill in this process callable directly.
+
+        Args:
+            skill_id (str): skill providing the api
+            public_api (dict): public api as sent over the bus
+            methods (dict): api methods by message type
+        """
+        cls.unregister_local(skill_id)
+        cls.local_apis[skill_id] = public_api
+        cls.local_methods.update(methods)
+
+    @classmethod
+    def unregister_local(cls, skill_id):
+        """Remove the api of a skill no longer loaded in this process."""
+        public_api = cls.local_apis.pop(skill_id, {})
+        for method in public_api.values():
+            cls.local_methods.pop(method.get('type'), None)
+
     def __init__(self, method_dict):
         self.method_dict = method_dict
         for key in method_dict:
             def get_method(k):
                 def method(*args, **kwargs):
                     m = self.method_dict[k]
+                    # Looked up on each call, a reloaded skill is called over
+                    # the bus until its new instance is registered.
+                    func = SkillApi.local_methods.get(m['type'])
+                    if func is not None:
+                        return _call_local(m['type'], func, args, kwargs)
                     data = {'args': args, 'kwargs': kwargs}
                     method_msg = Message(m['type'], data)
                     response = SkillApi.bus.wait_for_response(method_msg)
@@ -59,6 +114,8 @@ class SkillApi():
         Returns:
             SkillApi
         """
+        if skill in SkillApi.local_apis:
+            return SkillApi(SkillApi.local_apis[skill])
         public_api_msg = '{}.public_api'.format(skill)
         api = SkillApi.bus.wait_for_response(Message(public_api_msg))
         if api:
@@ -23,13 +23,17 @@ from contextlib import contextmanager
 from enum import Enum, unique
 from functools import total_ordering, wraps
 from itertools import count
+from threading import Lock
 
 from .mycroft_skill import MycroftSkill
 from mycroft.messagebus.message import Message, dig_for_message
+from mycroft.util.log import LOG
 
 ENTITY = "ENTITY"
 SCENE = "SCENE"
 IOT_REQUEST_ID = "iot_request_id"  # TODO make the id a property of the request
+# Key of the skill ids a trigger is routed to, see IoTEntityIndex.route
+IOT_SKILL_IDS = "skill_ids"
 
 _counter = count()
 
@@ -295,6 +299,170 @@ class IoTRequest:
         return cls(**data)
 
 
+def _normalize_name(name):
+    return ' '.join(name.lower().split())
+
+
+class IoTEntityIndex:
+    """
+    Index of the entity and scene names registered by IoT skills.
+
+    A controller skill feeds the registration messages of the IoT
+    skills to the index (see handle_register). Each registration
+    replaces the previous words of that skill and type, so skills
+    can update their device lists at any time.
+
+    The index maps every name to the skills that registered it,
+    allowing a request naming an entity or scene to be routed to
+    only those skills, and keeps a trie of the names for finding
+    them in an utterance.
+    """
+
+    def __init__(self):
+        self._words = {}  # (skill_id, word_type) -> set of names
+        self._owners = {ENTITY: {}, SCENE: {}}  # type -> name -> skill ids
+        self._trie = None  # Rebuilt on first lookup after a change
+        self._lock = Lock()
+
+    def update(self, skill_id: str, word_type: str, words: [str]):
+        """
+        Replace the names of a type registered by a skill.
+
+        Args:
+            skill_id: skill registering the names
+            word_type: ENTITY or SCENE
+            words: all names of the type known to the skill
+        """
+        if word_type not in self._owners:
+            LOG.warning('Ignoring IoT names of unknown type {} from {}'
+                        .format(word_type, skill_id))
+            return
+        new_words = {_normalize_name(w) for w in words if w.strip()}
+        owners = self._owners[word_type]
+        with self._lock:
+            old_words = self._words.get((skill_id, word_type), set())
+            if new_words == old_words:
+                return
+            for name in old_words - new_words:
+                owners[name].discard(skill_id)
+                if not owners[name]:
+                    del owners[name]
+            for name in new_words - old_words:
+                owners.setdefault(name, set()).add(skill_id)
+            if new_words:
+                self._words[(skill_id, word_type)] = new_words
+            else:
+                self._words.pop((skill_id, word_type), None)
+            self._trie = None
+
+    def handle_register(self, message: Message):
+        """
+        Update the index from a registration message of an IoT skill.
+
+        Args:
+            message: Message
+        """
+        data = message.data
+        self.update(data["skill_id"], data["type"], data["words"])
+
+    def remove_skill(self, skill_id: str):
+        """
+        Remove all names registered by a skill.
+
+        Args:
+            skill_id: skill to remove
+        """
+        for word_type in self._owners:
+            self.update(skill_id, word_type, [])
+
+    def owners(self, word_type: str, name: str) -> set:
+        """
+        Get the skills that registered a name.
+
+        Args:
+            word_type: ENTITY or SCENE
+            name: the entity or scene name
+
+        Returns:
+            set of skill ids
+        """
+        with self._lock:
+            return set(self._owners[word_type].get(_normalize_name(name),
+                                                   ()))
+
+    def route(self, request: IoTRequest):
+        """
+        Get the skills that should be asked to handle a request.
+
+        Skills need to know all names in a request to handle it, so
+        a request naming an entity and a scene is routed to the skills
+        that registered both. When no skill registered them all the
+        request is left for all skills to decide, a skill may know
+        names it hasn't registered.
+
+        Args:
+            request: IoTRequest
+
+        Returns:
+            set of skill ids, None if all skills should be asked.
+        """
+        skill_ids = None
+        for word_type, name in ((ENTITY, request.entity),
+                                (SCENE, request.scene)):
+            if name:
+                owners = self.owners(word_type, name)
+                skill_ids = owners if skill_ids is None else \
+                    skill_ids & owners
+        return skill_ids or None
+
+    def find_names(self, utterance: str) -> [tuple]:
+        """
+        Find the registered names in an utterance.
+
+        The longest name starting at a word is preferred, found names
+        don't overlap.
+
+        Args:
+            utterance: text to search
+
+        Returns:
+            list of (word_type, name) tuples in order of appearance
+        """
+        with self._lock:
+            if self._trie is None:
+                self._trie = self._build_trie()
+            trie = self._trie
+        tokens = _normalize_name(utterance).split()
+        found = []
+        start = 0
+        while start < len(tokens):
+            node = trie
+            match_end = None
+            for end in range(start, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                if None in node:
+                    match_end, matched = end, node[None]
+            if match_end is None:
+                start += 1
+            else:
+                found.extend(matched)
+                start = match_end + 1
+        return found
+
+    def _build_trie(self):
+        """Build a trie of name tokens, names are stored under None."""
+        trie = {}
+        for word_type, owners in self._owners.items():
+            for name in owners:
+                node = trie
+                for token in name.split():
+                    node = node.setdefault(token, {})
+                node.setdefault(None, []).append((word_type, name))
+        return trie
+
+
 def _track_request(func):
     """
     Used within the CommonIoT skill to track IoT requests.
@@ -353,6 +521,7 @@ class CommonIoTSkill(MycroftSkill, ABC):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._current_iot_request = None
+        self._registered_words = {}  # word type -> words last registered
 
     def bind(self, bus):
         """
@@ -395,6 +564,10 @@ class CommonIoTSkill(MycroftSkill, ABC):
             message: Message
         """
         data = message.data
+        skill_ids = data.get(IOT_SKILL_IDS)
+        if skill_ids and self.skill_id not in skill_ids:
+            # Routed to the skills owning the entity or scene
+            return
         request = IoTRequest.from_dict(data[IoTRequest.__name__])
 
         if request.version > self.supported_request_version:
@@ -440,6 +613,8 @@ class CommonIoTSkill(MycroftSkill, ABC):
         Args:
             _: Message. This is ignored.
         """
+        # The controller has no registrations yet, send them all
+        self._registered_words.clear()
         self.register_entities_and_scenes()
 
     def _register_words(self, words: [str], word_type: str):
@@ -451,15 +626,24 @@ class CommonIoTSkill(MycroftSkill, ABC):
         controller skill, and the vocabulary will be registered
         to that skill.
 
+        Nothing is sent if the words are unchanged since they were
+        last registered, or if there are no words. Every message
+        contains all words of the type, replacing the words registered
+        before.
+
         Args:
             words:
             word_type:
         """
-        if words:
-            self.bus.emit(Message(_BusKeys.REGISTER,
-                                  data={"skill_id": self.skill_id,
-                                        "type": word_type,
-                                        "words": list(words)}))
+        words = list(words)
+        previous = self._registered_words.get(word_type, [])
+        if not words or words == previous:
+            return
+        self._registered_words[word_type] = words
+        self.bus.emit(Message(_BusKeys.REGISTER,
+                              data={"skill_id": self.skill_id,
+                                    "type": word_type,
+                                    "words": words}))
 
     def register_entities_and_scenes(self):
         """
@@ -467,7 +651,8 @@ class CommonIoTSkill(MycroftSkill, ABC):
 
         This should be called in the skill's `initialize` method,
         at some point after `get_entities` and `get_scenes` can
-        be expected to return correct results.
+        be expected to return correct results. Call it again when
+        the entities or scenes change, only changed lists are sent.
 
         """
         self._register_words(self.get_entities(), ENTITY)
@@ -13,12 +13,24 @@
 # limitations under the License.
 
 import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from enum import Enum, IntEnum
 from abc import ABC, abstractmethod
+from threading import Lock
+from time import monotonic
+
 from mycroft.messagebus.message import Message
+from mycroft.util.log import LOG
 from .mycroft_skill import MycroftSkill
 from .audioservice import AudioService
 
+# Seconds a play query may take before the skill stops waiting for it, the
+# same as the default extension requested by CPS_extend_timeout()
+CPS_MATCH_TIMEOUT = 5
+# Maximum number of phrases with memoized matches per skill
+CPS_MATCH_CACHE_SIZE = 50
+
 
 class CPSMatchLevel(Enum):
     EXACT = 1
@@ -45,6 +57,14 @@ class CPSTrackStatus(IntEnum):
     END_OF_MEDIA = 90  # playback finished, is the default state when CPS loads
 
 
+class _PlayQuery:
+    """Play query being matched by the match worker of a skill."""
+    def __init__(self, phrase):
+        self.phrase = phrase
+        # Moved when the worker starts matching and by CPS_extend_timeout()
+        self.deadline = monotonic() + CPS_MATCH_TIMEOUT
+
+
 class CommonPlaySkill(MycroftSkill, ABC):
     """ To integrate with the common play infrastructure of Mycroft
     skills should use this base class and override the two methods
@@ -54,12 +74,30 @@ class CommonPlaySkill(MycroftSkill, ABC):
     The class makes the skill available to queries from the
     mycroft-playback-control skill and no special vocab for starting playback
     is needed.
+
+    `CPS_match_query_phrase` is run on a worker thread of the skill. The
+    query is answered with "not found" if the match takes longer than
+    CPS_MATCH_TIMEOUT seconds, unless the skill extends the deadline with
+    `CPS_extend_timeout`. Skills can set match_cache_ttl to reuse matches
+    for repeated phrases, and override `CPS_build_index` to prepare an index
+    of their catalogue in the background.
     """
+    # Seconds the match for a phrase is memoized, 0 disables memoizing
+    match_cache_ttl = 0
 
     def __init__(self, name=None, bus=None):
         super().__init__(name, bus)
         self.audioservice = None
         self.play_service_string = None
+        # Index built by CPS_build_index()
+        self.cps_index = None
+        self._index_generation = 0  # Incremented when a new index is used
+        self._match_executor = None
+        self._index_executor = None
+        self._match_lock = Lock()
+        self._running_query = None  # Query being matched by the worker
+        # phrase -> (expiry time, match)
+        self._match_cache = OrderedDict()
 
         # "MusicServiceSkill" -> "Music Service"
         spoken = name or self.__class__.__name__
@@ -93,8 +131,22 @@ class CommonPlaySkill(MycroftSkill, ABC):
                                         "skill_id": self.skill_id,
                                         "searching": True}))
 
-        # Now invoke the CPS handler to let the skill perform its search
-        result = self.CPS_match_query_phrase(search_phrase)
+        cached = self.__get_cached_match(search_phrase)
+        if cached is not None:
+            result = cached[0]
+        else:
+            # Now invoke the CPS handler to let the skill perform its search
+            query = _PlayQuery(search_phrase)
+            future = self.__get_match_executor().submit(self.__match, query)
+            while not future.done():
+                remaining = query.deadline - monotonic()
+                if remaining <= 0:
+                    LOG.info('{} took too long to match "{}"'.format(
+                        self.skill_id, search_phrase))
+                    break
+                wait([future], timeout=remaining)
+            # Too late results aren't used, but are still memoized
+            result = future.result() if future.done() else None
 
         if result:
             match = result[0]
@@ -112,6 +164,102 @@ class CommonPlaySkill(MycroftSkill, ABC):
                                             "skill_id": self.skill_id,
                                             "searching": False}))
 
+    def __get_match_executor(self):
+        with self._match_lock:
+            if self._match_executor is None:
+                self._match_executor = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix='{}-match'.format(self.skill_id))
+            return self._match_executor
+
+    def __get_index_executor(self):
+        with self._match_lock:
+            if self._index_executor is None:
+                self._index_executor = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix='{}-index'.format(self.skill_id))
+            return self._index_executor
+
+    def __match(self, query):
+        """Run CPS_match_query_phrase on the worker thread."""
+        query.deadline = monotonic() + CPS_MATCH_TIMEOUT
+        with self._match_lock:
+            self._running_query = query
+            generation = self._index_generation
+        try:
+            result = self.CPS_match_query_phrase(query.phrase)
+        finally:
+            with self._match_lock:
+                self._running_query = None
+        self.__cache_match(query.phrase, result, generation)
+        return result
+
+    def __get_cached_match(self, phrase):
+        """Get the memoized match for a phrase.
+
+        Returns:
+            tuple: (match,) if memoized, else None
+        """
+        if self.match_cache_ttl <= 0:
+            return None
+        with self._match_lock:
+            entry = self._match_cache.get(phrase)
+            if entry is None:
+                return None
+            if entry[0] < monotonic():
+                del self._match_cache[phrase]
+                return None
+            self._match_cache.move_to_end(phrase)
+            return (entry[1],)
+
+    def __cache_match(self, phrase, result, generation):
+        if self.match_cache_ttl <= 0:
+            return
+        with self._match_lock:
+            if generation != self._index_generation:
+                return  # Matched using an index that has been replaced
+            self._match_cache[phrase] = (monotonic() + self.match_cache_ttl,
+                                         result)
+            self._match_cache.move_to_end(phrase)
+            while len(self._match_cache) > CPS_MATCH_CACHE_SIZE:
+                self._match_cache.popitem(last=False)
+
+    def CPS_clear_match_cache(self):
+        """Forget memoized matches, e.g. when the catalogue changed."""
+        with self._match_lock:
+            self._match_cache.clear()
+
+    def CPS_update_index(self):
+        """Rebuild the catalogue index on a background thread.
+
+        Call this from initialize(), or whenever the catalogue changes.
+        Play queries arriving while the index is built are matched against
+        the previous index, the new one replaces it once it's complete and
+        the memoized matches are cleared at the same time.
+
+        Returns:
+            Future: completes when the new index is in place
+        """
+        def update():
+            index = self.CPS_build_index()
+            with self._match_lock:
+                self.cps_index = index
+                self._index_generation += 1
+                self._match_cache.clear()
+        return self.__get_index_executor().submit(update)
+
+    def CPS_build_index(self):
+        """Build a local index of the skill's catalogue.
+
+        Override to prepare lookup structures used by
+        CPS_match_query_phrase(), e.g. a dict of normalized titles. The
+        returned value is stored as self.cps_index.
+
+        Returns:
+            index of the catalogue
+        """
+        return None
+
     def __calc_confidence(self, match, phrase, level):
         """Translate confidence level and match to a 0-1 value.
 
@@ -190,6 +338,14 @@ class CommonPlaySkill(MycroftSkill, ABC):
         self.CPS_send_status(uri=args[0],
                              status=CPSTrackStatus.PLAYING_AUDIOSERVICE)
 
+    def default_shutdown(self):
+        """Shut down the match worker along with the skill."""
+        super().default_shutdown()
+        with self._match_lock:
+            for executor in (self._match_executor, self._index_executor):
+                if executor is not None:
+                    executor.shutdown(wait=False)
+
     def stop(self):
         """Stop anything playing on the audioservice."""
         if self.audioservice.is_playing:
@@ -251,6 +407,11 @@ class CommonPlaySkill(MycroftSkill, ABC):
         Args:
             timeout (int): Number of seconds
         """
+        with self._match_lock:
+            # Keep waiting for the match if it's still running
+            if self._running_query is not None:
+                self._running_query.deadline = max(
+                    self._running_query.deadline, monotonic() + timeout)
         self.bus.emit(Message('play:query.response',
                               {"phrase": self.play_service_string,
                                "searching": True,
@@ -11,8 +11,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from collections import OrderedDict
 from enum import IntEnum
 from abc import ABC, abstractmethod
+from threading import Event, Lock, Thread
+from time import monotonic
+
 from .mycroft_skill import MycroftSkill
 
 from mycroft.util.file_utils import resolve_resource_file
@@ -47,6 +51,13 @@ MAX_ANSWER_LEN_FOR_CONFIDENCE = 50
 # higher number - less bias for word length
 WORD_COUNT_DIVISOR = 100
 
+# Seconds between responses telling skill-query the search is still running
+QUERY_PROGRESS_INTERVAL = 2
+# Seconds a search may run before it's reported as not finding an answer
+QUERY_MAX_SEARCH_TIME = 10
+# Maximum number of questions with cached answers per skill
+QUERY_CACHE_SIZE = 100
+
 
 class CommonQuerySkill(MycroftSkill, ABC):
     """Question answering skills should be based on this class.
@@ -57,7 +68,13 @@ class CommonQuerySkill(MycroftSkill, ABC):
 
     This class works in conjunction with skill-query which collects
     answers from several skills presenting the best one available.
+
+    Skills can set query_cache_ttl to reuse the result of
+    `CQS_match_query_phrase` when the same question is asked again within
+    that many seconds.
     """
+    # Seconds the answer to a question is cached, 0 disables caching
+    query_cache_ttl = 0
 
     def __init__(self, name=None, bus=None):
         super().__init__(name, bus)
@@ -74,6 +91,10 @@ class CommonQuerySkill(MycroftSkill, ABC):
         except FileNotFoundError:
             self.log.warning("Missing noise_words.list file in "
                              f"res/text/{self.lang}")
+        self._noise_words = frozenset(self.translated_noise_words)
+        # normalized phrase -> (expiry time, result)
+        self._query_cache = OrderedDict()
+        self._query_cache_lock = Lock()
 
         # these should probably be configurable
         self.level_confidence = {
@@ -98,12 +119,32 @@ class CommonQuerySkill(MycroftSkill, ABC):
 
         # First, notify the requestor that we are attempting to handle
         # (this extends a timeout while this skill looks for a match)
-        self.bus.emit(message.response({"phrase": search_phrase,
-                                        "skill_id": self.skill_id,
-                                        "searching": True}))
-
-        # Now invoke the CQS handler to let the skill perform its search
-        result = self.CQS_match_query_phrase(search_phrase)
+        searching = message.response({"phrase": search_phrase,
+                                      "skill_id": self.skill_id,
+                                      "searching": True})
+        self.bus.emit(searching)
+
+        cache_key = ' '.join(search_phrase.lower().split())
+        cached = self.__get_cached_result(cache_key)
+        if cached is not None:
+            result = cached[0]
+        else:
+            # Now invoke the CQS handler to let the skill perform its
+            # search, keep extending the timeout while it's running
+            done = Event()
+            timed_out = Event()
+            progress = Thread(target=self.__report_progress,
+                              args=(message, searching, done, timed_out),
+                              daemon=True)
+            progress.start()
+            try:
+                result = self.CQS_match_query_phrase(search_phrase)
+            finally:
+                done.set()
+                progress.join()
+            self.__cache_result(cache_key, result)
+            if timed_out.is_set():
+                return  # Already answered that nothing was found
 
         if result:
             match = result[0]
@@ -119,19 +160,67 @@ class CommonQuerySkill(MycroftSkill, ABC):
                                             "conf": confidence}))
         else:
             # Signal we are done (can't handle it)
-            self.bus.emit(message.response({"phrase": search_phrase,
-                                            "skill_id": self.skill_id,
-                                            "searching": False}))
+            self.__report_not_found(message)
+
+    def __report_not_found(self, message):
+        self.bus.emit(message.response({"phrase": message.data["phrase"],
+                                        "skill_id": self.skill_id,
+                                        "searching": False}))
+
+    def __report_progress(self, message, searching, done, timed_out):
+        """Repeat the searching response until the search is done.
+
+        A search running longer than QUERY_MAX_SEARCH_TIME is reported as
+        not finding an answer, and timed_out is set.
+        """
+        deadline = monotonic() + QUERY_MAX_SEARCH_TIME
+        while not done.wait(min(QUERY_PROGRESS_INTERVAL,
+                                deadline - monotonic())):
+            if monotonic() >= deadline:
+                self.log.warning('Search for "{}" took too long, giving '
+                                 'up'.format(message.data["phrase"]))
+                timed_out.set()
+                self.__report_not_found(message)
+                return
+            self.bus.emit(searching)
+
+    def __get_cached_result(self, cache_key):
+        """Get the cached result for a question.
+
+        Returns:
+            tuple: (result,) if cached, else None
+        """
+        if self.query_cache_ttl <= 0:
+            return None
+        with self._query_cache_lock:
+            entry = self._query_cache.get(cache_key)
+            if entry is None:
+                return None
+            if entry[0] < monotonic():
+                del self._query_cache[cache_key]
+                return None
+            self._query_cache.move_to_end(cache_key)
+            return (entry[1],)
+
+    def __cache_result(self, cache_key, result):
+        if self.query_cache_ttl <= 0:
+            return
+        with self._query_cache_lock:
+            self._query_cache[cache_key] = (
+                monotonic() + self.query_cache_ttl, result)
+            self._query_cache.move_to_end(cache_key)
+            while len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+
+    def clear_query_cache(self):
+        """Forget the cached answers, e.g. when the skill's data changed."""
+        with self._query_cache_lock:
+            self._query_cache.clear()
 
     def remove_noise(self, phrase):
         """remove noise to produce essence of question"""
-        phrase = ' ' + phrase + ' '
-        for word in self.translated_noise_words:
-            mtch = ' ' + word + ' '
-            if phrase.find(mtch) > -1:
-                phrase = phrase.replace(mtch, " ")
-        phrase = ' '.join(phrase.split())
-        return phrase.strip()
+        return ' '.join(word for word in phrase.split()
+                        if word not in self._noise_words)
 
     def __calc_confidence(self, match, phrase, level, answer):
         # Assume the more of the words that get consumed, the better the match
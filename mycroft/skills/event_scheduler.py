@@ -15,12 +15,16 @@
 """Event scheduler system for calling skill (and other) methods at a specific
 times.
 """
+import hashlib
 import json
+import os
 import shutil
 import time
 from datetime import datetime, timedelta
-from threading import Thread, Lock
-from os.path import isfile, join, expanduser
+from heapq import heapify, heappop, heappush
+from itertools import count
+from threading import Condition, Thread, Lock
+from os.path import dirname, isfile, join, expanduser, splitext
 import xdg.BaseDirectory
 
 from mycroft.configuration import Configuration
@@ -28,6 +32,16 @@ from mycroft.messagebus.message import Message
 from mycroft.util.log import LOG
 from .mycroft_skill.event_container import EventContainer, create_basic_wrapper
 
+# Longest time in seconds the scheduler sleeps, bounding the delay caused by
+# the system clock being changed
+MAX_SLEEP = 5
+# Seconds journaled changes may wait before being synced to disk
+JOURNAL_SYNC_INTERVAL = 1.0
+# Journaled changes triggering a rewrite of the schedule file
+JOURNAL_COMPACT_SIZE = 1000
+# Stores remembered in the checkpoint file
+CHECKPOINTS_KEPT = 2
+
 
 def repeat_time(sched_time, repeat):
     """Next scheduled time for repeating event. Guarantees that the
@@ -46,10 +60,146 @@ def repeat_time(sched_time, repeat):
     return next_time
 
 
+def _checksum(content):
+    """Checksum identifying the content of a stored schedule."""
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def _sync_directory(directory):
+    """Make renames in a directory durable."""
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _write_durably(path, content):
+    """Replace a file with the given text, syncing it to disk.
+
+    Args:
+        path (str): file to replace
+        content (str): new content of the file
+    """
+    tmp_file = path + '.tmp'
+    fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+    _sync_directory(dirname(path))
+
+
+class ScheduleJournal:
+    """Append-only journal of changes to the schedule.
+
+    Each change is written as a line of JSON as soon as it's made, so it
+    survives the process crashing. Syncing to disk is batched by the
+    scheduler thread calling sync().
+
+    Changes are numbered. A checkpoint file next to the schedule file
+    records the number of the last change each stored schedule contains,
+    so changes are never applied twice.
+
+    Args:
+        path (str): journal file
+    """
+    def __init__(self, path):
+        self.path = path
+        self.entries = 0  # Changes in the journal
+        self.sequence = 0  # Number of the last journaled change
+        self.unsynced_since = None  # Time of the first unsynced change
+        self._fd = None
+        self._lock = Lock()
+
+    def read(self):
+        """Read the journaled changes.
+
+        A line left incomplete by a crash while writing is skipped.
+
+        Returns:
+            list: (sequence number, change as passed to append()) tuples
+        """
+        changes = []
+        if isfile(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        sequence, *change = json.loads(line)
+                        changes.append((int(sequence), change))
+                    except (TypeError, ValueError):
+                        LOG.warning('Skipping broken schedule journal entry')
+        self.entries = len(changes)
+        self.sequence = max([self.sequence] + [c[0] for c in changes])
+        return changes
+
+    def append(self, *change):
+        """Add a change to the journal.
+
+        Args:
+            change: operation name followed by its arguments
+        """
+        try:
+            with self._lock:
+                line = (json.dumps((self.sequence + 1,) + change) +
+                        '\n').encode('utf-8')
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND |
+                                       os.O_CREAT, 0o600)
+                os.write(self._fd, line)
+                self.sequence += 1
+                self.entries += 1
+                if self.unsynced_since is None:
+                    self.unsynced_since = time.monotonic()
+        except (OSError, TypeError, ValueError) as e:
+            LOG.error('Failed to journal scheduled event ({})'.format(
+                repr(e)))
+
+    def sync(self):
+        """Sync the journaled changes to disk."""
+        with self._lock:
+            if self._fd is not None and self.unsynced_since is not None:
+                try:
+                    os.fsync(self._fd)
+                except OSError as e:
+                    LOG.error('Failed to sync schedule journal ({})'.format(
+                        repr(e)))
+            self.unsynced_since = None
+
+    def clear(self):
+        """Empty the journal after the schedule file has been written."""
+        with self._lock:
+            try:
+                if self._fd is not None:
+                    os.ftruncate(self._fd, 0)
+                elif isfile(self.path):
+                    os.remove(self.path)
+            except OSError as e:
+                LOG.error('Failed to clear schedule journal ({})'.format(
+                    repr(e)))
+            self.entries = 0
+            self.unsynced_since = None
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
 class EventScheduler(Thread):
     """Create an event scheduler thread. Will send messages at a
      predetermined time to the registered targets.
 
+    Pending trigger times are kept in a heap, the thread sleeps until the
+    earliest one and is woken when the schedule changes.
+
+    Changes to the schedule are journaled as they're made and merged into
+    the schedule file once the journal grows large, and on shutdown.
+    Like on shutdown, repeating events aren't persisted, skills schedule
+    them again when loaded.
+
     Args:
         bus:            Mycroft messagebus (mycroft.messagebus)
         schedule_file:  File to store pending events to on shutdown
@@ -59,6 +209,13 @@ class EventScheduler(Thread):
 
         self.events = {}
         self.event_lock = Lock()
+        self._wakeup = Condition(self.event_lock)
+        # Heap of (time, sequence number, event) with one entry per
+        # scheduled time in self.events. Entries of removed events are left
+        # in the heap and skipped when they come up.
+        self._heap = []
+        self._sequence = count()
+        self._removed = 0  # Entries in the heap no longer scheduled
 
         self.bus = bus
         self.is_running = True
@@ -70,6 +227,11 @@ class EventScheduler(Thread):
         if isfile(old_schedule_path):
             shutil.move(old_schedule_path, new_schedule_path)
         self.schedule_file = new_schedule_path
+        self._journal = ScheduleJournal(
+            splitext(self.schedule_file)[0] + '.journal')
+        self._checkpoint_file = splitext(self.schedule_file)[0] + '.checkpoint'
+        # [sequence number, checksum] of the most recently stored schedules
+        self._checkpoints = []
         if self.schedule_file:
             self.load()
 
@@ -84,53 +246,158 @@ class EventScheduler(Thread):
         self.start()
 
     def load(self):
-        """Load json data with active events from json file."""
+        """Load json data with active events from json file.
+
+        Changes journaled since the file was written are applied on top.
+        """
+        json_data = {}
+        checksum = None
         if isfile(self.schedule_file):
-            json_data = {}
             with open(self.schedule_file) as f:
                 try:
-                    json_data = json.load(f)
+                    content = f.read()
+                    checksum = _checksum(content)
+                    json_data = json.loads(content)
                 except Exception as e:
                     LOG.error(e)
-            current_time = time.time()
-            with self.event_lock:
-                for key in json_data:
-                    event_list = json_data[key]
-                    # discard non repeating events that has already happened
-                    self.events[key] = [tuple(e) for e in event_list
-                                        if e[0] > current_time or e[1]]
+        if not isinstance(json_data, dict):
+            json_data = {}
+        events = {key: [tuple(e) for e in json_data[key]]
+                  for key in json_data}
+        self._checkpoints = self._load_checkpoints()
+        # The file is the latest stored schedule unless a crash came between
+        # writing the checkpoint and replacing the file
+        stored = [seq for seq, stored_checksum in self._checkpoints
+                  if stored_checksum == checksum]
+        stored_sequence = stored[-1] if stored else 0
+        for sequence, change in self._journal.read():
+            # Skip changes stored before the journal could be cleared
+            if sequence > stored_sequence:
+                self._replay(events, change)
+        self._journal.sequence = max([self._journal.sequence] +
+                                     [c[0] for c in self._checkpoints])
+
+        current_time = time.time()
+        with self.event_lock:
+            for key in events:
+                # discard non repeating events that has already happened
+                event_list = [e for e in events[key]
+                              if e[0] > current_time or e[1]]
+                if event_list:
+                    self.events[key] = event_list
+            self._rebuild_heap()
+
+    def _load_checkpoints(self):
+        """Read the checkpoints of the stored schedules.
+
+        Returns:
+            list: [sequence number, checksum] of the stored schedules
+        """
+        if isfile(self._checkpoint_file):
+            try:
+                with open(self._checkpoint_file) as f:
+                    return [[int(seq), str(checksum)]
+                            for seq, checksum in json.loads(f.read())]
+            except (OSError, TypeError, ValueError) as e:
+                LOG.error('Failed to read schedule checkpoints ({})'.format(
+                    repr(e)))
+        return []
+
+    @staticmethod
+    def _replay(events, change):
+        """Apply a journaled change to the loaded events."""
+        try:
+            operation, event = change[:2]
+            if operation == 'schedule':
+                events.setdefault(event, []).append(tuple(change[2:6]))
+            elif operation == 'remove':
+                events.pop(event, None)
+            elif operation == 'update' and events.get(event):
+                sched_time, repeat, _, context = events[event][0]
+                events[event][0] = (sched_time, repeat, change[2], context)
+        except (TypeError, ValueError, IndexError):
+            LOG.warning('Skipping invalid schedule journal entry')
+
+    def _rebuild_heap(self):
+        """Recreate the heap from the scheduled events."""
+        self._heap = [(entry[0], next(self._sequence), event)
+                      for event, entries in self.events.items()
+                      for entry in entries]
+        heapify(self._heap)
+        self._removed = 0
+
+    def _add(self, event, entry):
+        """Add a scheduled time of an event, waking the thread if needed."""
+        self.events.setdefault(event, []).append(entry)
+        if not self._heap or entry[0] < self._heap[0][0]:
+            self._wakeup.notify()
+        heappush(self._heap, (entry[0], next(self._sequence), event))
+
+    def _pop_entry(self, event, sched_time):
+        """Remove a scheduled time of an event.
+
+        Returns:
+            tuple: the removed (time, repeat, data, context) entry, None if
+                   the time is no longer scheduled
+        """
+        entries = self.events.get(event, [])
+        for i, entry in enumerate(entries):
+            if entry[0] == sched_time:
+                del entries[i]
+                if not entries:
+                    del self.events[event]
+                return entry
+        return None
 
     def run(self):
         while self.is_running:
             self.check_state()
-            time.sleep(0.5)
+            self._maintain_journal()
+            with self.event_lock:
+                if not self.is_running:
+                    break
+                timeout = MAX_SLEEP
+                if self._heap:
+                    timeout = min(self._heap[0][0] - time.time(), MAX_SLEEP)
+                unsynced_since = self._journal.unsynced_since
+                if unsynced_since is not None:
+                    timeout = min(timeout, unsynced_since - time.monotonic() +
+                                  JOURNAL_SYNC_INTERVAL)
+                if timeout > 0:
+                    self._wakeup.wait(timeout)
+
+    def _maintain_journal(self):
+        """Sync journaled changes that are due and compact the journal."""
+        if self._journal.entries >= JOURNAL_COMPACT_SIZE:
+            self.store()
+        unsynced_since = self._journal.unsynced_since
+        if (unsynced_since is not None and
+                time.monotonic() - unsynced_since >= JOURNAL_SYNC_INTERVAL):
+            self._journal.sync()
+
+    def _journal_change(self, *change):
+        """Journal a change, waking the thread to sync it in time."""
+        if self._journal.unsynced_since is None:
+            self._wakeup.notify()
+        self._journal.append(*change)
 
     def check_state(self):
         """Check if an event should be triggered."""
+        pending_messages = []
         with self.event_lock:
-            # Check all events
-            pending_messages = []
-            for event in self.events:
-                current_time = time.time()
-                e = self.events[event]
-                # Get scheduled times that has passed
-                passed = [(t, r, d, c) for
-                          (t, r, d, c) in e if t <= current_time]
-                # and remaining times that we're still waiting for
-                remaining = [(t, r, d, c) for
-                             t, r, d, c in e if t > current_time]
-                # Trigger registered methods
-                for sched_time, repeat, data, context in passed:
-                    pending_messages.append(Message(event, data, context))
-                    # if this is a repeated event add a new trigger time
-                    if repeat:
-                        next_time = repeat_time(sched_time, repeat)
-                        remaining.append((next_time, repeat, data, context))
-                # update list of events
-                self.events[event] = remaining
-
-        # Remove events have are now completed
-        self.clear_empty()
+            current_time = time.time()
+            while self._heap and self._heap[0][0] <= current_time:
+                sched_time, _, event = heappop(self._heap)
+                entry = self._pop_entry(event, sched_time)
+                if entry is None:  # Removed since scheduled
+                    self._removed = max(self._removed - 1, 0)
+                    continue
+                _, repeat, data, context = entry
+                pending_messages.append(Message(event, data, context))
+                # if this is a repeated event add a new trigger time
+                if repeat:
+                    next_time = repeat_time(sched_time, repeat)
+                    self._add(event, (next_time, repeat, data, context))
 
         # Finally, emit the queued up events that triggered
         for msg in pending_messages:
@@ -151,17 +418,16 @@ class EventScheduler(Thread):
         """
         data = data or {}
         with self.event_lock:
-            # get current list of scheduled times for event, [] if missing
-            event_list = self.events.get(event, [])
-
             # Don't schedule if the event is repeating and already scheduled
             if repeat and event in self.events:
                 LOG.debug('Repeating event {} is already scheduled, discarding'
                           .format(event))
             else:
                 # add received event and time
-                event_list.append((sched_time, repeat, data, context))
-                self.events[event] = event_list
+                self._add(event, (sched_time, repeat, data, context))
+                if not repeat:
+                    self._journal_change('schedule', event, sched_time,
+                                         repeat, data, context)
 
     def schedule_event_handler(self, message):
         """Messagebus interface to the schedule_event method.
@@ -193,7 +459,15 @@ class EventScheduler(Thread):
         """
         with self.event_lock:
             if event in self.events:
-                self.events.pop(event)
+                self._removed += len(self.events.pop(event))
+                self._compact()
+                self._journal_change('remove', event)
+
+    def _compact(self):
+        """Rebuild the heap if it's mostly made up of removed entries."""
+        if self._removed > len(self._heap) // 2:
+            self._rebuild_heap()
+            self._wakeup.notify()
 
     def remove_event_handler(self, message):
         """Messagebus interface to the remove_event method."""
@@ -215,6 +489,7 @@ class EventScheduler(Thread):
             if len(self.events.get(event, [])) > 0:
                 time, repeat, _, context = self.events[event][0]
                 self.events[event][0] = (time, repeat, data, context)
+                self._journal_change('update', event, data)
 
     def update_event_handler(self, message):
         """Messagebus interface to the update_event method."""
@@ -236,16 +511,49 @@ class EventScheduler(Thread):
         self.bus.emit(message.reply(emitter_name, data=event))
 
     def store(self):
-        """Write current schedule to disk."""
+        """Write current schedule to disk and clear the journal.
+
+        The schedule is written to a temporary file replacing the schedule
+        file, so a crash while writing leaves the previous file intact.
+        The checkpoint file is updated first, recording which journaled
+        changes the new file contains. Repeating events aren't stored.
+        """
+        tmp_file = self.schedule_file + '.tmp'
         with self.event_lock:
-            with open(self.schedule_file, 'w') as f:
-                json.dump(self.events, f)
+            events = {}
+            for event, entries in self.events.items():
+                entries = [e for e in entries if not e[1]]
+                if entries:
+                    events[event] = entries
+            try:
+                fd = os.open(tmp_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC,
+                             0o600)
+                with os.fdopen(fd, 'w+') as f:
+                    json.dump(events, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    f.seek(0)
+                    checksum = _checksum(f.read())
+                checkpoints = (self._checkpoints +
+                               [[self._journal.sequence, checksum]])
+                checkpoints = checkpoints[-CHECKPOINTS_KEPT:]
+                _write_durably(self._checkpoint_file, json.dumps(checkpoints))
+                os.replace(tmp_file, self.schedule_file)
+                _sync_directory(dirname(self.schedule_file))
+            except (OSError, TypeError, ValueError) as e:
+                LOG.error('Failed to store schedule ({})'.format(repr(e)))
+            else:
+                self._checkpoints = checkpoints
+                self._journal.clear()
 
     def clear_repeating(self):
         """Remove repeating events from events dict."""
         with self.event_lock:
             for e in self.events:
-                self.events[e] = [i for i in self.events[e] if i[1] is None]
+                entries = [i for i in self.events[e] if i[1] is None]
+                self._removed += len(self.events[e]) - len(entries)
+                self.events[e] = entries
+            self._compact()
 
     def clear_empty(self):
         """Remove empty event entries from events dict."""
@@ -255,7 +563,9 @@ class EventScheduler(Thread):
 
     def shutdown(self):
         """Stop the running thread."""
-        self.is_running = False
+        with self.event_lock:
+            self.is_running = False
+            self._wakeup.notify()
         # Remove listeners
         self.bus.remove_all_listeners('mycroft.scheduler.schedule_event')
         self.bus.remove_all_listeners('mycroft.scheduler.remove_event')
@@ -267,6 +577,8 @@ class EventScheduler(Thread):
         self.clear_empty()
         # Store all pending scheduled events
         self.store()
+        self._journal.sync()
+        self._journal.close()
 
 
 class EventSchedulerInterface:
@@ -94,6 +94,7 @@ class IntentService:
         self.fallback = FallbackService(bus)
 
         self.bus.on('register_vocab', self.handle_register_vocab)
+        self.bus.on('register_vocab_batch', self.handle_register_vocab_batch)
         self.bus.on('register_intent', self.handle_register_intent)
         self.bus.on('recognizer_loop:utterance', self.handle_utterance)
         self.bus.on('detach_intent', self.handle_detach_intent)
@@ -378,6 +379,34 @@ class IntentService:
                                                alias_of, regex_str)
         self.registered_vocab.append(message.data)
 
+    def handle_register_vocab_batch(self, message):
+        """Register multiple adapt keywords and regexes.
+
+        Args:
+            message (Message): message containing lists of keywords per
+                               vocab type, each keyword followed by its
+                               aliases, and/or a list of regexes
+        """
+        vocabulary = []
+        registered = []
+        for entity_type, keywords in message.data.get('vocab', {}).items():
+            for entity_value, *aliases in keywords:
+                vocabulary.append((entity_value, entity_type, None, None))
+                registered.append({'entity_value': entity_value,
+                                   'entity_type': entity_type})
+                for alias in aliases:
+                    vocabulary.append((alias, entity_type, entity_value,
+                                       None))
+                    registered.append({'entity_value': alias,
+                                       'entity_type': entity_type,
+                                       'alias_of': entity_value})
+        for regex_str in message.data.get('regex', []):
+            vocabulary.append((None, None, None, regex_str))
+            registered.append({'regex': regex_str})
+
+        self.adapt_service.register_vocabulary_list(vocabulary)
+        self.registered_vocab.extend(registered)
+
     def handle_register_intent(self, message):
         """Register adapt intent.
 
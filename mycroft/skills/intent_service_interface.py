@@ -36,6 +36,7 @@ class IntentServiceInterface:
         self.bus = bus
         self.registered_intents = []
         self.detached_intents = []
+        self.vocab_count = 0  # Number of keywords, aliases and regexes
 
     def set_bus(self, bus):
         self.bus = bus
@@ -56,6 +57,7 @@ class IntentServiceInterface:
             Message("register_vocab",
                     {**entity_data, **compatibility_data})
         )
+        self.vocab_count += 1 + len(aliases)
         for alias in aliases:
             alias_data = {
                 'entity_value': alias,
@@ -75,6 +77,33 @@ class IntentServiceInterface:
                          reference from named match group.
         """
         self.bus.emit(Message("register_vocab", {'regex': regex}))
+        self.vocab_count += 1
+
+    def register_adapt_keywords(self, keywords):
+        """Register multiple Adapt keywords using a single message.
+
+        Args:
+            keywords (dict): lists of keywords per vocab type, each keyword
+                             is a list starting with the primary keyword
+                             followed by its aliases
+        """
+        if keywords:
+            self.bus.emit(Message("register_vocab_batch",
+                                  {'vocab': keywords}))
+            self.vocab_count += sum(len(keyword)
+                                    for vocab in keywords.values()
+                                    for keyword in vocab)
+
+    def register_adapt_regexes(self, regexes):
+        """Register multiple regexes using a single message.
+
+        Args:
+            regexes (list): Regexes to be registered
+        """
+        if regexes:
+            self.bus.emit(Message("register_vocab_batch",
+                                  {'regex': list(regexes)}))
+            self.vocab_count += len(regexes)
 
     def register_adapt_intent(self, name, intent_parser):
         """Register an Adapt intent parser object.
@@ -273,11 +273,30 @@ class AdaptService:
             alias_of: entity this is an alternative for
         """
         with self.lock:
-            if regex_str:
-                self.engine.register_regex_entity(regex_str)
-            else:
-                self.engine.register_entity(
-                    entity_value, entity_type, alias_of=alias_of)
+            self._register_vocabulary(entity_value, entity_type,
+                                      alias_of, regex_str)
+
+    def register_vocabulary_list(self, vocabulary):
+        """Register multiple vocabulary entries in one pass.
+
+        The engine is locked once for all entries instead of per entry.
+
+        Argument:
+            vocabulary (iterable): (entity_value, entity_type, alias_of,
+                                   regex_str) tuples as for
+                                   register_vocabulary()
+        """
+        with self.lock:
+            for entry in vocabulary:
+                self._register_vocabulary(*entry)
+
+    def _register_vocabulary(self, entity_value, entity_type,
+                             alias_of, regex_str):
+        if regex_str:
+            self.engine.register_regex_entity(regex_str)
+        else:
+            self.engine.register_entity(
+                entity_value, entity_type, alias_of=alias_of)
 
     def register_intent(self, intent):
         """Register new intent with adapt engine.
@@ -5,6 +5,7 @@ from mycroft.metrics import Stopwatch, report_timing
 from mycroft.util.log import LOG
 
 from ..skill_data import to_alnum
+from .handler_executor import PRIORITY_EVENTS
 
 
 def unmunge_message(message, skill_id):
@@ -119,14 +120,37 @@ class EventContainer:
 
     This container tracks events added by a skill, allowing unregistering
     all events on shutdown.
+
+    If an executor is set, handlers added afterwards are run by the executor
+    instead of on the thread delivering the message.
     """
-    def __init__(self, bus=None):
+    def __init__(self, bus=None, executor=None):
         self.bus = bus
+        self.executor = executor
         self.events = []
 
     def set_bus(self, bus):
         self.bus = bus
 
+    def set_executor(self, executor):
+        self.executor = executor
+
+    def _dispatcher(self, name, handler, once=False):
+        """Create a handler passing messages on to the executor.
+
+        A one-time handler is removed when the message is dispatched, not
+        when the executor gets to run it, so a handler registered under the
+        same name in between is kept.
+        """
+        executor = self.executor
+        priority = name in PRIORITY_EVENTS
+
+        def dispatcher(message):
+            if once:
+                self.remove(name)
+            executor.submit(handler, message, priority)
+        return dispatcher
+
     def add(self, name, handler, once=False):
         """Create event handler for executing intent or other event.
 
@@ -143,12 +167,15 @@ class EventContainer:
             handler(message)
 
         if handler:
+            if self.executor:
+                registered = self._dispatcher(name, handler, once)
+            else:
+                registered = once_wrapper if once else handler
             if once:
-                self.bus.once(name, once_wrapper)
-                self.events.append((name, once_wrapper))
+                self.bus.once(name, registered)
             else:
-                self.bus.on(name, handler)
-                self.events.append((name, handler))
+                self.bus.on(name, registered)
+            self.events.append((name, registered))
 
             LOG.debug('Added event: {}'.format(name))
 
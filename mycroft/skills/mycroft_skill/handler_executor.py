@@ -0,0 +1,161 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Per skill executors running the skill's messagebus handlers.
+
+Without an executor the handlers of all skills run on the shared thread pool
+of the messagebus client, a skill flooding it with handlers delays the
+handlers of every other skill.  A HandlerExecutor gives a skill a pool of
+threads of its own, and a reserved thread for system critical events like
+mycroft.stop so they aren't queued behind the skill's other handlers.  Like
+on the messagebus client pool the skill's handlers run concurrently, a
+handler may block waiting for a response handled by the same skill.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
+
+from mycroft.util.log import LOG
+
+# Events handled in the priority lane of the executor
+PRIORITY_EVENTS = ('mycroft.stop',)
+
+# Default number of worker threads of a skill
+DEFAULT_WORKERS = 8
+
+
+class _Lane:
+    """Thread pool keeping track of queue depths and waiting times.
+
+    Handlers are never dropped, when more than max_queued handlers are
+    waiting for a thread a warning is logged and the handler is queued
+    anyway.
+
+    Args:
+        name (str): prefix of the thread names
+        workers (int): number of threads
+        max_queued (int): handlers expected to wait for a thread at most,
+                          None for no limit
+    """
+    def __init__(self, name, workers, max_queued=None):
+        self.name = name
+        self.executor = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix=name)
+        self.max_queued = max_queued
+        self.lock = Lock()
+        self.queued = 0
+        self.peak_queued = 0
+        self.handled = 0
+        self.overflowed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def submit(self, handler, message):
+        """Queue a handler, returning False if the lane is shut down."""
+        with self.lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+            overflow = (self.max_queued is not None and
+                        self.queued > self.max_queued)
+            if overflow:
+                self.overflowed += 1
+            # Warn once each time the queue grows past the limit
+            warn = overflow and self.queued == self.max_queued + 1
+        if warn:
+            LOG.warning('Handler queue of {} is over {} handlers'.format(
+                self.name, self.max_queued))
+        try:
+            self.executor.submit(self._run, handler, message, monotonic())
+        except RuntimeError:  # Executor has been shut down
+            with self.lock:
+                self.queued -= 1
+            return False
+        return True
+
+    def _run(self, handler, message, queued_at):
+        wait = monotonic() - queued_at
+        with self.lock:
+            self.queued -= 1
+            self.handled += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        try:
+            handler(message)
+        except Exception:
+            LOG.exception('Unhandled exception in handler')
+
+    def metrics(self):
+        with self.lock:
+            return {
+                'queue_depth': self.queued,
+                'peak_queue_depth': self.peak_queued,
+                'handled': self.handled,
+                'overflowed': self.overflowed,
+                'avg_wait': (self.total_wait / self.handled
+                             if self.handled else 0.0),
+                'max_wait': self.max_wait
+            }
+
+
+class HandlerExecutor:
+    """Run the messagebus handlers of a skill on threads of its own.
+
+    Handlers are run concurrently by a pool of worker threads, no handler
+    is ever dropped. A warning is logged when more than max_queued
+    handlers are waiting for a worker. Handlers for PRIORITY_EVENTS are run
+    by a separate thread reserved for them.
+
+    Args:
+        skill_id (str): skill owning the executor
+        workers (int): number of worker threads
+        max_queued (int): number of handlers waiting for a worker before
+                          warning
+    """
+    def __init__(self, skill_id, workers=DEFAULT_WORKERS, max_queued=50):
+        self.skill_id = skill_id
+        self._lane = _Lane(skill_id, workers, max_queued)
+        self._priority_lane = _Lane(skill_id + '-priority', 1)
+
+    def submit(self, handler, message, priority=False):
+        """Queue a handler to be run with a message.
+
+        Args:
+            handler (callable): handler to run
+            message (Message): message to pass to the handler
+            priority (bool): run in the priority lane
+
+        Returns:
+            bool: True if queued, False if the executor is shut down
+        """
+        lane = self._priority_lane if priority else self._lane
+        return lane.submit(handler, message)
+
+    def metrics(self):
+        """Get the queue depths and waiting times of the executor.
+
+        Returns:
+            dict: metrics of the normal and the priority lane
+        """
+        return {
+            'normal': self._lane.metrics(),
+            'priority': self._priority_lane.metrics()
+        }
+
+    def shutdown(self):
+        """Stop the worker threads once the running handlers are done.
+
+        Queued handlers that haven't started are still run.
+        """
+        self._lane.executor.shutdown(wait=False)
+        self._priority_lane.executor.shutdown(wait=False)
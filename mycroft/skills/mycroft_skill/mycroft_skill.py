@@ -19,7 +19,6 @@ import sys
 import re
 import traceback
 from itertools import chain
-from os import walk
 from os.path import join, abspath, dirname, basename, exists
 from pathlib import Path
 from threading import Event, Timer, Lock
@@ -48,9 +47,10 @@ from mycroft.util.format import pronounce_number, join_list
 from mycroft.util.parse import match_one, extract_number
 
 from .event_container import EventContainer, create_wrapper, get_handler_name
+from ..api import SkillApi
 from ..event_scheduler import EventSchedulerInterface
 from ..intent_service_interface import IntentServiceInterface
-from ..settings import get_local_settings, save_settings
+from ..settings import get_local_settings, save_settings, SettingsStore
 from ..skill_data import (
     load_vocabulary,
     load_regex,
@@ -59,7 +59,9 @@ from ..skill_data import (
     munge_intent_parser,
     read_vocab_file,
     read_value_file,
-    read_translated_file
+    read_translated_file,
+    ResourceIndex,
+    VocabularyMatcher
 )
 
 
@@ -156,7 +158,12 @@ class MycroftSkill:
         self.reload_skill = True  #: allow reloading (default True)
 
         self.events = EventContainer(bus)
+        #: Executor running the skill's handlers, see set_handler_executor()
+        self.handler_executor = None
         self.voc_match_cache = {}
+        # Compiled matchers of the voc_match_cache phrase lists
+        self._voc_matchers = {}
+        self._resource_index = None
 
         # Delegator classes
         self.event_scheduler = EventSchedulerInterface(self.name)
@@ -194,9 +201,22 @@ class MycroftSkill:
                     settings_read_path = path
                     break
 
-        self.settings = get_local_settings(settings_read_path, self.name)
+        self.settings = SettingsStore(
+            self.settings_write_path,
+            get_local_settings(settings_read_path, self.name))
         self._initial_settings = deepcopy(self.settings)
 
+    def _save_settings(self):
+        """Write the settings to settings.json.
+
+        Writes are coalesced if the settings haven't been replaced by a plain
+        dict.
+        """
+        if isinstance(self.settings, SettingsStore):
+            self.settings.save()
+        else:
+            save_settings(self.settings_write_path, self.settings)
+
     @property
     def enclosure(self):
         if self._enclosure:
@@ -264,6 +284,18 @@ class MycroftSkill:
 
             self._register_public_api()
 
+    def set_handler_executor(self, executor):
+        """Run the skill's messagebus handlers on a dedicated executor.
+
+        Only affects handlers added after the call, it should be called
+        before the skill is bound to the bus.
+
+        Args:
+            executor (HandlerExecutor): executor for the skill's handlers
+        """
+        self.handler_executor = executor
+        self.events.set_executor(executor)
+
     def _register_public_api(self):
         """ Find and register api methods.
         Api methods has been tagged with the api_method member, for each
@@ -295,6 +327,7 @@ class MycroftSkill:
                     'type': '{}.{}'.format(self.skill_id, name),
                     'func': method
                 }
+        local_methods = {}
         for key in self.public_api:
             if ('type' in self.public_api[key] and
                     'func' in self.public_api[key]):
@@ -306,10 +339,14 @@ class MycroftSkill:
                 func = self.public_api[key].pop('func')
                 self.add_event(self.public_api[key]['type'],
                                wrap_method(func))
+                local_methods[self.public_api[key]['type']] = func
 
         if self.public_api:
             self.add_event('{}.public_api'.format(self.skill_id),
                            self._send_public_api)
+            # Skills in this process call the methods directly
+            SkillApi.register_local(self.skill_id, self.public_api,
+                                    local_methods)
 
     def _register_system_event_handlers(self):
         """Add all events allowing the standard interaction with the Mycroft
@@ -360,7 +397,7 @@ class MycroftSkill:
             if remote_settings is not None:
                 LOG.info('Updating settings for skill ' + self.name)
                 self.settings.update(**remote_settings)
-                save_settings(self.settings_write_path, self.settings)
+                self._save_settings()
                 if self.settings_change_callback is not None:
                     self.settings_change_callback()
 
@@ -660,17 +697,29 @@ class MycroftSkill:
             vocab = read_vocab_file(voc)
             self.voc_match_cache[cache_key] = list(chain(*vocab))
         if utt:
-            if exact:
-                # Check for exact match
-                return any(i.strip() == utt
-                           for i in self.voc_match_cache[cache_key])
-            else:
-                # Check for matches against complete words
-                return any([re.match(r'.*\b' + i + r'\b.*', utt)
-                            for i in self.voc_match_cache[cache_key]])
+            return self._voc_matcher(cache_key).match(utt, exact)
         else:
             return False
 
+    def _voc_matcher(self, cache_key):
+        """Get the compiled matcher of a cached vocabulary.
+
+        The matcher is rebuilt if the phrase list in voc_match_cache has
+        been replaced since it was compiled.
+
+        Args:
+            cache_key (str): key of the vocabulary in voc_match_cache
+
+        Returns:
+            VocabularyMatcher: matcher of the vocabulary's phrases
+        """
+        phrases = self.voc_match_cache[cache_key]
+        source, matcher = self._voc_matchers.get(cache_key, (None, None))
+        if source is not phrases:
+            matcher = VocabularyMatcher(phrases)
+            self._voc_matchers[cache_key] = (phrases, matcher)
+        return matcher
+
     def report_metric(self, name, data):
         """Report a skill metric to the Mycroft servers.
 
@@ -813,25 +862,10 @@ class MycroftSkill:
     def _find_resource(self, res_name, lang, res_dirname=None):
         """Finds a resource by name, lang and dir
         """
-        if res_dirname:
-            # Try the old translated directory (dialog/vocab/regex)
-            path = join(self.root_dir, res_dirname, lang, res_name)
-            if exists(path):
-                return path
-
-            # Try old-style non-translated resource
-            path = join(self.root_dir, res_dirname, res_name)
-            if exists(path):
-                return path
-
-        # New scheme:  search for res_name under the 'locale' folder
-        root_path = join(self.root_dir, 'locale', lang)
-        for path, _, files in walk(root_path):
-            if res_name in files:
-                return join(path, res_name)
-
-        # Not found
-        return None
+        if (self._resource_index is None or
+                self._resource_index.root_dir != self.root_dir):
+            self._resource_index = ResourceIndex(self.root_dir)
+        return self._resource_index.find(res_name, lang, res_dirname)
 
     def translate_namedvalues(self, name, delim=','):
         """Load translation dict containing names and values.
@@ -937,7 +971,7 @@ class MycroftSkill:
             """Store settings and indicate that the skill handler has completed
             """
             if self.settings != self._initial_settings:
-                save_settings(self.settings_write_path, self.settings)
+                self._save_settings()
                 self._initial_settings = deepcopy(self.settings)
             if handler_info:
                 msg_type = handler_info + '.complete'
@@ -1213,7 +1247,8 @@ class MycroftSkill:
         with self.intent_service_lock:
             self.intent_service.register_adapt_regex(regex)
 
-    def speak(self, utterance, expect_response=False, wait=False, meta=None):
+    def speak(self, utterance, expect_response=False, wait=False, meta=None,
+              priority=None):
         """Speak a sentence.
 
         Args:
@@ -1224,6 +1259,10 @@ class MycroftSkill:
             wait (bool):            set to True to block while the text
                                     is being spoken.
             meta:                   Information of what built the sentence.
+            priority (str):         "high", "normal" or "low". High
+                                    priority speech interrupts other
+                                    speech, low priority speech is played
+                                    after everything else. Default normal.
         """
         # registers the skill as being active
         meta = meta or {}
@@ -1232,6 +1271,8 @@ class MycroftSkill:
         data = {'utterance': utterance,
                 'expect_response': expect_response,
                 'meta': meta}
+        if priority:
+            data['priority'] = priority
         message = dig_for_message()
         m = message.forward("speak", data) if message \
             else Message("speak", data)
@@ -1240,7 +1281,8 @@ class MycroftSkill:
         if wait:
             wait_while_speaking()
 
-    def speak_dialog(self, key, data=None, expect_response=False, wait=False):
+    def speak_dialog(self, key, data=None, expect_response=False, wait=False,
+                     priority=None):
         """ Speak a random sentence from a dialog file.
 
         Args:
@@ -1252,18 +1294,20 @@ class MycroftSkill:
                                     speaking the utterance.
             wait (bool):            set to True to block while the text
                                     is being spoken.
+            priority (str):         speech priority, see speak()
         """
         if self.dialog_renderer:
             data = data or {}
             self.speak(
                 self.dialog_renderer.render(key, data),
-                expect_response, wait, meta={'dialog': key, 'data': data}
+                expect_response, wait, meta={'dialog': key, 'data': data},
+                priority=priority
             )
         else:
             self.log.warning(
                 'dialog_render is None, does the locale/dialog folder exist?'
             )
-            self.speak(key, expect_response, wait, {})
+            self.speak(key, expect_response, wait, {}, priority=priority)
 
     def acknowledge(self):
         """Acknowledge a successful request.
@@ -1302,6 +1346,7 @@ class MycroftSkill:
             root_directory (str): root folder to use when loading files.
         """
         root_directory = root_directory or self.root_dir
+        self._resource_index = None  # Index the current resources
         self.init_dialog(root_directory)
         self.load_vocab_files(root_directory)
         self.load_regex_files(root_directory)
@@ -1322,15 +1367,9 @@ class MycroftSkill:
         else:
             LOG.debug('No vocab loaded')
 
-        # For each found intent register the default along with any aliases
-        for vocab_type in keywords:
-            for line in keywords[vocab_type]:
-                entity = line[0]
-                aliases = line[1:]
-                with self.intent_service_lock:
-                    self.intent_service.register_adapt_keyword(vocab_type,
-                                                               entity,
-                                                               aliases)
+        # Register the keywords along with any aliases in a single message
+        with self.intent_service_lock:
+            self.intent_service.register_adapt_keywords(keywords)
 
     def load_regex_files(self, root_directory):
         """ Load regex files found under the skill directory.
@@ -1346,9 +1385,8 @@ class MycroftSkill:
         elif exists(locale_dir):
             regexes = load_regex(locale_dir, self.skill_id)
 
-        for regex in regexes:
-            with self.intent_service_lock:
-                self.intent_service.register_adapt_regex(regex)
+        with self.intent_service_lock:
+            self.intent_service.register_adapt_regexes(regexes)
 
     def __handle_stop(self, _):
         """Handler for the "mycroft.stop" signal. Runs the user defined
@@ -1397,9 +1435,13 @@ class MycroftSkill:
         self.settings_change_callback = None
 
         # Store settings
-        if self.settings != self._initial_settings and Path(
-                self.root_dir).exists():
-            save_settings(self.settings_write_path, self.settings)
+        if Path(self.root_dir).exists():
+            if self.settings != self._initial_settings:
+                self._save_settings()
+            if isinstance(self.settings, SettingsStore):
+                self.settings.flush()
+        elif isinstance(self.settings, SettingsStore):
+            self.settings.cancel()
 
         if self.settings_meta:
             self.settings_meta.stop()
@@ -1408,8 +1450,12 @@ class MycroftSkill:
         self.gui.shutdown()
 
         # removing events
+        if self.public_api:
+            SkillApi.unregister_local(self.skill_id)
         self.event_scheduler.shutdown()
         self.events.clear()
+        if self.handler_executor:
+            self.handler_executor.shutdown()
 
         self.bus.emit(
             Message('detach_skill', {'skill_id': str(self.skill_id) + ':'}))
@@ -55,12 +55,14 @@ SkillSettings Usage Example:
         s.skill_settings['flower pot sayings'] = 'Not again...'
         s.save_settings()  # This happens automagically in a MycroftSkill
 """
+import hashlib
 import json
 import os
+from copy import deepcopy
 from os.path import dirname
 import re
 from pathlib import Path
-from threading import Timer
+from threading import Lock, Timer
 from xdg.BaseDirectory import xdg_cache_home
 
 import yaml
@@ -74,6 +76,12 @@ from mycroft.util.file_utils import ensure_directory_exists
 from .msm_wrapper import build_msm_config, create_msm
 
 ONE_MINUTE = 60
+# Seconds a changed setting may wait before being written to settings.json
+SETTINGS_WRITE_DELAY = 2.0
+# Seconds between downloads of the remote settings. The interval drops to the
+# minimum when settings change and doubles up to the maximum while they don't.
+DOWNLOAD_INTERVAL_MIN = 15
+DOWNLOAD_INTERVAL_MAX = 5 * ONE_MINUTE
 
 
 def get_local_settings(skill_dir, skill_name) -> dict:
@@ -96,24 +104,134 @@ def get_local_settings(skill_dir, skill_name) -> dict:
 
 
 def save_settings(skill_dir, skill_settings):
-    """Save skill settings to file."""
-    settings_path = Path(skill_dir).joinpath('settings.json')
+    """Save skill settings to file.
 
-    # Either the file already exists in /opt, or we are writing
-    # to XDG_CONFIG_DIR and always have the permission to make
-    # sure the file always exists
-    if not Path(settings_path).exists():
-        settings_path.touch(mode=0o644)
+    The settings are written to a temporary file replacing settings.json, so
+    the file is never left partially written.
+    """
+    settings_path = Path(skill_dir).joinpath('settings.json')
+    # Hidden, changes to it don't trigger a reload of the skill
+    tmp_path = settings_path.with_name('.settings.json.tmp')
+    try:
+        settings_file = open(str(tmp_path), 'w')
+    except PermissionError:
+        # The file may be writable in a directory that isn't (e.g. in /opt)
+        tmp_path = None
+        settings_file = open(str(settings_path), 'w')
 
-    with open(str(settings_path), 'w') as settings_file:
+    with settings_file:
         try:
             json.dump(skill_settings, settings_file)
         except Exception:
             LOG.exception('error saving skill settings to '
                           '{}'.format(settings_path))
-        else:
-            LOG.info('Skill settings successfully saved to '
-                     '{}' .format(settings_path))
+            settings_file.close()
+            if tmp_path is not None:
+                tmp_path.unlink()
+            return
+    if tmp_path is not None:
+        os.chmod(str(tmp_path), 0o644)
+        os.replace(str(tmp_path), str(settings_path))
+    LOG.info('Skill settings successfully saved to '
+             '{}' .format(settings_path))
+
+
+class SettingsStore(dict):
+    """Skill settings written to settings.json shortly after being changed.
+
+    Changes made through the dict methods schedule a write of the settings
+    within SETTINGS_WRITE_DELAY seconds, further changes in that time are
+    written along with them. Changes to nested values aren't detected,
+    save() schedules a write for those.
+
+    Args:
+        settings_dir (str): directory to write settings.json in
+        settings (dict): initial settings
+    """
+    def __init__(self, settings_dir, settings=None):
+        super().__init__(settings or {})
+        self.settings_dir = settings_dir
+        self._lock = Lock()
+        self._timer = None
+
+    @property
+    def dirty(self):
+        """True if changes are waiting to be written."""
+        return self._timer is not None
+
+    def save(self):
+        """Schedule writing the settings if not scheduled already."""
+        with self._lock:
+            if self._timer is None:
+                self._timer = Timer(SETTINGS_WRITE_DELAY, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write pending changes now."""
+        with self._lock:
+            if self._timer is None:
+                return
+            self._timer.cancel()
+            self._timer = None
+            try:
+                save_settings(self.settings_dir, dict(self))
+            except OSError:
+                LOG.exception('Failed to save skill settings to '
+                              '{}'.format(self.settings_dir))
+
+    def cancel(self):
+        """Drop pending changes without writing them."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.save()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.save()
+
+    def clear(self):
+        super().clear()
+        self.save()
+
+    def pop(self, key, *default):
+        present = key in self
+        value = super().pop(key, *default)
+        if present:
+            self.save()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self.save()
+        return item
+
+    def setdefault(self, key, default=None):
+        missing = key not in self
+        value = super().setdefault(key, default)
+        if missing:
+            self.save()
+        return value
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.save()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    # Copies are plain dicts, e.g. used to check for changes
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return deepcopy(dict(self), memo)
 
 
 def get_display_name(skill_name: str):
@@ -348,17 +466,33 @@ def save_remote_settings_cache(remote_settings):
         LOG.debug('Updated local cache of remote skill settings.')
 
 
+def _settings_hash(skill_settings):
+    """Hash identifying the remote settings of a skill."""
+    encoded = json.dumps(skill_settings, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+
 class SkillSettingsDownloader:
     """Manages download of skill settings.
 
     Performs settings download on a repeating Timer. If a change is seen
     the data is sent to the relevant skill.
+
+    Downloads are skipped by the backend if the settings are unchanged since
+    the last download (same ETag). Otherwise the settings of each skill are
+    compared by hash with the previous download, only skills with changed
+    settings are notified. The download interval shrinks to
+    DOWNLOAD_INTERVAL_MIN after a change, since users tend to change several
+    settings in a row, and grows towards DOWNLOAD_INTERVAL_MAX while nothing
+    changes.
     """
 
     def __init__(self, bus):
         self.bus = bus
         self.continue_downloading = True
         self.last_download_result = load_remote_settings_cache()
+        self.settings_etag = None
+        self.interval = ONE_MINUTE
 
         self.api = DeviceApi()
         self.download_timer = None
@@ -368,6 +502,19 @@ class SkillSettingsDownloader:
             LOG.info("Skill settings sync is disabled, backend settings will "
                      "not be downloaded")
 
+    @property
+    def last_download_result(self):
+        """Remote settings of the last download with changes."""
+        return self._last_download_result
+
+    @last_download_result.setter
+    def last_download_result(self, remote_settings):
+        self._last_download_result = remote_settings
+        self._skill_hashes = {
+            skill_gid: _settings_hash(skill_settings)
+            for skill_gid, skill_settings in remote_settings.items()
+        }
+
     def stop_downloading(self):
         """Stop synchronizing backend and core."""
         self.continue_downloading = False
@@ -378,21 +525,17 @@ class SkillSettingsDownloader:
     def download(self, message=None):
         """Download the settings stored on the backend and check for changes
 
-        When used as a messagebus handler a message is passed but not used.
+        When used as a messagebus handler a message is passed but not used,
+        other than to poll more often as settings are likely to change.
         """
         if not self.sync_enabled:
             return
+        settings_changed = False
         if is_paired():
             remote_settings = self._get_remote_settings()
             if remote_settings:
-                settings_changed = self.last_download_result != remote_settings
-                if settings_changed:
-                    LOG.debug('Skill settings changed since last download')
-                    self._emit_settings_change_events(remote_settings)
-                    self.last_download_result = remote_settings
-                    save_remote_settings_cache(remote_settings)
-                else:
-                    LOG.debug('No skill settings changes since last download')
+                settings_changed = self._handle_remote_settings(
+                    remote_settings)
         else:
             LOG.debug('Settings not downloaded - device is not paired')
         # If this method is called outside of the timer loop, ensure the
@@ -400,11 +543,43 @@ class SkillSettingsDownloader:
         if self.download_timer:
             self.download_timer.cancel()
 
+        if settings_changed or message is not None:
+            self.interval = DOWNLOAD_INTERVAL_MIN
+        else:
+            self.interval = min(self.interval * 2, DOWNLOAD_INTERVAL_MAX)
         if self.continue_downloading:
-            self.download_timer = Timer(ONE_MINUTE, self.download)
+            self.download_timer = Timer(self.interval, self.download)
             self.download_timer.daemon = True
             self.download_timer.start()
 
+    def _handle_remote_settings(self, remote_settings):
+        """Notify the skills whose settings changed since the last download.
+
+        Returns:
+            bool: True if any settings changed
+        """
+        etag = self.api.skill_settings_etag
+        if etag is not None and etag == self.settings_etag:
+            LOG.debug('No skill settings changes since last download')
+            return False
+        self.settings_etag = etag
+
+        previous_hashes = self._skill_hashes
+        changed_skills = [
+            skill_gid for skill_gid, skill_settings in remote_settings.items()
+            if previous_hashes.get(skill_gid) != _settings_hash(skill_settings)
+        ]
+        if not changed_skills and previous_hashes.keys() == \
+                remote_settings.keys():
+            LOG.debug('No skill settings changes since last download')
+            return False
+
+        LOG.debug('Skill settings changed since last download')
+        self._emit_settings_change_events(remote_settings, changed_skills)
+        self.last_download_result = remote_settings
+        save_remote_settings_cache(remote_settings)
+        return True
+
     def _get_remote_settings(self):
         """Get the settings for this skill from the server
 
@@ -419,22 +594,13 @@ class SkillSettingsDownloader:
 
         return remote_settings
 
-    def _emit_settings_change_events(self, remote_settings):
+    def _emit_settings_change_events(self, remote_settings, skill_gids):
         """Emit changed settings events for each affected skill."""
-        for skill_gid, skill_settings in remote_settings.items():
-            settings_changed = False
-            try:
-                previous_settings = self.last_download_result.get(skill_gid)
-            except Exception:
-                LOG.exception('error occurred handling setting change events')
-            else:
-                if previous_settings != skill_settings:
-                    settings_changed = True
-            if settings_changed:
-                log_msg = 'Emitting skill.settings.change event for skill {} '
-                LOG.info(log_msg.format(skill_gid))
-                message = Message(
-                    'mycroft.skills.settings.changed',
-                    data={skill_gid: skill_settings}
-                )
-                self.bus.emit(message)
+        for skill_gid in skill_gids:
+            log_msg = 'Emitting skill.settings.change event for skill {} '
+            LOG.info(log_msg.format(skill_gid))
+            message = Message(
+                'mycroft.skills.settings.changed',
+                data={skill_gid: remote_settings[skill_gid]}
+            )
+            self.bus.emit(message)
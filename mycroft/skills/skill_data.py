@@ -17,9 +17,10 @@
 
 import collections
 import csv
+import os
 import re
 from os import walk
-from os.path import splitext, join
+from os.path import exists, splitext, join
 
 from mycroft.util.format import expand_options
 from mycroft.util.log import LOG
@@ -47,6 +48,107 @@ def read_vocab_file(path):
     return vocab
 
 
+class VocabularyMatcher:
+    """Match utterances against the phrases of a vocabulary.
+
+    The phrases are compiled once into a single regular expression matching
+    any of them as complete words. Like in .voc files used for intents the
+    phrases may contain regular expression syntax.
+
+    Args:
+        phrases (list): flattened phrases of the vocabulary
+    """
+    def __init__(self, phrases):
+        self.phrases = list(phrases)
+        self._exact = {phrase.strip() for phrase in self.phrases}
+        if self.phrases:
+            self._regex = re.compile(r'\b(?:{})\b'.format(
+                '|'.join('(?:{})'.format(p) for p in self.phrases)))
+        else:
+            self._regex = None
+
+    def match(self, utt, exact=False):
+        """Check if the utterance contains one of the phrases.
+
+        Args:
+            utt (str): utterance to test
+            exact (bool): require the utterance to be one of the phrases
+
+        Returns:
+            bool: True if a phrase was found
+        """
+        if exact:
+            return utt in self._exact
+        return (self._regex is not None and
+                self._regex.search(utt) is not None)
+
+
+class ResourceIndex:
+    """Index of the resource files of a skill.
+
+    Directories are listed the first time a resource is looked up in them,
+    later lookups are answered from the listing. Files added to the skill
+    afterwards aren't found until a new index is created.
+
+    Args:
+        root_dir (str): skill directory
+    """
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self._listings = {}  # directory -> set of entries
+        self._locale = {}  # lang -> {file name: path}
+
+    def _listing(self, directory):
+        listing = self._listings.get(directory)
+        if listing is None:
+            try:
+                listing = frozenset(os.listdir(directory))
+            except OSError:
+                listing = frozenset()
+            self._listings[directory] = listing
+        return listing
+
+    def _in_directory(self, directory, res_name):
+        path = join(directory, res_name)
+        if os.sep in res_name or '/' in res_name:
+            # Nested names are rare, check the file system directly
+            return path if exists(path) else None
+        return path if res_name in self._listing(directory) else None
+
+    def _locale_files(self, lang):
+        files = self._locale.get(lang)
+        if files is None:
+            files = {}
+            for path, _, names in walk(join(self.root_dir, 'locale', lang)):
+                for name in names:
+                    files.setdefault(name, join(path, name))
+            self._locale[lang] = files
+        return files
+
+    def find(self, res_name, lang, res_dirname=None):
+        """Find a resource by name, lang and resource directory.
+
+        The old <res_dirname>/<lang>/ and <res_dirname>/ layouts are
+        searched before the locale/<lang>/ layout.
+
+        Args:
+            res_name (str): name of the resource file
+            lang (str): language of the resource
+            res_dirname (str): resource directory of the old layout, such as
+                               'dialog', 'vocab', 'regex' or 'ui'
+
+        Returns:
+            str: path of the resource, None if not found
+        """
+        if res_dirname:
+            for directory in (join(self.root_dir, res_dirname, lang),
+                              join(self.root_dir, res_dirname)):
+                path = self._in_directory(directory, res_name)
+                if path:
+                    return path
+        return self._locale_files(lang).get(res_name)
+
+
 def load_regex_from_file(path, skill_id):
     """Load regex from file
     The regex is sent to the intent handler using the message bus
@@ -0,0 +1,341 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Host processes running skills outside of the skills service process.
+
+All skills in the skills service share a single interpreter lock, a skill
+doing heavy computations slows down intent handling and every other skill.
+Skills can instead be placed in skill host processes, each with their own
+interpreter, communicating with the rest of the system over the messagebus
+like the skills in the skills service do.
+
+The hosts are forked from a fork server which has imported the skills
+framework and other commonly used modules once, so starting or restarting a
+host is fast.
+
+Hosts don't scan their skills for changes, the skills service watches the
+skill directories and asks the host to reload the skills that changed.
+"""
+from inspect import signature
+import multiprocessing
+import os
+import signal
+from threading import Event
+from time import monotonic
+
+import psutil
+
+from mycroft.messagebus import Message
+from mycroft.util.log import LOG
+from mycroft.util.process_utils import start_message_bus_client
+
+from .api import SkillApi
+from .fallback_skill import FallbackSkill
+from .skill_loader import SkillLoader
+
+# Modules imported by the fork server, shared by all hosts
+DEFAULT_PRELOAD = ['mycroft.skills', 'requests']
+# Seconds a host gets to shut down its skills before being killed
+STOP_TIMEOUT = 10
+# Seconds before restarting a crashed host, doubled for every restart
+RESTART_DELAY = 1
+RESTART_DELAY_MAX = 300
+# Crashed hosts are given up on after this many restarts in a row
+MAX_RESTARTS = 5
+# A host running this long before exiting is considered to have recovered
+STABLE_TIME = 600
+
+
+def converse(skill_loader, message):
+    """Let a loaded skill handle a converse request.
+
+    Args:
+        skill_loader (SkillLoader): loader of the skill
+        message (Message): the skill.converse.request message
+
+    Returns:
+        The result of the skill's converse method
+    """
+    # check the signature of a converse method to either pass a message or not
+    instance = skill_loader.instance
+    if len(signature(instance.converse).parameters) == 1:
+        return instance.converse(message=message)
+    else:
+        utterances = message.data['utterances']
+        lang = message.data['lang']
+        return instance.converse(utterances=utterances, lang=lang)
+
+
+class SkillHost:
+    """Load and manage the skills placed in a skill host process.
+
+    Args:
+        bus: messagebus connection of the host
+        host_id (int): number of the host
+        skill_directories (list): skills to run in this host
+    """
+    def __init__(self, bus, host_id, skill_directories):
+        self.bus = bus
+        self.host_id = host_id
+        self.skill_loaders = {
+            loader.skill_id: loader for loader in
+            (SkillLoader(bus, skill_dir) for skill_dir in skill_directories)
+        }
+        self.bus.on('skill.converse.request', self.handle_converse_request)
+        self.bus.on('skillmanager.deactivate', self.deactivate_skill)
+        self.bus.on('skillmanager.keep', self.deactivate_except)
+        self.bus.on('skillmanager.activate', self.activate_skill)
+        self.bus.on('skillmanager.host.reload', self.handle_reload)
+
+    def load(self):
+        """Load all skills of the host."""
+        for skill_loader in self.skill_loaders.values():
+            try:
+                skill_loader.load()
+            except Exception:
+                LOG.exception('Load of skill {} failed!'.format(
+                    skill_loader.skill_directory))
+            if isinstance(skill_loader.instance, FallbackSkill):
+                LOG.error('{} is a fallback skill, its fallbacks are only '
+                          'used if it runs in the skills service'.format(
+                              skill_loader.skill_id))
+
+    def reload_modified(self, skill_ids=None):
+        """Reload the skills of the host that changed on disk.
+
+        Args:
+            skill_ids (list): skills to check, defaults to all skills
+        """
+        for skill_id, skill_loader in self.skill_loaders.items():
+            if skill_ids is not None and skill_id not in skill_ids:
+                continue
+            try:
+                if skill_loader.reload_needed():
+                    skill_loader.reload()
+            except Exception:
+                LOG.exception('Unhandled exception occurred while '
+                              'reloading {}'.format(skill_loader.skill_id))
+
+    def handle_reload(self, message):
+        """Reload skills the skills service found modified."""
+        if message.data.get('host') == self.host_id:
+            self.reload_modified(message.data.get('skills'))
+
+    def shutdown(self):
+        """Shut down all skills of the host."""
+        for skill_loader in self.skill_loaders.values():
+            if skill_loader.instance is not None:
+                try:
+                    skill_loader.instance.default_shutdown()
+                except Exception:
+                    LOG.exception('Failed to shut down {}'.format(
+                        skill_loader.skill_id))
+
+    def handle_converse_request(self, message):
+        """Handle converse requests for skills of this host."""
+        skill_id = message.data['skill_id']
+        skill_loader = self.skill_loaders.get(skill_id)
+        if skill_loader is None:
+            return  # Skill runs in another process
+        if not skill_loader.loaded:
+            error = 'converse requested but skill not loaded'
+            self.bus.emit(message.reply('skill.converse.response',
+                                        dict(skill_id=skill_id, error=error)))
+            return
+        try:
+            result = converse(skill_loader, message)
+        except Exception:
+            error = 'exception in converse method'
+            LOG.exception(error)
+            data = dict(skill_id=skill_id, error=error)
+        else:
+            data = dict(skill_id=skill_id, result=result)
+        self.bus.emit(message.reply('skill.converse.response', data))
+
+    def deactivate_skill(self, message):
+        skill_loader = self.skill_loaders.get(message.data['skill'])
+        if skill_loader is not None:
+            skill_loader.deactivate()
+
+    def deactivate_except(self, message):
+        for skill_id, skill_loader in self.skill_loaders.items():
+            if skill_id != message.data['skill']:
+                skill_loader.deactivate()
+
+    def activate_skill(self, message):
+        for skill_id, skill_loader in self.skill_loaders.items():
+            if (message.data['skill'] in ('all', skill_id) and
+                    not skill_loader.active):
+                skill_loader.activate()
+
+
+def run_skill_host(host_id, skill_directories):
+    """Entry point of a skill host process.
+
+    Runs the skills until the process is terminated.
+
+    Args:
+        host_id (int): number of the host
+        skill_directories (list): skills to run in this host
+    """
+    stopping = Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    # Ctrl-C is handled by the skills service stopping the hosts
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    bus = start_message_bus_client('SKILL_HOST_{}'.format(host_id))
+    SkillApi.connect_bus(bus)
+    host = SkillHost(bus, host_id, skill_directories)
+    LOG.info('Skill host {} loading {} skills'.format(
+        host_id, len(skill_directories)))
+    host.load()
+    bus.emit(Message('skillmanager.host.loaded', {'host': host_id}))
+    stopping.wait()
+    LOG.info('Skill host {} shutting down'.format(host_id))
+    host.shutdown()
+    bus.close()
+
+
+class _Host:
+    """Skill host process as tracked by the pool."""
+    def __init__(self, process, skill_directories):
+        self.process = process
+        self.skill_directories = skill_directories
+        self.restarts = 0  # Since the host last ran stably
+        self.started = monotonic()
+        self.restart_at = None  # Time a crashed host is restarted
+        self.failed = False  # Crashed too often, not restarted anymore
+        try:
+            self.stats = psutil.Process(process.pid)
+            self.stats.cpu_percent()  # Start measuring
+        except psutil.Error:
+            self.stats = None
+
+
+class SkillHostPool:
+    """Start, monitor and restart the skill host processes.
+
+    Args:
+        preload (list): modules the fork server imports before forking
+                        the hosts
+    """
+    target = staticmethod(run_skill_host)
+
+    def __init__(self, preload=None):
+        self._context = multiprocessing.get_context('forkserver')
+        self._context.set_forkserver_preload(
+            DEFAULT_PRELOAD if preload is None else preload)
+        self.hosts = {}  # host id -> _Host
+
+    def start_host(self, host_id, skill_directories):
+        """Start a host running the provided skills.
+
+        A host already running with the same id is stopped first.
+
+        Args:
+            host_id (int): number of the host
+            skill_directories (list): skills to run in the host
+        """
+        old_host = self.hosts.get(host_id)
+        if old_host is not None:
+            self._stop_process(old_host.process)
+        process = self._context.Process(
+            target=self.target, args=(host_id, list(skill_directories)),
+            name='SkillHost{}'.format(host_id), daemon=True)
+        process.start()
+        LOG.info('Started skill host {} (pid {})'.format(
+            host_id, process.pid))
+        host = _Host(process, list(skill_directories))
+        if old_host is not None and not old_host.failed:
+            host.restarts = old_host.restarts + 1
+        self.hosts[host_id] = host
+
+    def restart_host(self, host_id):
+        """Restart a host with the same skills."""
+        self.start_host(host_id, self.hosts[host_id].skill_directories)
+
+    def stop_host(self, host_id):
+        """Stop a host, shutting down its skills."""
+        host = self.hosts.pop(host_id, None)
+        if host is not None:
+            self._stop_process(host.process)
+
+    def stop(self):
+        """Stop all hosts."""
+        for host_id in list(self.hosts):
+            self.stop_host(host_id)
+
+    def check(self):
+        """Restart hosts that have exited unexpectedly.
+
+        Crashed hosts are restarted with an exponentially growing delay and
+        given up on after MAX_RESTARTS restarts in a row.
+        """
+        for host_id, host in list(self.hosts.items()):
+            exitcode = host.process.exitcode
+            if exitcode is None or host.failed:
+                continue
+            if host.restart_at is None:
+                if monotonic() - host.started > STABLE_TIME:
+                    host.restarts = 0
+                if host.restarts >= MAX_RESTARTS:
+                    LOG.error('Skill host {} exited ({}) after {} restarts, '
+                              'giving up'.format(host_id, exitcode,
+                                                 host.restarts))
+                    host.failed = True
+                    continue
+                delay = min(RESTART_DELAY * 2 ** host.restarts,
+                            RESTART_DELAY_MAX)
+                LOG.error('Skill host {} exited ({}), restarting in {}s'
+                          .format(host_id, exitcode, delay))
+                host.restart_at = monotonic() + delay
+            elif monotonic() >= host.restart_at:
+                self.restart_host(host_id)
+
+    def status(self):
+        """Get the state and resource usage of the hosts.
+
+        Returns:
+            list: one dict per host
+        """
+        status = []
+        for host_id, host in sorted(self.hosts.items()):
+            entry = dict(
+                host=host_id, pid=host.process.pid,
+                alive=host.process.is_alive(), restarts=host.restarts,
+                failed=host.failed,
+                skills=[os.path.basename(skill_dir)
+                        for skill_dir in host.skill_directories],
+                memory=None, cpu_percent=None
+            )
+            if host.stats is not None and entry['alive']:
+                try:
+                    with host.stats.oneshot():
+                        entry['memory'] = host.stats.memory_info().rss
+                        entry['cpu_percent'] = host.stats.cpu_percent()
+                except psutil.Error:
+                    pass
+            status.append(entry)
+        return status
+
+    @staticmethod
+    def _stop_process(process):
+        if process.is_alive():
+            process.terminate()
+            process.join(STOP_TIMEOUT)
+            if process.is_alive():
+                LOG.warning('Skill host {} did not stop, killing it'.format(
+                    process.name))
+                process.kill()
+        process.join()
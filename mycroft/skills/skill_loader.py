@@ -13,19 +13,25 @@
 # limitations under the License.
 #
 """Periodically run by skill manager to load skills into memory."""
+from contextlib import contextmanager
 import gc
+import hashlib
 import importlib
 import os
 from os.path import dirname
 import sys
-from time import time
+from threading import Lock
+from time import monotonic, time
 
 from mycroft.configuration import Configuration
 from mycroft.messagebus import Message
 from mycroft.skills.settings import save_settings
 from mycroft.util.log import LOG
+from mycroft.version import CORE_VERSION_STR
 
+from .mycroft_skill.handler_executor import DEFAULT_WORKERS, HandlerExecutor
 from .settings import SettingsMetaUploader
+from .skill_manifest import load_manifest, ManifestRecorder, save_manifest
 
 SKILL_MAIN_MODULE = '__init__.py'
 
@@ -73,6 +79,17 @@ def load_skill_module(path, skill_id):
     return mod
 
 
+def _skill_id_from_gid(skill_gid):
+    """Extract the skill id from a skill_gid.
+
+    Modified skills are identified as "@<device id>|<skill id>", others as
+    "<skill id>|<branch>".
+    """
+    if skill_gid.startswith('@'):
+        return skill_gid.split('|', 1)[-1]
+    return skill_gid.split('|', 1)[0]
+
+
 def _bad_mod_times(mod_times):
     """Return all entries with modification time in the future.
 
@@ -86,6 +103,26 @@ def _bad_mod_times(mod_times):
     return [path for path in mod_times if mod_times[path] > current_time]
 
 
+def is_ignored_file(file_name):
+    """Check if changes to a file don't require the skill to be reloaded.
+
+    Compiled python files, hidden files and the settings.json file are
+    ignored.
+
+    Args:
+        file_name (str): base name of the file
+
+    Returns:
+        bool: True if the file should be ignored
+    """
+    return (
+        file_name.endswith('.pyc') or
+        file_name == 'settings.json' or
+        file_name.startswith('.') or
+        file_name.endswith('.qmlc')
+    )
+
+
 def _get_last_modified_time(path):
     """Get the last modified date of the most recently updated file in a path.
 
@@ -102,13 +139,7 @@ def _get_last_modified_time(path):
     for root_dir, dirs, files in os.walk(path):
         dirs[:] = [d for d in dirs if not d.startswith('.')]
         for f in files:
-            ignore_file = (
-                    f.endswith('.pyc') or
-                    f == 'settings.json' or
-                    f.startswith('.') or
-                    f.endswith('.qmlc')
-            )
-            if not ignore_file:
+            if not is_ignored_file(f):
                 all_files.append(os.path.join(root_dir, f))
 
     # check files of interest in the skill root directory
@@ -123,6 +154,74 @@ def _get_last_modified_time(path):
         return 0
 
 
+def get_skill_directory_hash(path, lang):
+    """Hash the names, sizes and modification times of the skill files.
+
+    The same files as for _get_last_modified_time() are included. The core
+    version and language are part of the hash since they affect what the
+    skill registers.
+
+    Args:
+        path: skill directory to hash
+        lang: language the skill is loaded for
+
+    Returns:
+        str: hex digest identifying the current state of the skill
+    """
+    digest = hashlib.sha1()
+    digest.update('{}\0{}\0'.format(CORE_VERSION_STR, lang).encode())
+    for root_dir, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for f in sorted(files):
+            if not is_ignored_file(f):
+                file_path = os.path.join(root_dir, f)
+                stat = os.stat(file_path)
+                digest.update('{}\0{}\0{}\0'.format(
+                    os.path.relpath(file_path, path), stat.st_size,
+                    stat.st_mtime_ns).encode())
+    return digest.hexdigest()
+
+
+class SkillLoadProfile:
+    """Time spent in each step of loading a skill.
+
+    The steps are importing the skill module, creating the skill instance
+    (including reading its settings.json), loading the data files,
+    initializing the skill (registering its intents and calling
+    initialize()) and handling its settings (first run and settingsmeta).
+    """
+    STEPS = ('import', 'create', 'data_files', 'initialize', 'settings')
+
+    def __init__(self):
+        self.times = dict.fromkeys(self.STEPS, 0.0)
+        self.intents = 0
+        self.vocab = 0
+
+    @contextmanager
+    def measure(self, step):
+        """Add the time spent in the with block to a step."""
+        start = monotonic()
+        try:
+            yield
+        finally:
+            self.times[step] += monotonic() - start
+
+    @property
+    def total(self):
+        return sum(self.times.values())
+
+    def serialize(self):
+        """Get the profile as a dict which can be sent over the bus."""
+        return dict(self.times, total=self.total, intents=self.intents,
+                    vocab=self.vocab)
+
+    def __str__(self):
+        steps = ', '.join('{} {:.2f}s'.format(step, self.times[step])
+                          for step in self.STEPS)
+        return '{:.2f}s ({}, {} intents, {} vocab)'.format(
+            self.total, steps, self.intents, self.vocab)
+
+
 class SkillLoader:
     def __init__(self, bus, skill_directory):
         self.bus = bus
@@ -135,6 +234,15 @@ class SkillLoader:
         self.instance = None
         self.active = True
         self.config = Configuration.get()
+        self.load_profile = None  # SkillLoadProfile of the last load
+        # Registered from its manifest, the skill hasn't been imported yet
+        self.lazy = False
+        self._manifest = None
+        self._lazy_handlers = []
+        self._activation_lock = Lock()
+        self._recorder = None
+        # Handlers the skill registered while loaded on demand
+        self._skill_handlers = {}
 
         self.modtime_error_log_written = False
 
@@ -179,12 +287,123 @@ class SkillLoader:
         LOG.info('ATTEMPTING TO RELOAD SKILL: ' + self.skill_id)
         if self.instance:
             self._unload()
+        elif self.lazy:
+            self._unregister_lazy()
         return self._load()
 
     def load(self):
         LOG.info('ATTEMPTING TO LOAD SKILL: ' + self.skill_id)
         return self._load()
 
+    @property
+    def lazy_loading(self):
+        """Boolean value telling if skills may be loaded on first use."""
+        return self.config['skills'].get('lazy_loading', False)
+
+    def _create_handler_executor(self):
+        """Create the executor for the skill's handlers from the config.
+
+        Returns:
+            HandlerExecutor: the executor, None if disabled
+        """
+        config = self.config['skills'].get('handler_executor', {})
+        workers = config.get('workers', DEFAULT_WORKERS)
+        if workers <= 0:
+            return None
+        return HandlerExecutor(self.skill_id, workers,
+                               config.get('max_queued', 50))
+
+    def load_lazily(self):
+        """Register the skill from its cached manifest without importing it.
+
+        The skill is loaded the first time one of its intents is triggered
+        or another event addressed to it arrives.
+
+        Returns:
+            bool: True if the skill was registered, False if it needs to be
+                  loaded normally
+        """
+        if not self.lazy_loading or self.is_blacklisted:
+            return False
+        try:
+            directory_hash = get_skill_directory_hash(self.skill_directory,
+                                                      self.config['lang'])
+        except OSError:
+            return False
+        manifest = load_manifest(self.skill_id, directory_hash)
+        if not (manifest and manifest['lazy']):
+            return False
+
+        self._prepare_for_load()
+        self._manifest = manifest
+        for msg_type, data in manifest['messages']:
+            self.bus.emit(Message(msg_type, data))
+        handlers = [(event, self._activate) for event in manifest['triggers']]
+        handlers += [
+            ('mycroft.skills.settings.changed', self._activate_if_addressed),
+            ('mycroft.skill.enable_intent', self._activate_if_addressed),
+            ('mycroft.skill.disable_intent', self._activate_if_addressed)
+        ]
+        for event, handler in handlers:
+            self.bus.on(event, handler)
+        self._lazy_handlers = handlers
+        self.lazy = True
+        self.last_loaded = time()
+        self.bus.emit(Message(
+            'mycroft.skills.loaded',
+            data=dict(path=self.skill_directory, id=self.skill_id,
+                      name=manifest['name'], modified=self.last_modified,
+                      lazy=True)
+        ))
+        LOG.info('Skill {} registered from manifest, it will be loaded on '
+                 'first use'.format(self.skill_id))
+        return True
+
+    def _activate_if_addressed(self, message):
+        """Load a lazy skill if a system event concerns it."""
+        if message.msg_type == 'mycroft.skills.settings.changed':
+            addressed = any(_skill_id_from_gid(skill_gid) == self.skill_id
+                            for skill_gid in message.data)
+        else:
+            intent_names = [data['name'].split(':')[-1]
+                            for msg_type, data in self._manifest['messages']
+                            if msg_type in ('register_intent',
+                                            'padatious:register_intent')]
+            addressed = message.data.get('intent_name') in intent_names
+        if addressed:
+            self._activate(message)
+
+    def _activate(self, message):
+        """Load a lazy skill and pass on the message that triggered it."""
+        with self._activation_lock:
+            if self.lazy:
+                LOG.info('Loading {} on demand ({})'.format(
+                    self.skill_id, message.msg_type))
+                self._remove_lazy_handlers()
+                if not self._load():
+                    # Don't leave intents around that no one handles
+                    self.bus.emit(Message('detach_skill',
+                                          {'skill_id': self.skill_id + ':'}))
+        if self.loaded:
+            # The skill wasn't listening yet when the message arrived, pass
+            # it to the skill's own handlers without broadcasting it again
+            for handler in self._skill_handlers.get(message.msg_type, []):
+                handler(message)
+
+    def _remove_lazy_handlers(self):
+        for event, handler in self._lazy_handlers:
+            self.bus.remove(event, handler)
+        self._lazy_handlers = []
+        self.lazy = False
+
+    def _unregister_lazy(self):
+        """Remove the registrations made from the manifest."""
+        with self._activation_lock:
+            self._remove_lazy_handlers()
+        self._manifest = None
+        self.bus.emit(Message('detach_skill',
+                              {'skill_id': self.skill_id + ':'}))
+
     def _unload(self):
         """Remove listeners and stop threads before loading"""
         self._execute_instance_shutdown()
@@ -196,6 +415,8 @@ class SkillLoader:
     def unload(self):
         if self.instance:
             self._execute_instance_shutdown()
+        elif self.lazy:
+            self._unregister_lazy()
         self.loaded = False
 
     def activate(self):
@@ -237,18 +458,26 @@ class SkillLoader:
 
     def _load(self):
         self._prepare_for_load()
+        profile = self.load_profile = SkillLoadProfile()
         if self.is_blacklisted:
             self._skip_load()
         else:
-            skill_module = self._load_skill_source()
+            with profile.measure('import'):
+                skill_module = self._load_skill_source()
             if skill_module and self._create_skill_instance(skill_module):
-                self._check_for_first_run()
+                self._save_manifest()
+                with profile.measure('settings'):
+                    self._check_for_first_run()
                 self.loaded = True
 
         self.last_loaded = time()
         self._communicate_load_status()
         if self.loaded:
-            self._prepare_settings_meta()
+            with profile.measure('settings'):
+                self._prepare_settings_meta()
+            intent_service = self.instance.intent_service
+            profile.intents = len(intent_service.registered_intents)
+            profile.vocab = intent_service.vocab_count
         return self.loaded
 
     def _prepare_settings_meta(self):
@@ -260,6 +489,8 @@ class SkillLoader:
         self.load_attempted = True
         self.loaded = False
         self.instance = None
+        self._recorder = None
+        self._skill_handlers = {}
 
     def _skip_load(self):
         log_msg = 'Skill {} is blacklisted - it will not be loaded'
@@ -288,8 +519,10 @@ class SkillLoader:
 
     def _create_skill_instance(self, skill_module):
         """Use v2 skills framework to create the skill."""
+        profile = self.load_profile
         try:
-            self.instance = skill_module.create_skill()
+            with profile.measure('create'):
+                self.instance = skill_module.create_skill()
         except Exception as e:
             log_msg = 'Skill __init__ failed with {}'
             LOG.exception(log_msg.format(repr(e)))
@@ -297,14 +530,28 @@ class SkillLoader:
 
         if self.instance:
             self.instance.skill_id = self.skill_id
-            self.instance.bind(self.bus)
+            bus = self.bus
+            if self.lazy_loading:
+                # Record the registrations for the manifest, skipping those
+                # already made from the manifest
+                suppress = self._manifest['messages'] if self._manifest else []
+                self._manifest = None
+                self._recorder = ManifestRecorder(self.bus, self.skill_id,
+                                                  suppress)
+                bus = self._recorder
+            executor = self._create_handler_executor()
+            if executor is not None:
+                self.instance.set_handler_executor(executor)
+            self.instance.bind(bus)
             try:
-                self.instance.load_data_files()
-                # Set up intent handlers
-                # TODO: can this be a public method?
-                self.instance._register_decorated()
-                self.instance.register_resting_screen()
-                self.instance.initialize()
+                with profile.measure('data_files'):
+                    self.instance.load_data_files()
+                with profile.measure('initialize'):
+                    # Set up intent handlers
+                    # TODO: can this be a public method?
+                    self.instance._register_decorated()
+                    self.instance.register_resting_screen()
+                    self.instance.initialize()
             except Exception as e:
                 # If an exception occurs, make sure to clean up the skill
                 self.instance.default_shutdown()
@@ -314,6 +561,42 @@ class SkillLoader:
 
         return self.instance is not None
 
+    def _save_manifest(self):
+        """Store what the skill registered while being initialized."""
+        if self._recorder is None:
+            return
+        self._recorder.stop()
+        try:
+            directory_hash = get_skill_directory_hash(self.skill_directory,
+                                                      self.config['lang'])
+        except OSError:
+            pass
+        else:
+            manifest = self._recorder.create_manifest(directory_hash,
+                                                      self.instance.name)
+            save_manifest(self.skill_id, manifest)
+        finally:
+            self._unwrap_recorder()
+
+    def _unwrap_recorder(self):
+        """Point the skill at the messagebus instead of the recorder.
+
+        Objects the skill created itself keep the recorder, it passes
+        everything on once stopped.
+        """
+        recorder, self._recorder = self._recorder, None
+        self._skill_handlers = recorder.handlers
+        instance = self.instance
+        if getattr(instance, '_bus', None) is recorder:
+            instance._bus = self.bus
+        for user in ('events', 'intent_service', 'event_scheduler'):
+            obj = getattr(instance, user, None)
+            if getattr(obj, 'bus', None) is recorder:
+                obj.set_bus(self.bus)
+        enclosure = getattr(instance, '_enclosure', None)
+        if getattr(enclosure, 'bus', None) is recorder:
+            enclosure.bus = self.bus
+
     def _check_for_first_run(self):
         """The very first time a skill is run, speak the intro."""
         first_run = self.instance.settings.get(
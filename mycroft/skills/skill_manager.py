@@ -14,10 +14,10 @@
 #
 """Load, update and manage skills on this device."""
 import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from glob import glob
 from threading import Thread, Event, Lock
 from time import sleep, time, monotonic
-from inspect import signature
 
 from mycroft.api import is_paired
 from mycroft.enclosure.api import EnclosureAPI
@@ -26,10 +26,21 @@ from mycroft.messagebus.message import Message
 from mycroft.util.log import LOG
 from .msm_wrapper import create_msm as msm_creator, build_msm_config
 from .settings import SkillSettingsDownloader
+from .skill_host import converse, SkillHostPool
 from .skill_loader import SkillLoader
+from .skill_manifest import REGISTRATION_MESSAGES
 from .skill_updater import SkillUpdater
+from .skill_watcher import SkillDirectoryWatcher
 
 SKILL_MAIN_MODULE = '__init__.py'
+# Default number of threads loading skills in parallel at startup
+DEFAULT_LOAD_WORKERS = 4
+# Default number of seconds startup waits for a single skill to load
+DEFAULT_LOAD_TIMEOUT = 60
+# Number of skills listed in the load time summary logged at startup
+SLOWEST_SKILLS_LOGGED = 5
+# Seconds to wait for the skill hosts to load their skills on startup
+HOST_LOAD_TIMEOUT = 60
 
 
 class UploadQueue:
@@ -86,6 +97,75 @@ class UploadQueue:
             self._queue.append(loader)
 
 
+# Messages a loading skill emits that are held back until its turn comes
+DEFERRED_MESSAGES = REGISTRATION_MESSAGES + (
+    'detach_skill',
+    'mycroft.skills.loaded',
+    'mycroft.skills.loading_failure'
+)
+
+
+class DeferredBus:
+    """Messagebus wrapper holding back registrations until released.
+
+    Skills loaded in parallel wrap the bus in a DeferredBus so that the
+    registrations they emit reach the bus in the same order regardless of
+    which skill finishes loading first. Only the message types in
+    DEFERRED_MESSAGES are held back, anything else, like a request made
+    from initialize() waiting for an answer, is passed straight to the
+    wrapped bus.
+
+    Args:
+        bus: messagebus connection to wrap
+    """
+    def __init__(self, bus):
+        self._bus = bus
+        self._lock = Lock()
+        self._buffer = []
+        self._released = False
+
+    def emit(self, message):
+        if getattr(message, 'msg_type', None) not in DEFERRED_MESSAGES:
+            self._bus.emit(message)
+            return
+        with self._lock:
+            if not self._released:
+                self._buffer.append(message)
+                return
+        self._bus.emit(message)
+
+    def release(self):
+        """Emit the held back messages and pass further messages through."""
+        with self._lock:
+            for message in self._buffer:
+                self._bus.emit(message)
+            self._buffer = []
+            self._released = True
+
+    def __getattr__(self, attr):
+        return getattr(self._bus, attr)
+
+
+class _LoadTask:
+    """Load of a single skill on the startup thread pool."""
+    def __init__(self, loader, bus):
+        self.loader = loader
+        self.bus = bus
+        self.start_time = None
+        self.future = None
+        self.lazy = False  # Registered from the manifest, not loaded yet
+
+    def run(self):
+        self.start_time = monotonic()
+        try:
+            self.lazy = self.loader.load_lazily()
+            return self.lazy or self.loader.load()
+        except Exception:
+            LOG.exception('Load of skill {} failed!'.format(
+                self.loader.skill_directory))
+            return False
+
+
 def _shutdown_skill(instance):
     """Shutdown a skill.
 
@@ -135,6 +215,14 @@ class SkillManager(Thread):
         self.settings_downloader = SkillSettingsDownloader(self.bus)
 
         self.empty_skill_dirs = set()  # Save a record of empty skill dirs.
+        # Notifies about changed skills, None when scanning periodically
+        self._watcher = None
+        self._skill_dirs = None  # Skill directories found by the last scan
+        # Skills placed in skill host processes, skill dir -> host id
+        self.skill_hosts = None
+        self._hosted_skills = {}
+        # host id -> Event set when the host has loaded its skills
+        self._hosts_loaded = {}
 
         # Statuses
         self._alive_status = False  # True after priority skills has loaded
@@ -161,6 +249,12 @@ class SkillManager(Thread):
         self.bus.on('skillmanager.deactivate', self.deactivate_skill)
         self.bus.on('skillmanager.keep', self.deactivate_except)
         self.bus.on('skillmanager.activate', self.activate_skill)
+        self.bus.on('skillmanager.load.report', self.send_load_report)
+        self.bus.on('skillmanager.handlers.metrics',
+                    self.send_handler_metrics)
+        self.bus.on('skillmanager.hosts', self.send_host_status)
+        self.bus.on('skillmanager.host.restart', self.restart_skill_host)
+        self.bus.on('skillmanager.host.loaded', self._handle_host_loaded)
         self.bus.on('mycroft.paired', self.handle_paired)
         self.bus.on(
             'mycroft.skills.settings.update',
@@ -228,6 +322,7 @@ class SkillManager(Thread):
     def run(self):
         """Load skills and update periodically from disk and internet."""
         self._remove_git_locks()
+        self._watcher = self._start_skill_watcher()
         self._connected_event.wait()
         if (not self.skill_updater.defaults_installed() and
                 self.skills_config["auto_update"]):
@@ -244,9 +339,9 @@ class SkillManager(Thread):
         # unload the existing version from memory and reload from the disk.
         while not self._stop_event.is_set():
             try:
-                self._unload_removed_skills()
-                self._reload_modified_skills()
-                self._load_new_skills()
+                self._scan_skills()
+                if self.skill_hosts is not None:
+                    self.skill_hosts.check()
                 self._update_skills()
                 if (is_paired() and self.upload_queue.started and
                         len(self.upload_queue) > 0):
@@ -262,6 +357,52 @@ class SkillManager(Thread):
                               'hit.')
                 sleep(30)
 
+    def _start_skill_watcher(self):
+        """Start watching the skill directories for changes.
+
+        Returns:
+            SkillDirectoryWatcher or None if skills should be scanned
+            periodically instead.
+        """
+        if not self.skills_config.get('watch_skills', True):
+            return None
+        try:
+            watcher = SkillDirectoryWatcher(
+                self.msm.skills_dir, self.skills_config.get('watch_debounce',
+                                                            2.0))
+            watcher.start()
+        except OSError as e:
+            LOG.info('Skill directories will be scanned periodically, '
+                     'watching them failed ({})'.format(repr(e)))
+            return None
+        if watcher.failed:
+            watcher.stop()
+            return None
+        return watcher
+
+    def _scan_skills(self):
+        """Unload, reload and load skills changed on disk."""
+        if self._watcher is not None and self._watcher.failed:
+            LOG.warning('Skill watcher failed, falling back to scanning '
+                        'the skill directories periodically')
+            self._watcher.stop()
+            self._watcher = None
+
+        if self._watcher is None:
+            skill_dirs = self._get_skill_directories()
+            modified = skill_dirs
+        else:
+            skills_changed, modified = self._watcher.collect()
+            if skills_changed or self._skill_dirs is None:
+                self._skill_dirs = self._get_skill_directories()
+            skill_dirs = self._skill_dirs
+            modified = [skill_dir for skill_dir in modified
+                        if skill_dir in skill_dirs]
+
+        self._unload_removed_skills(skill_dirs)
+        self._reload_modified_skills(modified)
+        self._load_new_skills(skill_dirs)
+
     def _remove_git_locks(self):
         """If git gets killed from an abrupt shutdown it leaves lock files."""
         for i in glob(os.path.join(self.msm.skills_dir, '*/.git/index.lock')):
@@ -271,14 +412,79 @@ class SkillManager(Thread):
     def _load_on_startup(self):
         """Handle initial skill load."""
         LOG.info('Loading installed skills...')
-        self._load_new_skills()
+        skill_dirs = [skill_dir for skill_dir in self._get_skill_directories()
+                      if skill_dir not in self.skill_loaders]
+        local_skill_dirs = []
+        for skill_dir in skill_dirs:
+            host_id = self._host_for(skill_dir)
+            if host_id:
+                self._hosted_skills[skill_dir] = host_id
+            else:
+                local_skill_dirs.append(skill_dir)
+        self._load_skills_in_parallel(local_skill_dirs)
+        host_ids = set(self._hosted_skills.values())
+        for host_id in host_ids:
+            self._start_skill_host(host_id)
+        self._wait_for_hosts(host_ids)
         LOG.info("Skills all loaded!")
         self.bus.emit(Message('mycroft.skills.initialized'))
         self._loaded_status = True
+        self._log_load_summary()
+
+    def _load_report(self):
+        """Get the load time profiles of the skills, slowest first."""
+        report = []
+        for loader in list(self.skill_loaders.values()):
+            if loader.load_profile is not None:
+                report.append(dict(loader.load_profile.serialize(),
+                                   id=loader.skill_id, loaded=loader.loaded))
+        return sorted(report, key=lambda entry: entry['total'], reverse=True)
+
+    def _log_load_summary(self):
+        """Log the skills that took the longest to load."""
+        loaders = [loader for loader in self.skill_loaders.values()
+                   if loader.load_profile is not None]
+        loaders.sort(key=lambda loader: loader.load_profile.total,
+                     reverse=True)
+        if loaders:
+            LOG.info('Slowest skills to load:\n' + '\n'.join(
+                '    {}: {}'.format(loader.skill_id, loader.load_profile)
+                for loader in loaders[:SLOWEST_SKILLS_LOGGED]))
+
+    def send_load_report(self, message):
+        """Send the load time profile of each skill, slowest first."""
+        try:
+            self.bus.emit(message.response({'skills': self._load_report()}))
+        except Exception:
+            LOG.exception('Failed to send skill load report')
 
-    def _reload_modified_skills(self):
-        """Handle reload of recently changed skill(s)"""
-        for skill_dir in self._get_skill_directories():
+    def send_handler_metrics(self, message):
+        """Send the queue depths and handler wait times of each skill."""
+        try:
+            metrics = {}
+            for loader in list(self.skill_loaders.values()):
+                instance = loader.instance
+                executor = getattr(instance, 'handler_executor', None)
+                if executor is not None:
+                    metrics[loader.skill_id] = executor.metrics()
+            self.bus.emit(message.response({'skills': metrics}))
+        except Exception:
+            LOG.exception('Failed to send handler metrics')
+
+    def _reload_modified_skills(self, skill_dirs=None):
+        """Handle reload of recently changed skill(s)
+
+        Args:
+            skill_dirs (list): skill directories to check, defaults to all
+        """
+        if skill_dirs is None:
+            skill_dirs = self._get_skill_directories()
+        hosted = {}  # host id -> skills to check
+        for skill_dir in skill_dirs:
+            if skill_dir in self._hosted_skills:
+                hosted.setdefault(self._hosted_skills[skill_dir], []).append(
+                    os.path.basename(skill_dir))
+                continue
             try:
                 skill_loader = self.skill_loaders.get(skill_dir)
                 if skill_loader is not None and skill_loader.reload_needed():
@@ -288,14 +494,168 @@ class SkillManager(Thread):
             except Exception:
                 LOG.exception('Unhandled exception occured while '
                               'reloading {}'.format(skill_dir))
+        # Skill hosts reload their own skills
+        for host_id, skill_ids in hosted.items():
+            self.bus.emit(Message('skillmanager.host.reload',
+                                  {'host': host_id, 'skills': skill_ids}))
+
+    def _load_new_skills(self, skill_dirs=None):
+        """Handle load of skills installed since startup.
 
-    def _load_new_skills(self):
-        """Handle load of skills installed since startup."""
-        for skill_dir in self._get_skill_directories():
-            if skill_dir not in self.skill_loaders:
+        Args:
+            skill_dirs (list): skill directories found on disk
+        """
+        if skill_dirs is None:
+            skill_dirs = self._get_skill_directories()
+        changed_hosts = set()
+        for skill_dir in skill_dirs:
+            if (skill_dir in self.skill_loaders or
+                    skill_dir in self._hosted_skills):
+                continue
+            host_id = self._host_for(skill_dir)
+            if host_id:
+                self._hosted_skills[skill_dir] = host_id
+                changed_hosts.add(host_id)
+            else:
                 loader = self._load_skill(skill_dir)
                 if loader:
                     self.upload_queue.put(loader)
+        for host_id in changed_hosts:
+            self._start_skill_host(host_id)
+
+    def _host_for(self, skill_dir):
+        """Get the skill host a skill is placed in.
+
+        Returns:
+            int: host id, None for skills running in this process
+        """
+        hosts_config = self.skills_config.get('hosts', {})
+        host_id = hosts_config.get('placement', {}).get(
+            os.path.basename(skill_dir))
+        if host_id and 1 <= host_id <= hosts_config.get('count', 0):
+            return host_id
+        return None
+
+    def _start_skill_host(self, host_id):
+        """(Re)start a skill host with the skills placed in it."""
+        if self.skill_hosts is None:
+            preload = self.skills_config.get('hosts', {}).get('preload')
+            self.skill_hosts = SkillHostPool(preload)
+        skill_dirs = sorted(skill_dir for skill_dir, host
+                            in self._hosted_skills.items() if host == host_id)
+        if skill_dirs:
+            self._hosts_loaded[host_id] = Event()
+            self.skill_hosts.start_host(host_id, skill_dirs)
+        else:
+            self.skill_hosts.stop_host(host_id)
+
+    def _handle_host_loaded(self, message):
+        """Note that a skill host has loaded its skills."""
+        loaded = self._hosts_loaded.get(message.data.get('host'))
+        if loaded is not None:
+            loaded.set()
+
+    def _wait_for_hosts(self, host_ids):
+        """Wait until the skill hosts have loaded their skills.
+
+        Hosts exiting or taking longer than HOST_LOAD_TIMEOUT altogether
+        are not waited for.
+        """
+        deadline = monotonic() + HOST_LOAD_TIMEOUT
+        for host_id in sorted(host_ids):
+            loaded = self._hosts_loaded.get(host_id)
+            host = self.skill_hosts.hosts.get(host_id)
+            if loaded is None or host is None:
+                continue
+            while not loaded.wait(0.5):
+                if not host.process.is_alive():
+                    LOG.error('Skill host {} exited while loading '
+                              'skills'.format(host_id))
+                    break
+                if monotonic() > deadline:
+                    LOG.warning('Skill host {} is still loading '
+                                'skills'.format(host_id))
+                    break
+
+    def _order_skill_directories(self, skill_dirs):
+        """Sort skill directories, priority skills first."""
+        priority_skills = self.skills_config.get('priority_skills', [])
+
+        def sort_key(skill_dir):
+            name = os.path.basename(skill_dir)
+            if name in priority_skills:
+                return (0, priority_skills.index(name), skill_dir)
+            return (1, 0, skill_dir)
+
+        return sorted(skill_dirs, key=sort_key)
+
+    def _load_skills_in_parallel(self, skill_dirs):
+        """Load skills on a bounded thread pool.
+
+        Priority skills are submitted first. The bus messages emitted while
+        loading are held back and released in submission order, keeping the
+        registrations deterministic. A skill that doesn't load within
+        "load_timeout" seconds no longer holds up startup, it finishes
+        loading in the background.
+
+        Args:
+            skill_dirs (list): skill directories to load
+        """
+        workers = self.skills_config.get('load_workers',
+                                         DEFAULT_LOAD_WORKERS)
+        timeout = self.skills_config.get('load_timeout', DEFAULT_LOAD_TIMEOUT)
+        executor = ThreadPoolExecutor(max_workers=max(1, workers),
+                                      thread_name_prefix='SkillLoad')
+        tasks = []
+        for skill_dir in self._order_skill_directories(skill_dirs):
+            bus = DeferredBus(self.bus)
+            loader = SkillLoader(bus, skill_dir)
+            self.skill_loaders[skill_dir] = loader
+            task = _LoadTask(loader, bus)
+            task.future = executor.submit(task.run)
+            tasks.append(task)
+
+        for task in tasks:
+            if self._wait_for_load(task, timeout):
+                if not task.lazy:
+                    self.upload_queue.put(task.loader)
+            elif not task.future.done():
+                task.future.add_done_callback(self._late_load_done(task))
+            task.bus.release()
+        # Skills that timed out keep loading on their thread
+        executor.shutdown(wait=False)
+
+    def _late_load_done(self, task):
+        """Create callback handling a skill loaded after its timeout."""
+        def load_done(future):
+            if future.result():
+                LOG.info('{} finished loading late'.format(
+                    task.loader.skill_id))
+                if not task.lazy:
+                    self.upload_queue.put(task.loader)
+        return load_done
+
+    def _wait_for_load(self, task, timeout):
+        """Wait until a skill has loaded or exceeded its load time.
+
+        Returns:
+            bool: True if the skill was loaded successfully
+        """
+        while True:
+            start_time = task.start_time
+            if start_time is None:
+                # Still queued behind other skills
+                remaining = timeout
+            else:
+                remaining = max(0, start_time + timeout - monotonic())
+            try:
+                return bool(task.future.result(timeout=remaining))
+            except TimeoutError:
+                if task.start_time is not None:
+                    LOG.warning('{} did not load within {} seconds, '
+                                'continuing startup'.format(
+                                    task.loader.skill_id, timeout))
+                    return False
 
     def _load_skill(self, skill_directory):
         skill_loader = SkillLoader(self.bus, skill_directory)
@@ -328,9 +688,14 @@ class SkillManager(Thread):
 
         return skill_directories
 
-    def _unload_removed_skills(self):
-        """Shutdown removed skills."""
-        skill_dirs = self._get_skill_directories()
+    def _unload_removed_skills(self, skill_dirs=None):
+        """Shutdown removed skills.
+
+        Args:
+            skill_dirs (list): skill directories found on disk
+        """
+        if skill_dirs is None:
+            skill_dirs = self._get_skill_directories()
         # Find loaded skills that don't exist on disk
         removed_skills = [
             s for s in self.skill_loaders.keys() if s not in skill_dirs
@@ -344,6 +709,13 @@ class SkillManager(Thread):
                 LOG.exception('Failed to shutdown skill ' + skill.id)
             del self.skill_loaders[skill_dir]
 
+        removed_hosted = [skill_dir for skill_dir in self._hosted_skills
+                          if skill_dir not in skill_dirs]
+        for host_id in {self._hosted_skills.pop(skill_dir)
+                        for skill_dir in removed_hosted}:
+            self._start_skill_host(host_id)
+        removed_skills += removed_hosted
+
         # If skills were removed make sure to update the manifest on the
         # mycroft backend.
         if removed_skills:
@@ -372,9 +744,17 @@ class SkillManager(Thread):
             message_data = {}
             for skill_dir, skill_loader in self.skill_loaders.items():
                 message_data[skill_loader.skill_id] = dict(
-                    active=skill_loader.active and skill_loader.loaded,
+                    active=skill_loader.active and (skill_loader.loaded or
+                                                    skill_loader.lazy),
                     id=skill_loader.skill_id
                 )
+            for skill_dir, host_id in self._hosted_skills.items():
+                host = self.skill_hosts.hosts.get(host_id)
+                skill_id = os.path.basename(skill_dir)
+                message_data[skill_id] = dict(
+                    active=host is not None and host.process.is_alive(),
+                    id=skill_id
+                )
             self.bus.emit(Message('mycroft.skills.list', data=message_data))
         except Exception:
             LOG.exception('Failed to send skill list')
@@ -394,7 +774,8 @@ class SkillManager(Thread):
             skill_to_keep = message.data['skill']
             LOG.info('Deactivating all skills except {}'.format(skill_to_keep))
             loaded_skill_file_names = [
-                os.path.basename(skill_dir) for skill_dir in self.skill_loaders
+                os.path.basename(skill_dir) for skill_dir in
+                list(self.skill_loaders) + list(self._hosted_skills)
             ]
             if skill_to_keep in loaded_skill_file_names:
                 for skill in self.skill_loaders.values():
@@ -418,6 +799,8 @@ class SkillManager(Thread):
     def stop(self):
         """Tell the manager to shutdown."""
         self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.stop()
         self.settings_downloader.stop_downloading()
         self.upload_queue.stop()
 
@@ -425,6 +808,20 @@ class SkillManager(Thread):
         for skill_loader in self.skill_loaders.values():
             if skill_loader.instance is not None:
                 _shutdown_skill(skill_loader.instance)
+        if self.skill_hosts is not None:
+            self.skill_hosts.stop()
+
+    def send_host_status(self, message):
+        """Send the state and resource usage of the skill hosts."""
+        hosts = self.skill_hosts.status() if self.skill_hosts else []
+        self.bus.emit(message.response({'hosts': hosts}))
+
+    def restart_skill_host(self, message):
+        """Restart a skill host on request."""
+        host_id = message.data.get('host')
+        if self.skill_hosts is not None and host_id in self.skill_hosts.hosts:
+            LOG.info('Restarting skill host {}'.format(host_id))
+            self.skill_hosts.restart_host(host_id)
 
     def handle_converse_request(self, message):
         """Check if the targeted skill id can handle conversation
@@ -432,6 +829,9 @@ class SkillManager(Thread):
         If supported, the conversation is invoked.
         """
         skill_id = message.data['skill_id']
+        if skill_id in [os.path.basename(skill_dir)
+                        for skill_dir in self._hosted_skills]:
+            return  # Handled by the skill host
 
         # loop trough skills list and call converse for skill with skill_id
         skill_found = False
@@ -443,17 +843,7 @@ class SkillManager(Thread):
                     self._emit_converse_error(message, skill_id, error_message)
                     break
                 try:
-                    # check the signature of a converse method
-                    # to either pass a message or not
-                    if len(signature(
-                            skill_loader.instance.converse).parameters) == 1:
-                        result = skill_loader.instance.converse(
-                            message=message)
-                    else:
-                        utterances = message.data['utterances']
-                        lang = message.data['lang']
-                        result = skill_loader.instance.converse(
-                            utterances=utterances, lang=lang)
+                    result = converse(skill_loader, message)
                     self._emit_converse_response(result, message, skill_loader)
                 except Exception:
                     error_message = 'exception in converse method'
@@ -0,0 +1,205 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Cached intent manifests allowing skills to be loaded on first use.
+
+While a skill is initialized the messages it emits and the bus events it
+listens to are recorded.  If the skill only registered intents and vocabulary
+and listens to events addressed to it, the registrations are stored as the
+manifest of the skill.  On the next start the registrations can be replayed
+from the manifest without importing the skill, the skill is imported the first
+time one of its events arrives.
+
+A manifest is tied to a hash of the skill directory, any change to the skill
+invalidates it.
+"""
+import json
+import os
+from pathlib import Path
+
+from xdg.BaseDirectory import xdg_cache_home
+
+from mycroft.util.log import LOG
+
+MANIFEST_DIR = Path(xdg_cache_home, 'mycroft', 'skill_manifests')
+
+# Messages registering the intents and vocabulary of a skill
+REGISTRATION_MESSAGES = (
+    'register_vocab',
+    'register_vocab_batch',
+    'register_intent',
+    'detach_intent',
+    'padatious:register_intent',
+    'padatious:register_entity'
+)
+
+# Events every skill listens to that don't require loading a lazy skill
+SYSTEM_EVENTS = (
+    'mycroft.stop',
+    'mycroft.skill.enable_intent',
+    'mycroft.skill.disable_intent',
+    'mycroft.skill.set_cross_context',
+    'mycroft.skill.remove_cross_context',
+    'mycroft.skills.settings.changed'
+)
+
+
+def _manifest_path(skill_id):
+    return MANIFEST_DIR.joinpath(skill_id + '.json')
+
+
+def load_manifest(skill_id, directory_hash):
+    """Load the manifest of a skill if it's still valid.
+
+    Args:
+        skill_id (str): skill to load the manifest for
+        directory_hash (str): current hash of the skill directory
+
+    Returns:
+        dict: the manifest, None if missing or outdated
+    """
+    try:
+        with open(str(_manifest_path(skill_id))) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        LOG.warning('Failed to read manifest of {} ({})'.format(skill_id,
+                                                                repr(e)))
+        return None
+    if manifest.get('hash') != directory_hash:
+        return None
+    return manifest
+
+
+def save_manifest(skill_id, manifest):
+    """Store the manifest of a skill.
+
+    Args:
+        skill_id (str): skill the manifest belongs to
+        manifest (dict): manifest as created by ManifestRecorder
+    """
+    path = _manifest_path(skill_id)
+    tmp_path = path.with_suffix('.tmp')
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(str(tmp_path), 'w') as f:
+            json.dump(manifest, f)
+        os.replace(str(tmp_path), str(path))
+    except OSError as e:
+        LOG.warning('Failed to save manifest of {} ({})'.format(skill_id,
+                                                                repr(e)))
+
+
+def _message_key(msg_type, data):
+    return json.dumps([msg_type, data], sort_keys=True)
+
+
+class ManifestRecorder:
+    """Messagebus wrapper recording what a skill registers.
+
+    Everything is passed on to the wrapped bus. While recording, the
+    registration messages emitted and the events listened to are collected.
+    Registrations listed in suppress aren't passed on while recording, used
+    to skip the registrations already replayed from the manifest when a lazy
+    skill is loaded.
+
+    Args:
+        bus: messagebus connection to wrap
+        skill_id (str): skill being recorded
+        suppress (list): (message type, data) pairs not to emit
+    """
+    def __init__(self, bus, skill_id, suppress=None):
+        self._bus = bus
+        self.skill_id = skill_id
+        self.recording = True
+        self.messages = []
+        self.events = set()
+        self.handlers = {}  # Handlers registered per event while recording
+        self.unexpected = set()  # Other messages emitted while recording
+        self._suppress = {_message_key(*m) for m in suppress or []}
+
+    def emit(self, message):
+        if self.recording:
+            if message.msg_type in REGISTRATION_MESSAGES:
+                # Store the data as it would arrive over the bus
+                data = json.loads(json.dumps(message.data))
+                self.messages.append((message.msg_type, data))
+                if _message_key(message.msg_type, data) in self._suppress:
+                    return
+            else:
+                self.unexpected.add(message.msg_type)
+        self._bus.emit(message)
+
+    def on(self, name, handler):
+        if self.recording:
+            self.events.add(name)
+            self.handlers.setdefault(name, []).append(handler)
+        return self._bus.on(name, handler)
+
+    def once(self, name, handler):
+        if self.recording:
+            self.events.add(name)
+            self.handlers.setdefault(name, []).append(handler)
+        return self._bus.once(name, handler)
+
+    def stop(self):
+        """Stop recording, pass everything through from now on."""
+        self.recording = False
+        self._suppress = set()
+
+    def _is_addressed(self, event):
+        return event.startswith((self.skill_id + ':', self.skill_id + '.'))
+
+    @property
+    def triggers(self):
+        """Events addressed to the skill, loading it when lazy."""
+        return sorted(e for e in self.events if self._is_addressed(e))
+
+    @property
+    def lazy_loadable(self):
+        """Check if the recorded skill can be replayed from a manifest.
+
+        The skill must only have emitted registrations, only listen to
+        system events and events addressed to it and have an intent to be
+        triggered by.
+        """
+        return (
+            not self.unexpected and
+            all(e in SYSTEM_EVENTS or self._is_addressed(e)
+                for e in self.events) and
+            any(t in ('register_intent', 'padatious:register_intent')
+                for t, _ in self.messages)
+        )
+
+    def create_manifest(self, directory_hash, name):
+        """Create the manifest of the recorded skill.
+
+        Args:
+            directory_hash (str): hash of the skill directory
+            name (str): name of the skill instance
+
+        Returns:
+            dict: manifest for save_manifest()
+        """
+        return {
+            'hash': directory_hash,
+            'name': name,
+            'lazy': self.lazy_loadable,
+            'messages': self.messages,
+            'triggers': self.triggers
+        }
+
+    def __getattr__(self, attr):
+        return getattr(self._bus, attr)
@@ -0,0 +1,255 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Event driven detection of changes to installed skills.
+
+Instead of walking every skill directory every few seconds the skill manager
+can be notified by the kernel (inotify) when files change.  Only the skills
+touched are marked dirty, and a skill is only reported once its files have
+been quiet for a moment so a burst of changes such as a git pull results in
+a single reload.
+
+inotify is only available on Linux, elsewhere (or when the watch limit is
+reached) the skill manager falls back to periodically scanning the skills.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+from os.path import join
+import select
+import struct
+from threading import Event, Lock, Thread
+from time import monotonic
+
+from mycroft.util.log import LOG
+
+from .skill_loader import is_ignored_file, SKILL_MAIN_MODULE
+
+# inotify constants from <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+# Changes to the directory holding the skills (skills added or removed)
+ROOT_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+# Changes to files within a skill
+SKILL_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_CREATE | IN_DELETE |
+              IN_MOVED_FROM | IN_MOVED_TO)
+
+
+def _is_ignored_dir(dir_name):
+    return dir_name.startswith('.') or dir_name == '__pycache__'
+
+
+class Inotify:
+    """Minimal inotify interface using the C library.
+
+    Raises:
+        OSError if inotify isn't available on this system.
+    """
+    def __init__(self):
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library('c'),
+                                     use_errno=True)
+            init = self._libc.inotify_init1
+        except (OSError, AttributeError) as e:
+            raise OSError('inotify is not available') from e
+        self.fd = init(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            self._raise_error('inotify_init1')
+
+    def add_watch(self, path, mask):
+        """Watch a path for the events in mask.
+
+        Returns:
+            int: watch descriptor
+        """
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            self._raise_error(path)
+        return wd
+
+    def read_events(self, timeout):
+        """Wait for events.
+
+        Args:
+            timeout (float): maximum number of seconds to wait
+
+        Returns:
+            list of (watch descriptor, mask, name) tuples
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+    @staticmethod
+    def _raise_error(context):
+        error = ctypes.get_errno()
+        raise OSError(error, os.strerror(error), context)
+
+
+class SkillDirectoryWatcher:
+    """Track changes to the installed skills using inotify.
+
+    Args:
+        skills_dir (str): directory holding the skills
+        debounce (float): seconds a skill must be unchanged before being
+                          reported
+
+    Raises:
+        OSError if inotify isn't available.
+    """
+    def __init__(self, skills_dir, debounce=2.0):
+        self.skills_dir = skills_dir
+        self.debounce = debounce
+        # Set when watching failed, e.g. the watch limit was reached
+        self.failed = False
+        self._inotify = Inotify()
+        self._watches = {}  # watch descriptor -> (skill dir, watched path)
+        self._dirty = {}  # skill dir -> time of last change
+        # Time the set of skills last changed, reported on first collect
+        self._skills_changed_at = 0
+        self._lock = Lock()
+        self._stopped = Event()
+        self._thread = None
+
+    def start(self):
+        """Start watching the skills in a background thread."""
+        self._add_watch(self.skills_dir, None, ROOT_MASK)
+        for name in os.listdir(self.skills_dir):
+            path = join(self.skills_dir, name)
+            if os.path.isdir(path) and not _is_ignored_dir(name):
+                self._watch_tree(path, path)
+        self._thread = Thread(target=self._watch_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def collect(self):
+        """Get the changes that have settled since the last call.
+
+        Returns:
+            tuple: (bool telling if skills were added or removed,
+                    list of skill directories with modified files)
+        """
+        settled = monotonic() - self.debounce
+        with self._lock:
+            skills_changed = (self._skills_changed_at is not None and
+                              self._skills_changed_at <= settled)
+            if skills_changed:
+                self._skills_changed_at = None
+            modified = [skill_dir for skill_dir, changed in
+                        self._dirty.items() if changed <= settled]
+            for skill_dir in modified:
+                del self._dirty[skill_dir]
+        return skills_changed, modified
+
+    def _watch_loop(self):
+        try:
+            while not self._stopped.is_set():
+                for event in self._inotify.read_events(timeout=1.0):
+                    self._handle_event(*event)
+        except Exception:
+            LOG.exception('Skill directory watcher failed')
+            self.failed = True
+        finally:
+            self._inotify.close()
+
+    def _handle_event(self, wd, mask, name):
+        now = monotonic()
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost, treat everything as changed
+            with self._lock:
+                self._skills_changed_at = now
+                for skill_dir, _ in self._watches.values():
+                    if skill_dir is not None:
+                        self._dirty[skill_dir] = now
+            return
+
+        watch = self._watches.get(wd)
+        if watch is None:
+            return
+        if mask & IN_IGNORED:
+            # The watched directory was removed
+            del self._watches[wd]
+            return
+
+        skill_dir, path = watch
+        is_dir = mask & IN_ISDIR
+        if (is_dir and _is_ignored_dir(name) or
+                not is_dir and is_ignored_file(name)):
+            return
+        created = mask & (IN_CREATE | IN_MOVED_TO)
+        if skill_dir is None:
+            # A skill was added to or removed from the skills directory
+            if created and is_dir:
+                self._watch_tree(join(path, name), join(path, name))
+            with self._lock:
+                self._skills_changed_at = now
+            return
+
+        if created and is_dir:
+            self._watch_tree(join(path, name), skill_dir)
+        with self._lock:
+            if path == skill_dir and name == SKILL_MAIN_MODULE:
+                # Directory became a skill or stopped being one
+                self._skills_changed_at = now
+            self._dirty[skill_dir] = now
+
+    def _watch_tree(self, path, skill_dir):
+        """Watch a directory and its subdirectories."""
+        for root_dir, dirs, _ in os.walk(path):
+            dirs[:] = [d for d in dirs if not _is_ignored_dir(d)]
+            self._add_watch(root_dir, skill_dir, SKILL_MASK)
+
+    def _add_watch(self, path, skill_dir, mask):
+        try:
+            wd = self._inotify.add_watch(path, mask)
+        except OSError as e:
+            if e.errno == errno.ENOENT:
+                return  # Removed before it could be watched
+            if not self.failed:
+                LOG.warning('Failed to watch {} ({})'.format(path, e))
+            self.failed = True
+        else:
+            self._watches[wd] = (skill_dir, path)
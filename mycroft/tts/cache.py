@@ -26,12 +26,31 @@ The second cache type is a temporary cache stored in the /tmp directory,
 which is cleared when a device is rebooted.  Sentences are added to this cache
 on the fly every time a TTS engine returns audio for a sentence that is not
 already cached.
+
+Files in the temporary cache are prefixed with a fingerprint of the engine
+configuration (voice, language, speed etc.) that produced them.  This allows
+the audio of several voices to coexist in the cache so switching between them
+doesn't require clearing or regenerating anything.
+
+Optionally the cached audio can be stored compressed (FLAC or Opus) by setting
+"cache_compression" in the engine configuration.  Freshly synthesized WAV
+files are compressed once they have been played and are decoded again right
+before playback, trading a few milliseconds of CPU for a considerably larger
+number of cached sentences on devices with limited storage.
+
+Curating the temporary cache when disk space runs low and compressing new
+entries is done by CacheMaintenance on a background thread at a fixed
+interval, keeping filesystem work off the path from finished speech to
+listening.
 """
 import base64
 import hashlib
 import json
 import re
+import subprocess
 from pathlib import Path
+from threading import Event, Thread
+from time import monotonic
 from typing import List, Set, Tuple
 from urllib import parse
 
@@ -42,6 +61,23 @@ from mycroft.util.file_utils import (
 )
 from mycroft.util.log import LOG
 
+# Engine configuration keys that do not affect the synthesized audio
+FINGERPRINT_IGNORED_KEYS = ('preloaded_cache', 'cache_compression', 'workers',
+                            'chunking')
+
+# Command lines used to compress WAV audio and to decode it again for
+# playback, %1 is replaced by the input file and %2 by the output file.
+CACHE_CODECS = {
+    "flac": ("flac --silent --best -f -o %2 %1",
+             "flac --silent --decode -f -o %2 %1"),
+    "opus": ("opusenc --quiet %1 %2",
+             "opusdec --quiet %1 %2")
+}
+
+# Hit statistics per (engine, fingerprint), kept for the life of the process
+# so they survive the TTS object being recreated on configuration changes.
+_voice_statistics = {}
+
 
 def _get_mimic2_audio(sentence: str, url: str) -> Tuple[bytes, str]:
     """Use the Mimic2 API to retrieve the audio for a sentence.
@@ -59,6 +95,45 @@ def _get_mimic2_audio(sentence: str, url: str) -> Tuple[bytes, str]:
     return audio, phonemes
 
 
+def _run_codec(cmd: str, source: Path, destination: Path) -> bool:
+    """Run a compression or decompression command line.
+
+    Args:
+        cmd: command line from CACHE_CODECS
+        source: file to read
+        destination: file to write
+
+    Returns:
+        True if the output was written successfully.
+    """
+    replacements = {"%1": str(source), "%2": str(destination)}
+    cmdline = [replacements.get(e, e) for e in cmd.split(" ")]
+    try:
+        subprocess.check_call(cmdline, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError) as e:
+        LOG.error("Failed to run {} ({})".format(cmdline[0], repr(e)))
+        return False
+    return True
+
+
+def decode_audio(source: Path, destination: Path) -> bool:
+    """Decode a compressed cache file into a playable WAV file.
+
+    Args:
+        source: compressed audio file, the codec is taken from the suffix
+        destination: WAV file to write
+
+    Returns:
+        True if decoding succeeded.
+    """
+    codec = Path(source).suffix[1:]
+    if codec not in CACHE_CODECS:
+        LOG.error("Unknown cache compression {}".format(codec))
+        return False
+    return _run_codec(CACHE_CODECS[codec][1], source, destination)
+
+
 def hash_sentence(sentence: str):
     """Convert the sentence into a hash value used for the file name
 
@@ -71,6 +146,28 @@ def hash_sentence(sentence: str):
     return sentence_hash
 
 
+def config_fingerprint(tts_config: dict, lang: str = None) -> str:
+    """Build a short hash identifying the voice produced by a configuration.
+
+    All engine settings except the ones known not to affect the audio are
+    included, as is the language since it may be inherited from the global
+    configuration.
+
+    Args:
+        tts_config: configuration of the TTS engine
+        lang: language the engine speaks
+
+    Returns:
+        Hash string identifying the configuration.
+    """
+    relevant = {key: value for key, value in tts_config.items()
+                if key not in FINGERPRINT_IGNORED_KEYS}
+    if lang is not None:
+        relevant['lang'] = lang.lower()
+    encoded = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.md5(encoded.encode("utf-8", "ignore")).hexdigest()[:12]
+
+
 def hash_from_path(path: Path) -> str:
     """Returns hash from a given path.
 
@@ -85,10 +182,126 @@ def hash_from_path(path: Path) -> str:
     return path.with_suffix('').name
 
 
+class CacheStatistics:
+    """Hit and miss counters for the cache of a single voice."""
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __repr__(self):
+        return "CacheStatistics(hits={}, misses={})".format(
+            self.hits, self.misses
+        )
+
+
+class CacheMaintenanceStatistics:
+    """Counters describing the work done by CacheMaintenance."""
+    def __init__(self):
+        self.runs = 0
+        self.skipped = 0
+        self.files_removed = 0
+        self.files_compressed = 0
+        self.last_duration = 0.0
+
+    def __repr__(self):
+        return ("CacheMaintenanceStatistics(runs={}, skipped={}, "
+                "files_removed={}, files_compressed={}, "
+                "last_duration={:.3f})".format(
+                    self.runs, self.skipped, self.files_removed,
+                    self.files_compressed, self.last_duration))
+
+
+class CacheMaintenance:
+    """Periodic background curation and compression of TTS caches.
+
+    Args:
+        get_caches (callable): returns the TextToSpeechCache objects to
+                               maintain
+        interval (float): seconds between maintenance passes
+        is_busy (callable): returns True while maintenance should be
+                            postponed, e.g. while speech is playing
+    """
+    def __init__(self, get_caches, interval=60.0, is_busy=None):
+        self.get_caches = get_caches
+        self.interval = interval
+        self.is_busy = is_busy
+        self.statistics = CacheMaintenanceStatistics()
+        self._stopped = Event()
+        self._thread = None
+
+    def start(self):
+        """Start performing maintenance in a background thread."""
+        if self._thread is None:
+            self._thread = Thread(target=self._maintenance_loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background maintenance."""
+        self._stopped.set()
+
+    def run_once(self):
+        """Curate and compress all caches unless busy.
+
+        Returns:
+            bool: True if maintenance was performed
+        """
+        if self.is_busy and self.is_busy():
+            self.statistics.skipped += 1
+            return False
+
+        start = monotonic()
+        for cache in list(self.get_caches()):
+            try:
+                self.statistics.files_removed += cache.curate()
+                self.statistics.files_compressed += (
+                    cache.compress_new_entries()
+                )
+            except Exception:
+                LOG.exception("TTS cache maintenance failed")
+        self.statistics.runs += 1
+        self.statistics.last_duration = monotonic() - start
+        LOG.debug(self.statistics)
+        return True
+
+    def _maintenance_loop(self):
+        while not self._stopped.wait(self.interval):
+            self.run_once()
+
+
 class AudioFile:
     def __init__(self, cache_dir: Path, sentence_hash: str, file_type: str):
         self.name = f"{sentence_hash}.{file_type}"
         self.path = cache_dir.joinpath(self.name)
+        self.file_type = file_type
+
+    @property
+    def is_compressed(self) -> bool:
+        """True if the audio needs decoding before being played."""
+        return self.file_type in CACHE_CODECS
+
+    def compress(self, codec: str):
+        """Write a compressed copy of this WAV file next to it.
+
+        The original file is left in place, removing it is up to the caller.
+
+        Args:
+            codec: compression to use, one of CACHE_CODECS
+
+        Returns:
+            AudioFile representing the compressed copy or None on failure.
+        """
+        sentence_hash = hash_from_path(self.path)
+        compressed = AudioFile(self.path.parent, sentence_hash, codec)
+        if _run_codec(CACHE_CODECS[codec][0], self.path, compressed.path):
+            return compressed
+        else:
+            return None
 
     def save(self, audio: bytes):
         """Write a TTS cache file containing the audio to be spoken.
@@ -142,9 +355,13 @@ class PhonemeFile:
 
 class TextToSpeechCache:
     """Class for all persistent and temporary caching operations."""
-    def __init__(self, tts_config, tts_name, audio_file_type):
+    def __init__(self, tts_config, tts_name, audio_file_type, lang=None):
         self.config = tts_config
         self.tts_name = tts_name
+        self.fingerprint = config_fingerprint(tts_config, lang)
+        self.statistics = _voice_statistics.setdefault(
+            (tts_name, self.fingerprint), CacheStatistics()
+        )
         if "preloaded_cache" in self.config:
             self.persistent_cache_dir = Path(self.config["preloaded_cache"])
             ensure_directory_exists(
@@ -159,9 +376,34 @@ class TextToSpeechCache:
             str(self.temporary_cache_dir), permissions=0o755
         )
         self.audio_file_type = audio_file_type
+        self.compression = self._get_compression()
+        # Uncompressed files replaced by a compressed copy, removed on the
+        # next pass of compress_new_entries() when no longer queued to play.
+        self._superseded_files = []
         self.resource_dir = Path(__file__).parent.parent.joinpath("res")
         self.cached_sentences = dict()
 
+    def _get_compression(self):
+        """Get the configured cache compression, if usable."""
+        compression = self.config.get("cache_compression")
+        if not compression or compression == self.audio_file_type:
+            return None
+        elif compression not in CACHE_CODECS:
+            LOG.warning("Unsupported TTS cache compression {}, "
+                        "storing {}".format(compression, self.audio_file_type))
+            return None
+        elif self.audio_file_type != "wav":
+            LOG.warning("Cache compression is only possible for WAV audio")
+            return None
+        return compression
+
+    @property
+    def _cached_file_types(self):
+        """File types that may hold cached audio of this engine."""
+        if self.compression:
+            return (self.audio_file_type, self.compression)
+        return (self.audio_file_type,)
+
     def __contains__(self, sha):
         """The cache contains a SHA if it knows of it and it exists on disk."""
         if sha not in self.cached_sentences:
@@ -196,14 +438,19 @@ class TextToSpeechCache:
             LOG.info("Persistent TTS cache files added successfully.")
 
     def _load_existing_audio_files(self):
-        """Find the TTS audio files already in the persistent cache."""
-        glob_pattern = "*." + self.audio_file_type
-        for file_path in self.persistent_cache_dir.glob(glob_pattern):
-            sentence_hash = file_path.name.split(".")[0]
-            audio_file = AudioFile(
-                self.persistent_cache_dir, sentence_hash, self.audio_file_type
-            )
-            self.cached_sentences[sentence_hash] = audio_file, None
+        """Find the TTS audio files already in the persistent cache.
+
+        Compressed files are loaded after the uncompressed files so they are
+        preferred when a sentence is stored in both formats.
+        """
+        for file_type in self._cached_file_types:
+            glob_pattern = "*." + file_type
+            for file_path in self.persistent_cache_dir.glob(glob_pattern):
+                sentence_hash = file_path.name.split(".")[0]
+                audio_file = AudioFile(
+                    self.persistent_cache_dir, sentence_hash, file_type
+                )
+                self.cached_sentences[sentence_hash] = audio_file, None
 
     def _load_existing_phoneme_files(self):
         """Find the TTS phoneme files already in the persistent cache.
@@ -290,6 +537,11 @@ class TextToSpeechCache:
             self.persistent_cache_dir, sentence_hash, self.audio_file_type
         )
         audio_file.save(audio)
+        if self.compression:
+            compressed_file = audio_file.compress(self.compression)
+            if compressed_file is not None:
+                audio_file.path.unlink()
+                audio_file = compressed_file
         if phonemes is None:
             phoneme_file = None
         else:
@@ -299,6 +551,42 @@ class TextToSpeechCache:
             phoneme_file.save(phonemes)
         self.cached_sentences[sentence_hash] = audio_file, phoneme_file
 
+    def load_temporary_cache(self):
+        """Index the temporary cache files produced by the current voice.
+
+        Files from other voices are left alone so they are available when
+        switching back to that voice.  Files without a voice fingerprint
+        were written by an older version and can't be trusted to match any
+        voice so they are removed.
+        """
+        prefix = self.fingerprint + "_"
+        for file_path in self.temporary_cache_dir.iterdir():
+            if not file_path.is_file():
+                continue
+            name = hash_from_path(file_path)
+            if "_" not in name:
+                file_path.unlink()
+            elif (name.startswith(prefix) and
+                    file_path.suffix[1:] in self._cached_file_types and
+                    file_path.stat().st_size > 0):
+                sentence_hash = name[len(prefix):]
+                audio_file = AudioFile(self.temporary_cache_dir, name,
+                                       file_path.suffix[1:])
+                known_entry = self.cached_sentences.get(sentence_hash)
+                if known_entry and known_entry[0].is_compressed:
+                    # Left over from an interrupted compression
+                    file_path.unlink()
+                    continue
+                elif known_entry:
+                    # Prefer the compressed copy
+                    known_entry[0].path.unlink()
+                phoneme_file = self.define_phoneme_file(sentence_hash)
+                if not phoneme_file.exists():
+                    phoneme_file = None
+                self.cached_sentences[sentence_hash] = (
+                    audio_file, phoneme_file
+                )
+
     def clear(self):
         """Remove all files from the temporary cache."""
         for cache_file_path in self.temporary_cache_dir.iterdir():
@@ -310,23 +598,72 @@ class TextToSpeechCache:
                 cache_file_path.unlink()
 
     def curate(self):
-        """Remove cache data if disk space is running low."""
+        """Remove cache data if disk space is running low.
+
+        Returns:
+            int: number of files removed
+        """
         files_removed = curate_cache(self.temporary_cache_dir,
                                      min_free_percent=100)
 
+        prefix = self.fingerprint + "_"
         hashes = set([hash_from_path(Path(path)) for path in files_removed])
-        for sentence_hash in hashes:
-            if sentence_hash in self.cached_sentences:
-                self.cached_sentences.pop(sentence_hash)
+        for file_hash in hashes:
+            sentence_hash = file_hash[len(prefix):]
+            if (file_hash.startswith(prefix) and
+                    sentence_hash in self.cached_sentences):
+                self.cached_sentences.pop(sentence_hash, None)
+        return len(files_removed)
+
+    def compress_new_entries(self):
+        """Replace uncompressed temporary cache files with compressed copies.
+
+        This is intended to run when nothing is being played.  The original
+        files are removed on the following pass since they may still have
+        been queued for playback when their compressed copy was created.
+
+        Returns:
+            int: number of files compressed
+        """
+        for file_path in self._superseded_files:
+            if file_path.exists():
+                file_path.unlink()
+        self._superseded_files = []
+        if not self.compression:
+            return 0
+
+        compressed = 0
+        # Iterate over a copy, sentences may be added while compressing
+        for sentence_hash, cached_sentence in list(
+                self.cached_sentences.items()):
+            audio_file, phoneme_file = cached_sentence
+            if (audio_file.is_compressed or not audio_file.exists() or
+                    audio_file.path.parent != self.temporary_cache_dir):
+                continue
+            compressed_file = audio_file.compress(self.compression)
+            if compressed_file is None:
+                # Encoder is broken or missing, don't retry every file
+                break
+            self.cached_sentences[sentence_hash] = (compressed_file,
+                                                    phoneme_file)
+            self._superseded_files.append(audio_file.path)
+            compressed += 1
+        return compressed
 
     def define_audio_file(self, sentence_hash: str) -> AudioFile:
         """Build an instance of an object representing an audio file."""
         audio_file = AudioFile(
-            self.temporary_cache_dir, sentence_hash, self.audio_file_type
+            self.temporary_cache_dir, self._voice_key(sentence_hash),
+            self.audio_file_type
         )
         return audio_file
 
     def define_phoneme_file(self, sentence_hash: str) -> PhonemeFile:
         """Build an instance of an object representing an phoneme file."""
-        phoneme_file = PhonemeFile(self.temporary_cache_dir, sentence_hash)
+        phoneme_file = PhonemeFile(self.temporary_cache_dir,
+                                   self._voice_key(sentence_hash))
         return phoneme_file
+
+    def _voice_key(self, sentence_hash: str) -> str:
+        """File name stem of a sentence spoken with the current voice."""
+        return "{}_{}".format(self.fingerprint, sentence_hash)
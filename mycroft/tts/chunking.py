@@ -0,0 +1,150 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Policy deciding how an utterance is split into chunks for synthesis.
+
+Playback can't start before the first chunk has been synthesized, so the time
+to first audio is governed by the length of the first chunk.  The policy makes
+the first chunk short, a clause or a few words, and lets the following chunks
+grow towards the size the engine synthesizes most efficiently while the first
+chunks are being played.
+
+The default policy keeps every sentence as a chunk, engines opt in to
+splitting and merging by overriding TTS.chunking_policy.
+"""
+from mycroft.util.log import LOG
+
+# Punctuation ending a clause the first chunk can be split after
+CLAUSE_DELIMITERS = (',', ';', ':')
+
+
+class ChunkingPolicy:
+    """Latency / chunk size trade-off of a TTS engine.
+
+    Args:
+        first_chunk_min_words (int): shortest first chunk worth splitting off
+        first_chunk_max_words (int): longest first chunk, 0 disables splitting
+                                     off a short first chunk
+        max_chunk_chars (int): size up to which following chunks are merged,
+                               None keeps every sentence as a chunk
+        growth (float): factor each chunk may grow by compared to the
+                        previous one
+    """
+    def __init__(self, first_chunk_min_words=3, first_chunk_max_words=0,
+                 max_chunk_chars=None, growth=2.0):
+        self.first_chunk_min_words = first_chunk_min_words
+        self.first_chunk_max_words = first_chunk_max_words
+        self.max_chunk_chars = max_chunk_chars
+        self.growth = growth
+
+    def __repr__(self):
+        return ('ChunkingPolicy(first_chunk_min_words={}, '
+                'first_chunk_max_words={}, max_chunk_chars={}, '
+                'growth={})'.format(self.first_chunk_min_words,
+                                    self.first_chunk_max_words,
+                                    self.max_chunk_chars, self.growth))
+
+    def updated(self, config):
+        """Create a copy with values overridden from configuration.
+
+        Args:
+            config (dict): "chunking" section of the tts engine config
+
+        Returns:
+            ChunkingPolicy
+        """
+        values = vars(self).copy()
+        for key, value in (config or {}).items():
+            if key in values:
+                values[key] = value
+            else:
+                LOG.warning('Unknown chunking setting {}'.format(key))
+        return ChunkingPolicy(**values)
+
+    def split_first_chunk(self, sentence):
+        """Split a short leading part off a sentence.
+
+        The sentence is preferably split after a clause, otherwise after
+        first_chunk_max_words words. Splitting is skipped if either part
+        would get shorter than first_chunk_min_words.
+
+        Args:
+            sentence (str): first sentence of an utterance
+
+        Returns:
+            tuple: (first chunk, remainder of the sentence or '')
+        """
+        words = sentence.split()
+        min_words = max(1, self.first_chunk_min_words)
+        max_words = self.first_chunk_max_words
+        if not max_words or len(words) <= max_words:
+            return sentence, ''
+
+        split = None
+        for index in range(min_words, max_words + 1):
+            if words[index - 1].endswith(CLAUSE_DELIMITERS):
+                split = index
+                break
+        if split is None:
+            split = max_words
+        if len(words) - split < min_words:
+            return sentence, ''
+
+        # The chunk boundary is a pause already, like the chunkers of the
+        # engines drop the clause punctuation
+        first = ' '.join(words[:split]).rstrip(''.join(CLAUSE_DELIMITERS))
+        return first, ' '.join(words[split:])
+
+    def apply(self, sentences, keep=None):
+        """Arrange the sentences of an utterance into chunks.
+
+        Args:
+            sentences (list): sentences as split by the engine
+            keep (callable): optional check for sentences that must stay
+                             chunks of their own, neither split nor merged,
+                             for example because their audio is cached
+
+        Returns:
+            list: chunks to synthesize, in order
+        """
+        sentences = [s.strip() for s in sentences if s.strip()]
+        if not sentences:
+            return []
+        keep = keep or (lambda sentence: False)
+
+        if keep(sentences[0]):
+            first, remainder = sentences[0], ''
+        else:
+            first, remainder = self.split_first_chunk(sentences[0])
+        chunks = [first]
+        pending = ([remainder] if remainder else []) + sentences[1:]
+        if self.max_chunk_chars is None:
+            return chunks + pending
+
+        limit = min(self.max_chunk_chars, len(first) * self.growth)
+        current = ''
+        for sentence in pending:
+            if keep(sentence):
+                if current:
+                    chunks.append(current)
+                chunks.append(sentence)
+                current = ''
+            elif current and len(current) + 1 + len(sentence) > limit:
+                chunks.append(current)
+                limit = min(self.max_chunk_chars, limit * self.growth)
+                current = sentence
+            else:
+                current = ' '.join(filter(None, [current, sentence]))
+        if current:
+            chunks.append(current)
+        return chunks
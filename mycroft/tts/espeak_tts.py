@@ -12,15 +12,105 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import ctypes
+import ctypes.util
 import subprocess
+import wave
 
+from mycroft.util.log import LOG
+
+from .chunking import ChunkingPolicy
 from .tts import TTS, TTSValidator
+from .worker_pool import WorkerError
+
+# Values from speak_lib.h
+_AUDIO_OUTPUT_SYNCHRONOUS = 2
+_ESPEAK_PARAMETERS = {
+    'speed': 1,  # espeakRATE
+    'amplitude': 2,  # espeakVOLUME
+    'pitch': 3,  # espeakPITCH
+    'capital': 6,  # espeakCAPITALS
+    'gap': 7  # espeakWORDGAP
+}
+_SYNTH_CALLBACK = ctypes.CFUNCTYPE(ctypes.c_int,
+                                   ctypes.POINTER(ctypes.c_short),
+                                   ctypes.c_int, ctypes.c_void_p)
+
+
+class ESpeakLibrarySynthesizer:
+    """Synthesizer keeping an espeak voice loaded using libespeak(-ng).
+
+    Used by the synthesis workers, see mycroft.tts.worker_pool.
+
+    Args:
+        config (dict): "voice" name and the optional engine parameters
+                       (amplitude, gap, capital, pitch and speed).
+    """
+    def __init__(self, config):
+        library = (ctypes.util.find_library('espeak-ng') or
+                   ctypes.util.find_library('espeak'))
+        if not library:
+            raise OSError('libespeak not found')
+        self.lib = ctypes.CDLL(library)
+        self.sample_rate = self.lib.espeak_Initialize(
+            _AUDIO_OUTPUT_SYNCHRONOUS, 0, None, 0)
+        if self.sample_rate <= 0:
+            raise OSError('espeak could not be initialized')
+        self.lib.espeak_SetVoiceByName.argtypes = [ctypes.c_char_p]
+        if self.lib.espeak_SetVoiceByName(config['voice'].encode()) != 0:
+            raise ValueError('espeak voice {} not found'.format(
+                config['voice']))
+        for key, parameter in _ESPEAK_PARAMETERS.items():
+            if config.get(key):
+                self.lib.espeak_SetParameter(parameter, int(config[key]), 0)
+
+        self.samples = []
+        # Keep a reference to the callback to avoid it being collected
+        self.callback = _SYNTH_CALLBACK(self._collect_samples)
+        self.lib.espeak_SetSynthCallback(self.callback)
+        self.lib.espeak_Synth.argtypes = [
+            ctypes.c_char_p, ctypes.c_size_t, ctypes.c_uint, ctypes.c_int,
+            ctypes.c_uint, ctypes.c_uint, ctypes.c_void_p, ctypes.c_void_p
+        ]
+
+    def _collect_samples(self, wav, num_samples, events):
+        if wav and num_samples > 0:
+            self.samples.append(ctypes.string_at(wav, num_samples * 2))
+        return 0  # Continue synthesis
+
+    def synthesize(self, sentence, wav_file):
+        """Write the audio of a sentence to a WAV file."""
+        self.samples = []
+        text = sentence.encode()
+        self.lib.espeak_Synth(text, len(text) + 1, 0, 0, 0, 0, None, None)
+        self.lib.espeak_Synchronize()
+        with wave.open(wav_file, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(b''.join(self.samples))
+        return None
 
 
 class ESpeak(TTS):
-    """TTS module for generating speech using ESpeak."""
+    """TTS module for generating speech using ESpeak.
+
+    Setting "workers" in the configuration keeps that many processes with the
+    voice loaded through libespeak instead of running espeak per sentence.
+    """
+    # Synthesis is near instant, a short first chunk gains nothing while
+    # every extra chunk costs a process start.
+    chunking_policy = ChunkingPolicy(first_chunk_max_words=0,
+                                     max_chunk_chars=500)
+
     def __init__(self, lang, config):
         super(ESpeak, self).__init__(lang, config, ESpeakValidator(self))
+        worker_config = {key: config.get(key) for key in _ESPEAK_PARAMETERS}
+        worker_config['voice'] = '+'.join(filter(None,
+                                                 [self.lang, self.voice]))
+        self.start_worker_pool(
+            'mycroft.tts.espeak_tts:ESpeakLibrarySynthesizer', worker_config
+        )
 
     def get_tts(self, sentence, wav_file):
         """Generate WAV from sentence, phonemes aren't supported.
@@ -32,6 +122,13 @@ class ESpeak(TTS):
         Returns:
             tuple ((str) file location, None)
         """
+        if self.worker_pool:
+            try:
+                self.worker_pool.synthesize(sentence, wav_file)
+                return wav_file, None
+            except WorkerError:
+                LOG.exception('Synthesis worker failed, '
+                              'falling back to the espeak executable')
 
         # Create Argument String for Espeak
         arguments = ['espeak', '-v', self.lang + '+' + self.voice]
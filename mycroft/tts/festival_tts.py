@@ -12,16 +12,81 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+"""Festival TTS, a local TTS backend.
+
+Without further configuration every sentence is piped to a new festival
+process, playing the audio itself. Setting "workers" in the configuration
+instead keeps that many festival processes running with the voice loaded,
+rendering the sentences to WAV files played like those of other engines.
+"""
+import os
 import subprocess
 
+from mycroft.util.log import LOG
+
 from .tts import TTS, TTSValidator
+from .worker_pool import WorkerError
+
+# Printed by festival after each sentence, telling the file has been written
+_DONE_MARKER = 'mycroft-festival-done'
+
+
+def _quote(text):
+    """Quote a string for the festival scheme interpreter."""
+    return '"{}"'.format(text.replace('\\', '\\\\').replace('"', '\\"'))
+
+
+class FestivalSynthesizer:
+    """Synthesizer keeping a festival process running.
+
+    Used by the synthesis workers, see mycroft.tts.worker_pool.
+
+    Args:
+        config (dict): "lang" of the voice and the "encoding" festival
+                       expects text in.
+    """
+    def __init__(self, config):
+        self.encoding = config.get('encoding') or 'utf8'
+        self.process = subprocess.Popen(
+            ['festival', '--pipe', '--language', config['lang']],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL)
+
+    def synthesize(self, sentence, wav_file):
+        """Write the audio of a sentence to a WAV file."""
+        command = (
+            '(utt.save.wave (utt.synth (Utterance Text {})) {} \'riff)\n'
+            '(format t "%s\\n" {})\n'
+        ).format(_quote(sentence), _quote(wav_file), _quote(_DONE_MARKER))
+        self.process.stdin.write(command.encode(self.encoding, 'replace'))
+        self.process.stdin.flush()
+        for line in self.process.stdout:
+            if line.decode(self.encoding, 'replace').strip() == _DONE_MARKER:
+                break
+        else:
+            raise RuntimeError('festival exited')
+        if not os.path.exists(wav_file):
+            raise RuntimeError('festival produced no audio')
+        return None
 
 
 class Festival(TTS):
     def __init__(self, lang, config):
         super(Festival, self).__init__(lang, config, FestivalValidator(self))
+        self.start_worker_pool(
+            'mycroft.tts.festival_tts:FestivalSynthesizer',
+            {'lang': config.get('lang', self.lang),
+             'encoding': config.get('encoding', 'utf8')}
+        )
 
-    def execute(self, sentence, ident=None, listen=False):
+    def execute(self, sentence, ident=None, listen=False, priority=None):
+        if self.worker_pool:
+            # Rendered to files, cached and queued like other engines
+            if priority is None:
+                super().execute(sentence, ident, listen)
+            else:
+                super().execute(sentence, ident, listen, priority)
+            return
 
         encoding = self.config.get('encoding', 'utf8')
         lang = self.config.get('lang', self.lang)
@@ -42,6 +107,31 @@ class Festival(TTS):
         subprocess.call(tts_cmd, stdin=text.stdout)
         self.end_audio(listen)
 
+    def get_tts(self, sentence, wav_file):
+        """Generate WAV from sentence using the synthesis workers.
+
+        Falls back to festival's text2wave if the workers fail.
+
+        Args:
+            sentence (str): sentence to generate audio for
+            wav_file (str): output file
+
+        Returns:
+            tuple ((str) file location, None)
+        """
+        if self.worker_pool:
+            try:
+                self.worker_pool.synthesize(sentence, wav_file)
+                return wav_file, None
+            except WorkerError as err:
+                LOG.error('Synthesis worker failed ({}), using text2wave '
+                          'for "{}"'.format(err, sentence))
+        encoding = self.config.get('encoding', 'utf8')
+        subprocess.run(['text2wave', '-o', wav_file],
+                       input=sentence.encode(encoding, 'replace'),
+                       check=True)
+        return wav_file, None
+
 
 class FestivalValidator(TTSValidator):
     def __init__(self, tts):
@@ -26,6 +26,7 @@ from requests.exceptions import (
 
 from mycroft.util.file_utils import get_cache_directory
 from mycroft.util.log import LOG
+from .chunking import ChunkingPolicy
 from .mimic_tts import VISIMES
 from .tts import TTS, TTSValidator
 from .remote_tts import RemoteTTSException, RemoteTTSTimeoutException
@@ -167,6 +168,11 @@ def _sentence_chunker(text):
 
 class Mimic2(TTS):
     """Interface to the Mimic2 TTS."""
+    # Every chunk is a request to the server, grow up to the longest
+    # sentence mimic2 handles well.
+    chunking_policy = ChunkingPolicy(first_chunk_max_words=10,
+                                     max_chunk_chars=_max_sentence_size)
+
     def __init__(self, lang, config):
         super().__init__(lang, config, Mimic2Validator(self))
         self.cache.load_persistent_cache()
@@ -15,7 +15,14 @@
 """Mimic TTS, a local TTS backend.
 
 This Backend uses the mimic executable to render text into speech.
+
+Starting the executable reloads the voice for every sentence. Setting
+"workers" in the configuration instead keeps that many processes with the
+voice loaded through the mimic library (libttsmimic). Sentences containing
+SSML are still rendered by the executable.
 """
+import ctypes
+import ctypes.util
 import os
 import os.path
 from os.path import exists, join, expanduser
@@ -30,7 +37,9 @@ from mycroft.configuration import Configuration
 from mycroft.util.download import download
 from mycroft.util.log import LOG
 
+from .chunking import ChunkingPolicy
 from .tts import TTS, TTSValidator
+from .worker_pool import WorkerError
 
 
 def get_mimic_binary():
@@ -121,8 +130,122 @@ def parse_phonemes(phonemes):
     return [pair.split(':') for pair in pairs if ':' in pair]
 
 
+class _CstVoice(ctypes.Structure):
+    """Leading members of struct cst_voice_struct from mimic's cst_voice.h.
+
+    Only used to reach the voice features, the documented way to change
+    voice parameters is feat_set_*(voice->features, name, value).
+    """
+    _fields_ = [('name', ctypes.c_char_p),
+                ('features', ctypes.c_void_p),
+                ('ffunctions', ctypes.c_void_p)]
+
+
+def _declare(lib, name, restype, argtypes):
+    """Look up a libttsmimic function and declare its signature."""
+    try:
+        func = getattr(lib, name)
+    except AttributeError as err:
+        raise OSError('libttsmimic has no {}()'.format(name)) from err
+    func.restype = restype
+    func.argtypes = argtypes
+    return func
+
+
+class MimicLibrarySynthesizer:
+    """Synthesizer keeping a mimic voice loaded using libttsmimic.
+
+    Used by the synthesis workers, see mycroft.tts.worker_pool. Sentences
+    are synthesized the same way as by the mimic executable with -psdur,
+    so the phonemes and their end times are returned for the visemes.
+
+    Args:
+        config (dict): "voice", "duration_stretch" and optionally the
+                       "library" to load.
+    """
+    def __init__(self, config):
+        library = (config.get('library') or
+                   ctypes.util.find_library('ttsmimic'))
+        if not library:
+            raise OSError('libttsmimic not found')
+        lib = ctypes.CDLL(library)
+        p = ctypes.c_void_p
+        _declare(lib, 'mimic_init', ctypes.c_int, [])()
+        _declare(lib, 'mimic_set_lang_list', None, [])()
+        _declare(lib, 'mimic_set_voice_list', p, [ctypes.c_char_p])(None)
+        self.voice = self._load_voice(lib, config.get('voice') or 'ap')
+
+        stretch = config.get('duration_stretch')
+        if stretch:
+            features = ctypes.cast(self.voice,
+                                   ctypes.POINTER(_CstVoice)).contents.features
+            feat_set_float = _declare(lib, 'feat_set_float', None,
+                                      [p, ctypes.c_char_p, ctypes.c_float])
+            feat_set_float(features, b'duration_stretch', float(stretch))
+
+        self.synth_text = _declare(lib, 'mimic_synth_text', p,
+                                   [ctypes.c_char_p, p])
+        self.utt_wave = _declare(lib, 'utt_wave', p, [p])
+        self.save_riff = _declare(lib, 'cst_wave_save_riff', ctypes.c_int,
+                                  [p, ctypes.c_char_p])
+        self.utt_relation = _declare(lib, 'utt_relation', p,
+                                     [p, ctypes.c_char_p])
+        self.relation_head = _declare(lib, 'relation_head', p, [p])
+        self.item_next = _declare(lib, 'item_next', p, [p])
+        self.item_feat_string = _declare(lib, 'item_feat_string',
+                                         ctypes.c_char_p,
+                                         [p, ctypes.c_char_p])
+        self.item_feat_float = _declare(lib, 'item_feat_float',
+                                        ctypes.c_float, [p, ctypes.c_char_p])
+        self.delete_utterance = _declare(lib, 'delete_utterance', None, [p])
+
+    @staticmethod
+    def _load_voice(lib, voice):
+        """Select a built in voice or load a .flitevox file."""
+        if exists(voice):
+            load = _declare(lib, 'mimic_voice_load', ctypes.c_void_p,
+                            [ctypes.c_char_p])
+        else:
+            load = _declare(lib, 'mimic_voice_select', ctypes.c_void_p,
+                            [ctypes.c_char_p])
+        loaded = load(voice.encode())
+        if not loaded:
+            raise ValueError('Mimic voice {} not found'.format(voice))
+        return loaded
+
+    def synthesize(self, sentence, wav_file):
+        """Write the audio of a sentence to a WAV file.
+
+        Returns:
+            (list) phoneme, end time pairs like parse_phonemes()
+        """
+        utterance = self.synth_text(sentence.encode(), self.voice)
+        if not utterance:
+            raise RuntimeError('Mimic failed to synthesize the sentence')
+        try:
+            if self.save_riff(self.utt_wave(utterance),
+                              wav_file.encode()) != 0:
+                raise RuntimeError('Mimic failed to write ' + wav_file)
+            phonemes = []
+            segment = self.relation_head(
+                self.utt_relation(utterance, b'Segment'))
+            while segment:
+                name = self.item_feat_string(segment, b'name').decode()
+                end = self.item_feat_float(segment, b'end')
+                phonemes.append([name, '{:1.3f}'.format(end)])
+                segment = self.item_next(segment)
+            return phonemes
+        finally:
+            self.delete_utterance(utterance)
+
+
 class Mimic(TTS):
     """TTS interface for local mimic v1."""
+    # Each chunk starts mimic and loads the voice, merge sentences into
+    # longer chunks once the first short chunk is playing.
+    chunking_policy = ChunkingPolicy(first_chunk_max_words=10,
+                                     max_chunk_chars=300)
+
     def __init__(self, lang, config):
         super(Mimic, self).__init__(
             lang, config, MimicValidator(self), 'wav',
@@ -138,6 +261,15 @@ class Mimic(TTS):
             trd.daemon = True
             trd.start()
 
+        # Subscriber voices are separate executables, not library voices
+        if self.voice not in self.subscriber_voices:
+            self.start_worker_pool(
+                'mycroft.tts.mimic_tts:MimicLibrarySynthesizer',
+                {'voice': self.voice,
+                 'duration_stretch': config.get('duration_stretch'),
+                 'library': config.get('library')}
+            )
+
     def modify_tag(self, tag):
         """Modify the SSML to suite Mimic."""
         ssml_conversions = {
@@ -187,6 +319,14 @@ class Mimic(TTS):
         Returns:
             tuple ((str) file location, (str) generated phonemes)
         """
+        # The library can't parse SSML, leave that to the executable
+        if self.worker_pool and self.remove_ssml(sentence) == sentence:
+            try:
+                phonemes = self.worker_pool.synthesize(sentence, wav_file)
+                return wav_file, phonemes
+            except WorkerError as err:
+                LOG.error('Synthesis worker failed ({}), using the mimic '
+                          'executable for "{}"'.format(err, sentence))
         phonemes = subprocess.check_output(self.args + ['-o', wav_file,
                                                         '-t', sentence])
         return wav_file, parse_phonemes(phonemes)
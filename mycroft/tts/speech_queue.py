@@ -0,0 +1,119 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Priority ordered queue of synthesized speech waiting to be played.
+
+Each speak request carries a priority class.  Audio chunks of a higher class
+are played before any queued chunks of a lower class, chunks of the same class
+are played in the order they were queued.  This makes a lower priority
+utterance resume at the next sentence boundary once the higher priority
+speech has been played.
+"""
+from enum import IntEnum
+from heapq import heappush, heappop
+from itertools import count
+from queue import Queue
+from time import monotonic
+
+from mycroft.util.log import LOG
+
+
+class SpeechPriority(IntEnum):
+    """Priority classes of speech, numerically lower is more urgent."""
+    HIGH = 0  # Interrupts any less urgent speech, e.g. alarms
+    NORMAL = 50
+    LOW = 100  # Long readouts that can wait, e.g. news
+
+    @classmethod
+    def from_value(cls, value):
+        """Get the priority class from the value of a speak message.
+
+        Args:
+            value (str/int/None): class name or numeric priority
+
+        Returns:
+            SpeechPriority, NORMAL if the value isn't understood.
+        """
+        if value is None:
+            return cls.NORMAL
+        elif isinstance(value, str):
+            try:
+                return cls[value.upper()]
+            except KeyError:
+                LOG.warning('Unknown speech priority {}'.format(value))
+                return cls.NORMAL
+        elif isinstance(value, (int, float)):
+            # Map numeric priorities onto the closest class
+            return min(cls, key=lambda priority: abs(priority - value))
+        else:
+            LOG.warning('Unknown speech priority {}'.format(value))
+            return cls.NORMAL
+
+
+def get_entry_priority(entry):
+    """Priority of a playback queue entry.
+
+    Entries are tuples of (snd_type, data, visemes, ident, listen) with an
+    optional priority as sixth element.
+    """
+    if len(entry) > 5:
+        return SpeechPriority(entry[5])
+    return SpeechPriority.NORMAL
+
+
+class SpeechQueue(Queue):
+    """Playback queue ordered by priority class and then insertion order.
+
+    on_put, if set, is called with each entry after it has been queued
+    allowing the consumer to react to more urgent speech arriving.
+    """
+    def __init__(self, maxsize=0):
+        super().__init__(maxsize)
+        self.on_put = None
+        self.last_wait = 0.0
+
+    def _init(self, maxsize):
+        self.queue = []
+        self._counter = count()
+        # Entries put back are ordered before everything of their class
+        self._front_counter = count(-1, -1)
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _put(self, entry):
+        heappush(self.queue, (get_entry_priority(entry),
+                              next(self._counter), monotonic(), entry))
+
+    def _get(self):
+        _, _, put_time, entry = heappop(self.queue)
+        self.last_wait = monotonic() - put_time
+        return entry
+
+    def put(self, entry, block=True, timeout=None):
+        super().put(entry, block, timeout)
+        if self.on_put:
+            self.on_put(entry)
+
+    def put_back(self, entry):
+        """Return an interrupted entry to the front of its priority class.
+
+        Args:
+            entry: the entry previously retrieved with get()
+        """
+        with self.not_full:
+            heappush(self.queue, (get_entry_priority(entry),
+                                  next(self._front_counter), monotonic(),
+                                  entry))
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
@@ -18,7 +18,7 @@ import random
 import re
 from abc import ABCMeta, abstractmethod
 from pathlib import Path
-from threading import Thread
+from threading import Lock, Thread
 from time import time
 from warnings import warn
 
@@ -36,8 +36,14 @@ from mycroft.util import (
 from mycroft.util.file_utils import get_temp_path
 from mycroft.util.log import LOG
 from mycroft.util.plugins import load_plugin
-from queue import Queue, Empty
-from .cache import hash_sentence, TextToSpeechCache
+from queue import Empty
+from .cache import (
+    CACHE_CODECS, CacheMaintenance, decode_audio, hash_sentence,
+    TextToSpeechCache
+)
+from .chunking import ChunkingPolicy
+from .speech_queue import SpeechPriority, SpeechQueue, get_entry_priority
+from .worker_pool import create_worker_pool
 
 _TTS_ENV = deepcopy(os.environ)
 _TTS_ENV['PULSE_PROP'] = 'media.role=phone'
@@ -73,18 +79,37 @@ class PlaybackThread(Thread):
     def __init__(self, queue):
         super(PlaybackThread, self).__init__()
         self.queue = queue
+        if isinstance(queue, SpeechQueue):
+            queue.on_put = self._check_preemption
         self.tts = []
         self.bus = None
 
         self._terminated = False
         self._processing_queue = False
+        # Priority of the audio currently playing, None when idle. Changed
+        # together with the playback process and the interrupted flag.
+        self._playback_lock = Lock()
+        self._current_priority = None
+        self._interrupted = False
+        # Listen request of speech finished while other speech was queued
+        self._listen_pending = False
         self.enclosure = None
         self.p = None
+        # Compressed cache files are decoded here before playback
+        self.decoded_file = get_temp_path('tts_playback.wav')
         # Check if the tts shall have a ducking role set
-        if Configuration.get().get('tts', {}).get('pulse_duck'):
+        tts_config = Configuration.get().get('tts', {})
+        if tts_config.get('pulse_duck'):
             self.pulse_env = _TTS_ENV
         else:
             self.pulse_env = None
+        # Caches of the attached tts objects are curated in the background
+        # while nothing is playing
+        self.cache_maintenance = CacheMaintenance(
+            lambda: [tts.cache for tts in list(self.tts)],
+            tts_config.get('cache_maintenance_interval', 60),
+            is_busy=lambda: self._processing_queue
+        )
 
     def init(self, tts):
         """DEPRECATED! Init the TTS Playback thread.
@@ -114,6 +139,7 @@ class PlaybackThread(Thread):
         """Remove all pending playbacks."""
         while not self.queue.empty():
             self.queue.get()
+        self._listen_pending = False
         try:
             self.p.terminate()
         except Exception:
@@ -123,22 +149,28 @@ class PlaybackThread(Thread):
         """Thread main loop. Get audio and extra data from queue and play.
 
         The queue messages is a tuple containing
-        snd_type: 'mp3' or 'wav' telling the loop what format the data is in
+        snd_type: 'mp3', 'wav' or a cache compression ('flac' / 'opus')
+                  telling the loop what format the data is in
         data: path to temporary audio data
         videmes: list of visemes to display while playing
         listen: if listening should be triggered at the end of the sentence.
+        priority: (optional) SpeechPriority of the audio.
 
         Playback of audio is started and the visemes are sent over the bus
         the loop then wait for the playback process to finish before starting
-        checking the next position in queue.
+        checking the next position in queue. If more urgent speech arrives
+        while playing, playback may be interrupted and the audio is put back
+        in the queue to be played again after the more urgent speech.
 
         If the queue is empty the end_audio() is called possibly triggering
         listening.
         """
+        self.cache_maintenance.start()
         while not self._terminated:
             try:
-                (snd_type, data,
-                 visemes, ident, listen) = self.queue.get(timeout=2)
+                entry = self.queue.get(timeout=2)
+                snd_type, data, visemes, ident, listen = entry[:5]
+                priority = get_entry_priority(entry)
                 self.blink(0.5)
                 if not self._processing_queue:
                     self._processing_queue = True
@@ -146,29 +178,85 @@ class PlaybackThread(Thread):
 
                 stopwatch = Stopwatch()
                 with stopwatch:
-                    if snd_type == 'wav':
-                        self.p = play_wav(data, environment=self.pulse_env)
-                    elif snd_type == 'mp3':
-                        self.p = play_mp3(data, environment=self.pulse_env)
+                    if snd_type in CACHE_CODECS:
+                        if decode_audio(data, self.decoded_file):
+                            snd_type, data = 'wav', self.decoded_file
+                        else:
+                            snd_type = None
+                    with self._playback_lock:
+                        self.p = self._start_playback(snd_type, data)
+                        self._current_priority = priority
+                        self._interrupted = False
                     if visemes:
                         self.show_visemes(visemes)
                     if self.p:
                         self.p.communicate()
                         self.p.wait()
-                report_timing(ident, 'speech_playback', stopwatch)
-
-                if self.queue.empty():
-                    self.end_audio(listen)
+                with self._playback_lock:
+                    self._current_priority = None
+                    interrupted = self._interrupted
+                    self._interrupted = False
+                report_timing(ident, 'speech_playback', stopwatch,
+                              {'priority': priority.name.lower(),
+                               'queue_wait': getattr(self.queue,
+                                                     'last_wait', None),
+                               'interrupted': interrupted})
+
+                if interrupted:
+                    self.queue.put_back(entry)
+                elif self.queue.empty():
+                    self.end_audio(listen or self._listen_pending)
+                    self._listen_pending = False
                     self._processing_queue = False
+                elif listen:
+                    self._listen_pending = True
                 self.blink(0.2)
             except Empty:
                 pass
             except Exception as e:
                 LOG.exception(e)
+                with self._playback_lock:
+                    self._current_priority = None
+                    self._interrupted = False
                 if self._processing_queue:
                     self.end_audio(listen)
                     self._processing_queue = False
 
+    def _check_preemption(self, entry):
+        """Interrupt playing speech if more urgent speech has been queued.
+
+        Only high priority speech interrupts, other classes wait until the
+        current sentence has been played.
+
+        Args:
+            entry: playback queue entry that was just queued
+        """
+        priority = get_entry_priority(entry)
+        with self._playback_lock:
+            current_priority = self._current_priority
+            if (priority == SpeechPriority.HIGH and
+                    current_priority is not None and
+                    priority < current_priority and self.p):
+                LOG.info('Interrupting {} priority speech'.format(
+                    current_priority.name.lower()))
+                self._interrupted = True
+                try:
+                    self.p.terminate()
+                except Exception:
+                    pass
+
+    def _start_playback(self, snd_type, data):
+        """Start the process playing an audio file.
+
+        Returns:
+            the playback process, None if the audio can't be played
+        """
+        if snd_type == 'wav':
+            return play_wav(data, environment=self.pulse_env)
+        elif snd_type == 'mp3':
+            return play_mp3(data, environment=self.pulse_env)
+        return None
+
     def begin_audio(self):
         """Perform befining of speech actions."""
         # Create signals informing start of speech
@@ -180,8 +268,8 @@ class PlaybackThread(Thread):
     def end_audio(self, listen):
         """Perform end of speech output actions.
 
-        Will inform the system that speech has ended and trigger the TTS's
-        cache checks. Listening will be triggered if requested.
+        Will inform the system that speech has ended. Listening will be
+        triggered if requested.
 
         Args:
             listen (bool): True if listening event should be emitted
@@ -192,11 +280,6 @@ class PlaybackThread(Thread):
             if listen:
                 self.bus.emit(Message('mycroft.mic.listen'))
 
-            # Clear cache for all attached tts objects
-            # This is basically the only safe time
-            for tts in self.tts:
-                tts.cache.curate()
-
             # This check will clear the filesystem IPC "signal"
             check_for_signal("isSpeaking")
         else:
@@ -226,6 +309,7 @@ class PlaybackThread(Thread):
     def stop(self):
         """Stop thread"""
         self._terminated = True
+        self.cache_maintenance.stop()
         self.clear_queue()
 
 
@@ -244,6 +328,10 @@ class TTS(metaclass=ABCMeta):
     """
     queue = None
     playback = None
+    # Latency / chunk size trade-off of the engine. Every sentence is a
+    # chunk by default, engines override this to match how their synthesis
+    # time scales with the length of the text.
+    chunking_policy = ChunkingPolicy()
 
     def __init__(self, lang, config, validator, audio_ext='wav',
                  phonetic_spelling=True, ssml_tags=None):
@@ -257,21 +345,24 @@ class TTS(metaclass=ABCMeta):
         self.ssml_tags = ssml_tags or []
 
         self.voice = config.get("voice")
+        self.chunking = self.chunking_policy.updated(config.get('chunking'))
         self.filename = get_temp_path('tts.wav')
         self.enclosure = None
+        self.worker_pool = None
+        self._shutdown = False
         random.seed()
 
         if TTS.queue is None:
-            TTS.queue = Queue()
+            TTS.queue = SpeechQueue()
             TTS.playback = PlaybackThread(TTS.queue)
             TTS.playback.start()
 
         self.spellings = self.load_spellings()
         self.tts_name = type(self).__name__
         self.cache = TextToSpeechCache(
-            self.config, self.tts_name, self.audio_ext
+            self.config, self.tts_name, self.audio_ext, self.lang
         )
-        self.cache.clear()
+        self.cache.load_temporary_cache()
 
     @property
     def available_languages(self) -> set:
@@ -310,8 +401,8 @@ class TTS(metaclass=ABCMeta):
 
         Sends the recognizer_loop:audio_output_end message (indicating
         that speaking is done for the moment) as well as trigger listening
-        if it has been requested. It also checks if cache directory needs
-        cleaning to free up disk space.
+        if it has been requested. The cache is maintained in the background
+        by the playback thread.
 
         Args:
             listen (bool): indication if listening trigger should be sent.
@@ -321,7 +412,6 @@ class TTS(metaclass=ABCMeta):
         if listen:
             self.bus.emit(Message('mycroft.mic.listen'))
 
-        self.cache.curate()
         # This check will clear the "signal"
         check_for_signal("isSpeaking")
 
@@ -337,6 +427,44 @@ class TTS(metaclass=ABCMeta):
         self.enclosure = EnclosureAPI(self.bus)
         TTS.playback.enclosure = self.enclosure
 
+    def start_worker_pool(self, synthesizer, worker_config):
+        """Start long-lived synthesis workers in the background.
+
+        The number of workers is taken from the "workers" setting of the
+        engine configuration, nothing is started if it's not set. Once
+        started the pool is available as self.worker_pool, until then (or if
+        it fails to start) it is None.
+
+        Args:
+            synthesizer (str): "module:Class" of the synthesizer run by the
+                               workers, see mycroft.tts.worker_pool
+            worker_config (dict): configuration for the synthesizer
+        """
+        size = self.config.get('workers')
+        if not size:
+            return
+
+        def start():
+            try:
+                pool = create_worker_pool(synthesizer, worker_config, size)
+            except Exception:
+                LOG.exception('Synthesis workers could not be started, '
+                              'using one process per sentence')
+                return
+            if self._shutdown:
+                pool.shutdown()
+            else:
+                self.worker_pool = pool
+
+        Thread(target=start, daemon=True).start()
+
+    def shutdown(self):
+        """Release resources held by the engine such as synthesis workers."""
+        self._shutdown = True
+        if self.worker_pool:
+            self.worker_pool.shutdown()
+            self.worker_pool = None
+
     def get_tts(self, sentence, wav_file):
         """Abstract method that a tts implementation needs to implement.
 
@@ -402,7 +530,9 @@ class TTS(metaclass=ABCMeta):
     def preprocess_utterance(self, utterance):
         """Preprocess utterance into list of chunks suitable for the TTS.
 
-        Perform general chunking and TTS specific chunking.
+        Perform general chunking and TTS specific chunking, then arrange the
+        chunks according to the chunking policy of the engine. Sentences
+        found in the cache are kept whole so they're still cache hits.
         """
         # Remove any whitespace present after the period,
         # if a character (only alpha) ends with a period
@@ -412,7 +542,31 @@ class TTS(metaclass=ABCMeta):
         result = []
         for chunk in chunks:
             result += self._preprocess_sentence(chunk)
-        return result
+        return self.chunking.apply(result, keep=self._is_cached)
+
+    def _is_cached(self, sentence):
+        """Check if the audio of a sentence is in the cache.
+
+        The sentence is transformed like execute() does before looking it up.
+
+        Args:
+            sentence (str): sentence as split by preprocess_utterance()
+
+        Returns:
+            bool: True if all parts of the sentence are cached
+        """
+        sentence = self._apply_spellings(self.validate_ssml(sentence))
+        return all(hash_sentence(part) in self.cache
+                   for part in self._preprocess_sentence(sentence))
+
+    def _apply_spellings(self, sentence):
+        """Replace words with their phonetic spelling if enabled."""
+        if self.phonetic_spelling:
+            for word in re.findall(r"[\w']+", sentence):
+                if word.lower() in self.spellings:
+                    sentence = sentence.replace(word,
+                                                self.spellings[word.lower()])
+        return sentence
 
     def _preprocess_sentence(self, sentence):
         """Default preprocessing is no preprocessing.
@@ -428,7 +582,8 @@ class TTS(metaclass=ABCMeta):
         """
         return [sentence]
 
-    def execute(self, sentence, ident=None, listen=False):
+    def execute(self, sentence, ident=None, listen=False,
+                priority=SpeechPriority.NORMAL):
         """Convert sentence to speech, preprocessing out unsupported ssml
 
         The method caches results if possible using the hash of the
@@ -439,18 +594,16 @@ class TTS(metaclass=ABCMeta):
             ident: (str) Id reference to current interaction
             listen: (bool) True if listen should be triggered at the end
                     of the utterance.
+            priority: (SpeechPriority) priority class of the speech
         """
         sentence = self.validate_ssml(sentence)
 
         create_signal("isSpeaking")
-        self._execute(sentence, ident, listen)
+        self._execute(sentence, ident, listen, priority)
 
-    def _execute(self, sentence, ident, listen):
-        if self.phonetic_spelling:
-            for word in re.findall(r"[\w']+", sentence):
-                if word.lower() in self.spellings:
-                    sentence = sentence.replace(word,
-                                                self.spellings[word.lower()])
+    def _execute(self, sentence, ident, listen,
+                 priority=SpeechPriority.NORMAL):
+        sentence = self._apply_spellings(sentence)
 
         # TODO: 22.02 This is no longer needed and can be removed
         # Just kept for compatibility for now
@@ -460,17 +613,22 @@ class TTS(metaclass=ABCMeta):
                   for i in range(len(chunks))]
 
         for sentence, l in chunks:
+            audio_type = self.audio_ext
             sentence_hash = hash_sentence(sentence)
             if sentence_hash in self.cache:
+                self.cache.statistics.hits += 1
                 audio_file, phoneme_file = self._get_sentence_from_cache(
                     sentence_hash
                 )
+                if audio_file.is_compressed:
+                    audio_type = audio_file.file_type
                 if phoneme_file is None:
                     phonemes = None
                 else:
                     phonemes = phoneme_file.load()
 
             else:
+                self.cache.statistics.misses += 1
                 # TODO: this should be changed return the audio data from
                 #  the API call and then to call the add_to_cache method
                 #  of the TTS cache.  But this requires changing the public
@@ -502,7 +660,7 @@ class TTS(metaclass=ABCMeta):
                 )
             viseme = self.viseme(phonemes) if phonemes else None
             TTS.queue.put(
-                (self.audio_ext, str(audio_file.path), viseme, ident, l)
+                (audio_type, str(audio_file.path), viseme, ident, l, priority)
             )
 
     def _get_sentence_from_cache(self, sentence_hash):
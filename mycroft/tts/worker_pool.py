@@ -0,0 +1,307 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Pools of long-lived synthesis processes for local TTS engines.
+
+Local engines traditionally start their synthesizer executable once for every
+sentence, reloading the voice each time.  A worker pool instead keeps a few
+processes alive with the voice loaded and hands them sentences over a pipe.
+
+Workers talk a line based JSON protocol on stdin / stdout.  Each request is a
+single line and is answered by a single line:
+
+    {"sentence": "Hello", "wav_file": "/tmp/x.wav"} -> {"phonemes": null}
+    {"ping": true} -> {"pong": true}
+
+An error is reported as {"error": "description"}.
+
+Running this module starts a worker wrapping a synthesizer class:
+
+    python -m mycroft.tts.worker_pool package.module:Class '{"voice": "ap"}'
+
+The synthesizer class is constructed with the engine configuration, loading
+everything it needs, and must provide synthesize(sentence, wav_file)
+returning the phonemes of the sentence or None.
+"""
+from importlib import import_module
+import json
+import os
+import subprocess
+import sys
+from queue import Queue, Empty
+from threading import Event, Lock, Thread
+
+from mycroft.util.log import LOG
+
+
+class WorkerError(Exception):
+    """A synthesis worker failed or stopped responding."""
+
+
+class TTSWorker:
+    """A single long-lived synthesis process.
+
+    Args:
+        command (list): command line starting the worker process
+        timeout (float): seconds to wait for a response
+    """
+    def __init__(self, command, timeout=30.0):
+        self.command = command
+        self.timeout = timeout
+        self.process = None
+        self.restarts = 0
+        self._responses = Queue()
+
+    def start(self):
+        """Start the process and wait until it's ready to synthesize."""
+        self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE,
+                                        universal_newlines=True, bufsize=1)
+        self._responses = Queue()
+        reader = Thread(target=self._read_responses,
+                        args=(self.process, self._responses), daemon=True)
+        reader.start()
+        self.ping()
+
+    def stop(self):
+        """Stop the worker process."""
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except Exception:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def restart(self):
+        """Replace the worker process with a new one."""
+        self.restarts += 1
+        self.stop()
+        self.start()
+
+    @property
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def ping(self):
+        """Check that the worker is responsive.
+
+        Raises:
+            WorkerError if the worker doesn't answer.
+        """
+        self.request({'ping': True})
+
+    def synthesize(self, sentence, wav_file):
+        """Let the worker synthesize a sentence.
+
+        Args:
+            sentence (str): sentence to synthesize
+            wav_file (str): file to write the audio to
+
+        Returns:
+            phonemes reported by the worker or None
+        """
+        response = self.request({'sentence': sentence, 'wav_file': wav_file})
+        return response.get('phonemes')
+
+    def request(self, data):
+        """Send a request and wait for the response.
+
+        Args:
+            data (dict): request to send
+
+        Returns:
+            (dict) response from the worker
+        """
+        if not self.is_alive:
+            raise WorkerError('Worker process is not running')
+        try:
+            self.process.stdin.write(json.dumps(data) + '\n')
+            self.process.stdin.flush()
+            line = self._responses.get(timeout=self.timeout)
+        except (OSError, ValueError) as e:
+            raise WorkerError('Failed to communicate with worker') from e
+        except Empty:
+            raise WorkerError('Worker did not respond in time')
+        if line is None:
+            raise WorkerError('Worker process exited')
+        response = json.loads(line)
+        if response.get('error'):
+            raise WorkerError(response['error'])
+        return response
+
+    @staticmethod
+    def _read_responses(process, responses):
+        """Forward response lines from the process until it exits."""
+        for line in process.stdout:
+            responses.put(line)
+        responses.put(None)
+
+
+class TTSWorkerPool:
+    """Pool of synthesis workers with health checks and restarts.
+
+    Each sentence is handed to an idle worker, blocking until one becomes
+    available. A worker that fails is restarted, a background thread
+    periodically pings idle workers to detect crashes between sentences.
+
+    Args:
+        command (list): command line starting a worker process
+        size (int): number of workers
+        timeout (float): seconds to wait for a response
+        check_interval (float): seconds between health checks
+    """
+    def __init__(self, command, size=1, timeout=30.0, check_interval=60.0):
+        self.workers = [TTSWorker(command, timeout) for _ in range(size)]
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self._idle = Queue()
+        self._stopped = Event()
+        self._monitor = None
+
+    def start(self):
+        """Start all workers.
+
+        Raises:
+            WorkerError if the workers can't be started.
+        """
+        try:
+            for worker in self.workers:
+                worker.start()
+                self._idle.put(worker)
+        except Exception as e:
+            self.shutdown()
+            raise WorkerError('Failed to start synthesis workers') from e
+        self._monitor = Thread(target=self._check_health_loop, daemon=True)
+        self._monitor.start()
+
+    def synthesize(self, sentence, wav_file):
+        """Synthesize a sentence on the next idle worker.
+
+        Args:
+            sentence (str): sentence to synthesize
+            wav_file (str): file to write the audio to
+
+        Returns:
+            phonemes reported by the worker or None
+
+        Raises:
+            WorkerError if the sentence couldn't be synthesized.
+        """
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except Empty:
+            raise WorkerError('No synthesis worker available')
+        try:
+            return worker.synthesize(sentence, wav_file)
+        except WorkerError:
+            self._restart(worker)
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def check_health(self):
+        """Ping the idle workers, restarting the ones not responding."""
+        for _ in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except Empty:
+                break
+            try:
+                worker.ping()
+            except WorkerError:
+                self._restart(worker)
+            finally:
+                self._idle.put(worker)
+
+    def shutdown(self):
+        """Stop all workers."""
+        self._stopped.set()
+        for worker in self.workers:
+            worker.stop()
+
+    def _restart(self, worker):
+        LOG.warning('Restarting synthesis worker')
+        try:
+            worker.restart()
+        except Exception:
+            LOG.exception('Failed to restart synthesis worker')
+
+    def _check_health_loop(self):
+        while not self._stopped.wait(self.check_interval):
+            self.check_health()
+
+
+def create_worker_pool(synthesizer, config, size):
+    """Start a pool of workers running a synthesizer class.
+
+    Args:
+        synthesizer (str): "module:Class" of the synthesizer
+        config (dict): configuration passed to the synthesizer
+        size (int): number of workers, clamped to the number of CPUs
+
+    Returns:
+        Running TTSWorkerPool
+
+    Raises:
+        WorkerError if the workers can't be started.
+    """
+    size = max(1, min(int(size), os.cpu_count() or 1))
+    command = [sys.executable, '-m', 'mycroft.tts.worker_pool',
+               synthesizer, json.dumps(config)]
+    pool = TTSWorkerPool(command, size)
+    pool.start()
+    LOG.info('Started {} synthesis worker(s) using {}'.format(
+        size, synthesizer))
+    return pool
+
+
+def serve(synthesizer, requests, responses):
+    """Answer synthesis requests until the input is closed.
+
+    Args:
+        synthesizer: object providing synthesize(sentence, wav_file)
+        requests: file like object to read requests from
+        responses: file like object to write responses to
+    """
+    for line in requests:
+        try:
+            request = json.loads(line)
+            if request.get('ping'):
+                response = {'pong': True}
+            else:
+                phonemes = synthesizer.synthesize(request['sentence'],
+                                                  request['wav_file'])
+                response = {'phonemes': phonemes}
+        except Exception as e:
+            response = {'error': repr(e)}
+        responses.write(json.dumps(response) + '\n')
+        responses.flush()
+
+
+def main(argv):
+    """Run a synthesis worker process."""
+    module_name, class_name = argv[1].split(':')
+    config = json.loads(argv[2]) if len(argv) > 2 else {}
+    # Keep the protocol stream to ourselves, anything else printing to
+    # stdout (libraries, logging) ends up on stderr.
+    responses = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    synthesizer = getattr(import_module(module_name), class_name)(config)
+    serve(synthesizer, sys.stdin, responses)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,119 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Weigh the decode cost of compressed TTS cache entries against the hit rate
+gained by fitting more entries into the same amount of storage.
+
+The WAV files to use are given on the command line, typically the contents of
+a TTS cache directory.  Each file is compressed with every codec available on
+the system, the average size and decode time is measured and the hit rate of
+an LRU cache with a fixed storage budget is simulated for a Zipf distributed
+stream of sentences.
+
+Example:
+    python scripts/benchmarks/tts_cache_compression.py \\
+        --budget 20 --synthesis-time 0.6 /tmp/mycroft/cache/tts/Mimic/*.wav
+"""
+from argparse import ArgumentParser
+from collections import OrderedDict
+from pathlib import Path
+import random
+import shutil
+from tempfile import mkdtemp
+from time import monotonic
+
+from mycroft.tts.cache import AudioFile, CACHE_CODECS, decode_audio
+
+
+def measure_codec(wav_files, codec, work_dir):
+    """Return average compressed size and decode time for a codec."""
+    sizes = []
+    decode_times = []
+    decoded_path = work_dir.joinpath('decoded.wav')
+    for index, wav_file in enumerate(wav_files):
+        source = AudioFile(work_dir, str(index), 'wav')
+        shutil.copyfile(str(wav_file), str(source.path))
+        compressed = source.compress(codec)
+        if compressed is None:
+            return None
+        sizes.append(compressed.path.stat().st_size)
+        start = monotonic()
+        decode_audio(compressed.path, decoded_path)
+        decode_times.append(monotonic() - start)
+    return sum(sizes) / len(sizes), sum(decode_times) / len(decode_times)
+
+
+def simulate_hit_rate(capacity, sentences, requests, zipf_exponent, seed):
+    """Hit rate of an LRU cache holding capacity entries."""
+    rng = random.Random(seed)
+    weights = [1 / (rank ** zipf_exponent) for rank in range(1, sentences + 1)]
+    stream = rng.choices(range(sentences), weights=weights, k=requests)
+    cache = OrderedDict()
+    hits = 0
+    for sentence in stream:
+        if sentence in cache:
+            hits += 1
+            cache.move_to_end(sentence)
+        else:
+            cache[sentence] = True
+            if len(cache) > capacity:
+                cache.popitem(last=False)
+    return hits / requests
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('wav_files', nargs='+', type=Path)
+    parser.add_argument('--budget', type=float, default=20.0,
+                        help='cache storage budget in MB')
+    parser.add_argument('--synthesis-time', type=float, default=0.5,
+                        help='average seconds to synthesize a sentence')
+    parser.add_argument('--sentences', type=int, default=20000,
+                        help='number of distinct sentences spoken')
+    parser.add_argument('--requests', type=int, default=200000)
+    parser.add_argument('--zipf', type=float, default=1.0,
+                        help='exponent of the sentence popularity')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    budget = args.budget * 1024 * 1024
+    wav_size = (sum(f.stat().st_size for f in args.wav_files) /
+                len(args.wav_files))
+    results = [('wav', wav_size, 0.0)]
+    work_dir = Path(mkdtemp())
+    try:
+        for codec in CACHE_CODECS:
+            measurement = measure_codec(args.wav_files, codec, work_dir)
+            if measurement is None:
+                print('{}: encoder not available, skipped'.format(codec))
+            else:
+                results.append((codec,) + measurement)
+    finally:
+        shutil.rmtree(str(work_dir))
+
+    print('{:<6}{:>12}{:>8}{:>12}{:>10}{:>12}{:>14}'.format(
+        'format', 'avg size kB', 'ratio', 'decode ms', 'entries',
+        'hit rate', 'avg cost ms'))
+    for file_type, size, decode_time in results:
+        capacity = int(budget // size)
+        hit_rate = simulate_hit_rate(capacity, args.sentences, args.requests,
+                                     args.zipf, args.seed)
+        cost = (hit_rate * decode_time +
+                (1 - hit_rate) * args.synthesis_time)
+        print('{:<6}{:>12.1f}{:>8.2f}{:>12.2f}{:>10}{:>12.3f}{:>14.1f}'.format(
+            file_type, size / 1024, wav_size / size, decode_time * 1000,
+            capacity, hit_rate, cost * 1000))
+
+
+if __name__ == '__main__':
+    main()
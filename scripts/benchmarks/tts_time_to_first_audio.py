@@ -0,0 +1,135 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compare the time to first audio of sentence chunking and the adaptive
+chunking policies of the TTS engines.
+
+The engines are replaced by local stand-ins sleeping for a fixed per request
+overhead plus a per character synthesis time, so no voices or network access
+are needed.  Each utterance is chunked, the chunks are "synthesized" one after
+the other while playback of the finished chunks is simulated at a fixed
+speaking rate.  Reported are the time until the first chunk is ready, the
+total time playback stalled waiting for synthesis and the number of chunks.
+
+Example:
+    python scripts/benchmarks/tts_time_to_first_audio.py --scale 0.2
+"""
+from argparse import ArgumentParser
+from statistics import mean
+from time import monotonic, sleep
+
+from mycroft.tts.espeak_tts import ESpeak
+from mycroft.tts.mimic_tts import Mimic
+from mycroft.tts.mimic2_tts import Mimic2, _sentence_chunker
+from mycroft.tts.tts import TTS, default_preprocess_utterance
+
+# Stand-ins: (chunking policy, engine sentence splitter,
+#             seconds per request, seconds per character)
+ENGINES = {
+    'mimic': (Mimic.chunking_policy, None, 0.25, 0.004),
+    'mimic2': (Mimic2.chunking_policy, _sentence_chunker, 0.3, 0.002),
+    'espeak': (ESpeak.chunking_policy, None, 0.02, 0.0002),
+    'default': (TTS.chunking_policy, None, 0.2, 0.003),
+}
+
+# Seconds of audio per character of text at a normal speaking rate
+SPEAKING_RATE = 0.07
+
+UTTERANCES = [
+    'It is currently 14 degrees and clear.',
+    'Today will be mostly sunny, with a high of 21 degrees and a low of '
+    '12 degrees. Tomorrow clouds will move in during the afternoon.',
+    'Here is the latest news from the BBC. The prime minister announced a '
+    'new plan for public transport on Monday, promising faster trains '
+    'between the major cities. Critics said the funding falls short of what '
+    'is needed. In other news, the national football team qualified for '
+    'the finals.',
+    'Harris said he felt such extraordinary fits of giddiness come over him '
+    'at times, that he hardly knew what he was doing; and then George said '
+    'that he had fits of giddiness too, and hardly knew what he was doing.',
+    'Your timer is set for 10 minutes.',
+    'I found three matching recipes: pancakes with blueberries, a classic '
+    'French omelette and a vegetable frittata. Which one would you like?',
+]
+
+
+def sentence_chunks(utterance, splitter):
+    """Chunks as produced before the chunking policy, one per sentence."""
+    chunks = []
+    for sentence in default_preprocess_utterance(utterance):
+        chunks += splitter(sentence) if splitter else [sentence]
+    return chunks
+
+
+def adaptive_chunks(utterance, splitter, policy):
+    """Chunks arranged by the chunking policy of the engine."""
+    return policy.apply(sentence_chunks(utterance, splitter))
+
+
+def run(chunks, overhead, per_char, scale):
+    """Synthesize chunks with a stand-in engine, simulating playback.
+
+    Returns:
+        tuple: (time to first audio, total stall time) in seconds
+    """
+    start = monotonic()
+    playback_end = None
+    first_audio = None
+    stalled = 0.0
+    for chunk in chunks:
+        sleep((overhead + per_char * len(chunk)) * scale)
+        ready = (monotonic() - start) / scale
+        if playback_end is None:
+            first_audio = ready
+            playback_end = ready
+        elif ready > playback_end:
+            stalled += ready - playback_end
+            playback_end = ready
+        playback_end += SPEAKING_RATE * len(chunk)
+    return first_audio, stalled
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='factor applied to the stand-in synthesis times')
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES),
+                        choices=list(ENGINES))
+    args = parser.parse_args()
+
+    print('{:<9}{:<10}{:>12}{:>12}{:>12}{:>8}'.format(
+        'engine', 'chunking', 'avg ttfa ms', 'max ttfa ms', 'stall ms',
+        'chunks'))
+    for name in args.engines:
+        policy, splitter, overhead, per_char = ENGINES[name]
+        strategies = [
+            ('sentence', lambda u: sentence_chunks(u, splitter)),
+            ('adaptive', lambda u: adaptive_chunks(u, splitter, policy))
+        ]
+        for strategy, chunker in strategies:
+            first_audio = []
+            stalls = []
+            chunk_count = 0
+            for utterance in UTTERANCES:
+                chunks = chunker(utterance)
+                chunk_count += len(chunks)
+                ttfa, stalled = run(chunks, overhead, per_char, args.scale)
+                first_audio.append(ttfa)
+                stalls.append(stalled)
+            print('{:<9}{:<10}{:>12.0f}{:>12.0f}{:>12.0f}{:>8}'.format(
+                name, strategy, mean(first_audio) * 1000,
+                max(first_audio) * 1000, sum(stalls) * 1000, chunk_count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compare MycroftSkill.voc_match with a compiled vocabulary against the
+previous implementation building a regular expression per phrase per call.
+
+The vocabularies are the .voc files shipped in mycroft/res/text/en-us plus a
+generated vocabulary with many phrases.  Each utterance is matched against
+each vocabulary, reported is the average time per voc_match call.
+
+Example:
+    python scripts/benchmarks/voc_match.py --repeat 200
+"""
+from argparse import ArgumentParser
+from glob import glob
+from itertools import chain
+from os.path import basename, dirname, join
+import re
+from timeit import timeit
+
+import mycroft
+from mycroft.skills.skill_data import read_vocab_file, VocabularyMatcher
+
+UTTERANCES = [
+    'yes',
+    'no thanks',
+    'yes please go ahead',
+    'i would rather not do that right now',
+    'could you tell me what the weather will be like in london tomorrow',
+    'set a timer for ten minutes and then remind me to take out the '
+    'pizza from the oven',
+]
+
+
+def previous_voc_match(utt, vocab, exact=False):
+    """voc_match as implemented before the vocabulary was compiled."""
+    if exact:
+        return any(i.strip() == utt for i in vocab)
+    return any([re.match(r'.*\b' + i + r'\b.*', utt) for i in vocab])
+
+
+def load_vocabularies(size):
+    vocab_dir = join(dirname(mycroft.__file__), 'res', 'text', 'en-us')
+    vocabularies = {}
+    for path in sorted(glob(join(vocab_dir, '*.voc'))):
+        name = basename(path)[:-len('.voc')]
+        vocabularies[name] = list(chain(*read_vocab_file(path)))
+    vocabularies['generated'] = ['phrase number {}'.format(i)
+                                 for i in range(size)]
+    return vocabularies
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=100,
+                        help='times each utterance is matched')
+    parser.add_argument('--size', type=int, default=200,
+                        help='phrases in the generated vocabulary')
+    args = parser.parse_args()
+
+    calls = args.repeat * len(UTTERANCES)
+    print('{:<16}{:>8}{:>14}{:>14}{:>10}'.format(
+        'vocabulary', 'phrases', 'previous us', 'compiled us', 'speedup'))
+    for name, vocab in load_vocabularies(args.size).items():
+        matcher = VocabularyMatcher(vocab)
+        for utt in UTTERANCES:  # Both must agree
+            assert matcher.match(utt) == bool(previous_voc_match(utt, vocab))
+
+        previous = timeit(
+            lambda: [previous_voc_match(utt, vocab) for utt in UTTERANCES],
+            number=args.repeat) / calls
+        compiled = timeit(
+            lambda: [matcher.match(utt) for utt in UTTERANCES],
+            number=args.repeat) / calls
+        print('{:<16}{:>8}{:>14.1f}{:>14.1f}{:>9.1f}x'.format(
+            name, len(vocab), previous * 1e6, compiled * 1e6,
+            previous / compiled))
+
+
+if __name__ == '__main__':
+    main()
@@ -25,6 +25,7 @@ import mycroft.audio.speech as speech
 from mycroft.messagebus import Message
 from mycroft.tts.tts import default_preprocess_utterance
 from mycroft.tts.remote_tts import RemoteTTSTimeoutException
+from mycroft.tts.speech_queue import SpeechPriority
 
 """Tests for speech dispatch service."""
 
@@ -75,8 +76,35 @@ class TestSpeech(unittest.TestCase):
                             context={'ident': 'a'})
         speech.handle_speak(speak_msg)
         tts_mock.execute.assert_has_calls(
-                [mock.call('hello there.', 'a', False),
-                 mock.call('world', 'a', False)])
+                [mock.call('hello there.', 'a', False,
+                           SpeechPriority.NORMAL),
+                 mock.call('world', 'a', False,
+                           SpeechPriority.NORMAL)])
+
+    def test_speak_legacy_execute(self, tts_factory_mock, config_mock):
+        """Ensure engines overriding execute without priority still work."""
+        setup_mocks(config_mock, tts_factory_mock)
+        spoken = []
+
+        class LegacyTTS:
+            def execute(self, sentence, ident=None, listen=False):
+                spoken.append((sentence, ident, listen))
+
+        legacy_tts = mock.Mock()
+        legacy_tts.execute = LegacyTTS().execute
+        legacy_tts.preprocess_utterance.side_effect = \
+            default_preprocess_utterance
+        tts_factory_mock.create.return_value = legacy_tts
+        bus = mock.Mock()
+        speech.init(bus)
+
+        speak_msg = Message('speak',
+                            data={'utterance': 'hello there. world',
+                                  'priority': 'high'},
+                            context={'ident': 'a'})
+        speech.handle_speak(speak_msg)
+        self.assertEqual(spoken, [('hello there.', 'a', False),
+                                  ('world', 'a', False)])
 
     @mock.patch('mycroft.audio.speech.Mimic')
     def test_fallback_tts(self, mimic_cls_mock, tts_factory_mock, config_mock):
@@ -97,8 +125,10 @@ class TestSpeech(unittest.TestCase):
                             context={'ident': 'a'})
         speech.handle_speak(speak_msg)
         mimic_mock.execute.assert_has_calls(
-                [mock.call('hello there.', 'a', False),
-                 mock.call('world', 'a', False)])
+                [mock.call('hello there.', 'a', False,
+                           SpeechPriority.NORMAL),
+                 mock.call('world', 'a', False,
+                           SpeechPriority.NORMAL)])
 
     @mock.patch('mycroft.audio.speech.check_for_signal')
     def test_abort_speak(self, check_for_signal_mock, tts_factory_mock,
@@ -136,7 +166,8 @@ class TestSpeech(unittest.TestCase):
                             context={'ident': 'a'})
         speech.handle_speak(speak_msg)
         tts_mock.execute.assert_has_calls(
-                [mock.call('hello there. world', 'a', False)])
+                [mock.call('hello there. world', 'a', False,
+                           SpeechPriority.NORMAL)])
 
         config_mock.get.return_value = {}
 
@@ -16,6 +16,10 @@
 import unittest
 import pathlib
 import json
+import os
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import mock
 
 from mycroft.dialog import MustacheDialogRenderer, load_dialogs, get
 from mycroft.util import resolve_resource_file
@@ -88,6 +92,21 @@ class DialogTest(unittest.TestCase):
                     self.assertEqual(self.stache.render(f.name, index=index),
                                      line.strip())
 
+    def test_options(self):
+        """Test expansion of options in templates with placeholders."""
+        self.stache.templates['options'] = ['(hi|hello) {name}']
+        results = {self.stache.render('options', {'name': '(Bob)'})
+                   for _ in range(50)}
+        # Values aren't parsed for options
+        self.assertEqual(results, {'hi (Bob)', 'hello (Bob)'})
+
+    def test_not_repeated(self):
+        """Test that recently rendered lines aren't picked again."""
+        self.stache.templates['lines'] = ['one', 'two', 'three', 'four']
+        rendered = [self.stache.render('lines') for _ in range(40)]
+        for i in range(1, len(rendered)):
+            self.assertNotIn(rendered[i], rendered[max(0, i - 2):i])
+
     def test_dialog_loader(self):
         template_path = self.topdir.joinpath('./multiple_dialogs')
         renderer = load_dialogs(template_path)
@@ -118,5 +137,48 @@ class DialogTest(unittest.TestCase):
         self.assertEqual(string, 'testing aardwark')
 
 
+class DialogCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dialog_dir = pathlib.Path(mkdtemp())
+        self.addCleanup(rmtree, str(self.dialog_dir))
+        self.dialog_file = self.dialog_dir.joinpath('cached.dialog')
+        self.dialog_file.write_text('first')
+
+        cache_patch = mock.patch('mycroft.dialog.dialog._dialog_cache', {})
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+        resolve_patch = mock.patch(
+            'mycroft.dialog.dialog.resolve_resource_file',
+            side_effect=self._resolve)
+        self.resolve = resolve_patch.start()
+        self.addCleanup(resolve_patch.stop)
+
+    def _resolve(self, filename):
+        path = self.dialog_dir.joinpath(pathlib.Path(filename).name)
+        return str(path) if path.exists() else None
+
+    def test_cached(self):
+        self.assertEqual(get('cached', 'en-us'), 'first')
+        self.assertEqual(get('cached', 'en-us'), 'first')
+        self.assertEqual(get('missing', 'en-us'), 'missing')
+        self.assertEqual(get('missing', 'en-us'), 'missing')
+        self.assertEqual(self.resolve.call_count, 2)
+
+    def test_modified(self):
+        self.assertEqual(get('cached', 'en-us'), 'first')
+        self.dialog_file.write_text('second')
+        os.utime(str(self.dialog_file), ns=(0, 0))
+        # Not checked until the check interval passed
+        self.assertEqual(get('cached', 'en-us'), 'first')
+        with mock.patch('mycroft.dialog.dialog.DIALOG_CHECK_INTERVAL', -1):
+            self.assertEqual(get('cached', 'en-us'), 'second')
+
+    def test_added(self):
+        self.assertEqual(get('added', 'en-us'), 'added')
+        self.dialog_dir.joinpath('added.dialog').write_text('now added')
+        with mock.patch('mycroft.dialog.dialog.DIALOG_CHECK_INTERVAL', -1):
+            self.assertEqual(get('added', 'en-us'), 'now added')
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,140 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from unittest import TestCase, mock
+
+from mycroft.messagebus import Message
+from mycroft.skills.common_iot_skill import (
+    Action, CommonIoTSkill, ENTITY, IoTEntityIndex, IoTRequest, SCENE, Thing
+)
+
+from ..mocks import MessageBusMock
+
+
+class IoTTest(CommonIoTSkill):
+    """Simple skill for testing the CommonIoTSkill"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.skill_id = 'IoTTest'
+        self.entities = ['Bedroom', 'front door']
+        self.scenes = []
+        self.can_handle = mock.Mock(return_value=(True, None))
+
+    def get_entities(self):
+        return self.entities
+
+    def get_scenes(self):
+        return self.scenes
+
+    def can_handle(self, request):
+        pass
+
+    def run_request(self, request, callback_data):
+        pass
+
+
+class TestIoTEntityIndex(TestCase):
+    def setUp(self):
+        self.index = IoTEntityIndex()
+        self.index.update('hue', ENTITY, ['Bedroom', 'living room'])
+        self.index.update('lock', ENTITY, ['front door'])
+        self.index.update('hue', SCENE, ['movie time'])
+        self.index.update('sonos', SCENE, ['Movie  Time', 'party'])
+
+    def test_owners(self):
+        self.assertEqual(self.index.owners(ENTITY, 'bedroom'), {'hue'})
+        self.assertEqual(self.index.owners(SCENE, 'movie time'),
+                         {'hue', 'sonos'})
+        self.assertEqual(self.index.owners(ENTITY, 'garage'), set())
+
+    def test_incremental_update(self):
+        self.index.handle_register(Message('iotregister', {
+            'skill_id': 'hue', 'type': ENTITY,
+            'words': ['living room', 'kitchen']}))
+        self.assertEqual(self.index.owners(ENTITY, 'bedroom'), set())
+        self.assertEqual(self.index.owners(ENTITY, 'kitchen'), {'hue'})
+        self.index.remove_skill('sonos')
+        self.assertEqual(self.index.owners(SCENE, 'movie time'), {'hue'})
+        self.assertEqual(self.index.owners(SCENE, 'party'), set())
+
+    def test_unknown_type(self):
+        self.index.handle_register(Message('iotregister', {
+            'skill_id': 'hue', 'type': 'DEVICE', 'words': ['kitchen']}))
+        self.assertEqual(self.index.owners(ENTITY, 'kitchen'), set())
+
+    def test_route(self):
+        request = IoTRequest(Action.ON, thing=Thing.LIGHT)
+        self.assertIsNone(self.index.route(request))
+        request = IoTRequest(Action.ON, entity='Bedroom')
+        self.assertEqual(self.index.route(request), {'hue'})
+        request = IoTRequest(Action.ON, scene='movie time')
+        self.assertEqual(self.index.route(request), {'hue', 'sonos'})
+        # No skill registered both, all skills are asked
+        request = IoTRequest(Action.ON, entity='front door',
+                             scene='movie time')
+        self.assertIsNone(self.index.route(request))
+        request = IoTRequest(Action.ON, entity='garage')
+        self.assertIsNone(self.index.route(request))
+
+    def test_find_names(self):
+        self.index.update('hue', ENTITY, ['bedroom', 'bedroom lamp'])
+        self.assertEqual(
+            self.index.find_names('turn on the Bedroom lamp for movie time'),
+            [(ENTITY, 'bedroom lamp'), (SCENE, 'movie time')])
+        self.assertEqual(self.index.find_names('lock the door'), [])
+
+
+class TestCommonIoTSkill(TestCase):
+    def setUp(self):
+        self.bus = MessageBusMock()
+        self.skill = IoTTest()
+        self.skill.bind(self.bus)
+
+    def test_register_changes(self):
+        self.skill.register_entities_and_scenes()
+        self.assertEqual(self.bus.message_data, [
+            {'skill_id': 'IoTTest', 'type': ENTITY,
+             'words': ['Bedroom', 'front door']}])
+
+        # Unchanged lists aren't sent again
+        self.skill.register_entities_and_scenes()
+        self.assertEqual(len(self.bus.message_data), 1)
+
+        # Empty lists aren't sent, keeping the words registered before
+        self.skill.entities = []
+        self.skill.scenes = ['party']
+        self.skill.register_entities_and_scenes()
+        self.assertEqual(self.bus.message_data[1:], [
+            {'skill_id': 'IoTTest', 'type': SCENE, 'words': ['party']}])
+
+    def test_call_for_registration(self):
+        self.skill.register_entities_and_scenes()
+        self.skill._handle_call_for_registration(Message('iotregister'))
+        self.assertEqual(len(self.bus.message_data), 2)
+
+    def test_routed_trigger(self):
+        request = IoTRequest(Action.ON, entity='bedroom').to_dict()
+        self.skill._handle_trigger(Message('iot:trigger', {
+            'IoTRequest': request, 'skill_ids': ['OtherSkill']}))
+        self.skill.can_handle.assert_not_called()
+        self.skill._handle_trigger(Message('iot:trigger', {
+            'IoTRequest': request, 'skill_ids': ['IoTTest']}))
+        self.skill.can_handle.assert_called_once_with(mock.ANY)
+        self.assertEqual(self.bus.message_types, ['iot:trigger.response'])
+
+    def test_unrouted_trigger(self):
+        request = IoTRequest(Action.ON, entity='garage').to_dict()
+        self.skill._handle_trigger(Message('iot:trigger', {
+            'IoTRequest': request, 'skill_ids': []}))
+        self.skill.can_handle.assert_called_once_with(mock.ANY)
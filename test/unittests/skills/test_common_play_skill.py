@@ -1,3 +1,5 @@
+from threading import Event
+from time import sleep
 from unittest import TestCase, mock
 
 from mycroft.messagebus import Message
@@ -117,6 +119,99 @@ class TestCPSQuery(TestCase):
         self.assertAlmostEqual(response.data['conf'], 0.825)
 
 
+class TestCPSMatchWorker(TestCase):
+    def setUp(self):
+        self.skill = CPSTest()
+        self.bus = mock.Mock(name='bus')
+        self.skill.bind(self.bus)
+        self.query_phrase = self.bus.on.call_args_list[-2][0][1]
+        self.match = ('Monster mash', CPSMatchLevel.TITLE)
+
+    def query(self, phrase='Monster mash'):
+        self.query_phrase(Message('play:query', data={'phrase': phrase}))
+        return self.bus.emit.call_args_list[-1][0][0]
+
+    def slow_match(self, phrase):
+        sleep(0.3)
+        return self.match
+
+    @mock.patch('mycroft.skills.common_play_skill.CPS_MATCH_TIMEOUT', 0.05)
+    def test_deadline(self):
+        self.skill.match_cache_ttl = 60
+        self.skill.CPS_match_query_phrase.side_effect = self.slow_match
+        response = self.query()
+        self.assertFalse(response.data['searching'])
+
+        # The late match is memoized for the next query
+        sleep(0.4)
+        response = self.query()
+        self.assertAlmostEqual(response.data['conf'], 0.85)
+        self.assertEqual(self.skill.CPS_match_query_phrase.call_count, 1)
+
+    @mock.patch('mycroft.skills.common_play_skill.CPS_MATCH_TIMEOUT', 0.05)
+    def test_extend_timeout(self):
+        def extending_match(phrase):
+            self.skill.CPS_extend_timeout(2)
+            return self.slow_match(phrase)
+        self.skill.CPS_match_query_phrase.side_effect = extending_match
+        response = self.query()
+        self.assertAlmostEqual(response.data['conf'], 0.85)
+
+    def test_memoize(self):
+        self.skill.CPS_match_query_phrase.return_value = self.match
+        self.query()
+        self.query()
+        self.assertEqual(self.skill.CPS_match_query_phrase.call_count, 2)
+
+        self.skill.match_cache_ttl = 60
+        self.query()
+        response = self.query()
+        self.assertAlmostEqual(response.data['conf'], 0.85)
+        self.assertEqual(self.skill.CPS_match_query_phrase.call_count, 3)
+
+    def test_index(self):
+        self.skill.match_cache_ttl = 60
+        self.skill.CPS_match_query_phrase.return_value = self.match
+        self.query()
+        self.skill.CPS_build_index = mock.Mock(return_value={'monster mash'})
+        self.skill.CPS_update_index().result()
+        self.assertEqual(self.skill.cps_index, {'monster mash'})
+        # Memoized matches are cleared with the new index
+        self.query()
+        self.assertEqual(self.skill.CPS_match_query_phrase.call_count, 2)
+
+    @mock.patch('mycroft.skills.common_play_skill.CPS_MATCH_TIMEOUT', 0.2)
+    def test_index_built_in_background(self):
+        building = Event()
+        release = Event()
+        self.addCleanup(release.set)
+
+        def slow_build():
+            building.set()
+            release.wait(5)
+            return {'monster mash'}
+        self.skill.cps_index = {'old'}
+        self.skill.CPS_build_index = slow_build
+        future = self.skill.CPS_update_index()
+        building.wait(5)
+
+        # Queries are matched against the old index meanwhile
+        indexes = []
+
+        def match(phrase):
+            indexes.append(self.skill.cps_index)
+            return self.match
+        self.skill.CPS_match_query_phrase.side_effect = match
+        response = self.query()
+        self.assertAlmostEqual(response.data['conf'], 0.85)
+        self.assertEqual(indexes, [{'old'}])
+
+        release.set()
+        future.result()
+        self.query()
+        self.assertEqual(indexes, [{'old'}, {'monster mash'}])
+
+
 class CPSTest(CommonPlaySkill):
     """Simple skill for testing the CommonPlaySkill"""
     def __init__(self, *args, **kwargs):
@@ -1,3 +1,4 @@
+from time import sleep
 from unittest import TestCase, mock
 
 from mycroft.messagebus import Message
@@ -117,6 +118,92 @@ class TestCommonQueryMatching(TestCase):
         self.assertEqual(response.data['conf'], 1.2200000000000002)
 
 
+class TestCommonQueryCache(TestCase):
+    """Tests for caching and progress of query matching."""
+
+    def setUp(self):
+        self.skill = CQSTest()
+        self.bus = mock.Mock(name='bus')
+        self.skill.bind(self.bus)
+        self.skill.config_core = {'enclosure': {'platform': 'mycroft_mark_1'}}
+        self.query_phrase = self.bus.on.call_args_list[-2][0][1]
+        self.skill.CQS_match_query_phrase.return_value = (
+            'What\'s the meaning of life', CQSMatchLevel.EXACT, '42')
+
+    def ask(self, phrase):
+        self.query_phrase(Message('question:query', data={'phrase': phrase}))
+        return self.bus.emit.call_args_list[-1][0][0]
+
+    def test_not_cached_by_default(self):
+        self.ask('What\'s the meaning of life')
+        self.ask('What\'s the meaning of life')
+        self.assertEqual(self.skill.CQS_match_query_phrase.call_count, 2)
+
+    def test_cached(self):
+        self.skill.query_cache_ttl = 60
+        first = self.ask('What\'s the meaning of life')
+        second = self.ask('what\'s  the meaning of LIFE')
+        self.skill.CQS_match_query_phrase.assert_called_once_with(
+            'What\'s the meaning of life')
+        self.assertEqual(second.data['answer'], '42')
+        self.assertEqual(second.data['conf'], first.data['conf'])
+
+        # Failed matches are cached as well
+        self.skill.CQS_match_query_phrase.return_value = None
+        self.ask('What is the airspeed of a swallow')
+        response = self.ask('What is the airspeed of a swallow')
+        self.assertFalse(response.data['searching'])
+        self.assertEqual(self.skill.CQS_match_query_phrase.call_count, 2)
+
+    def test_cache_expiry(self):
+        self.skill.query_cache_ttl = 60
+        with mock.patch('mycroft.skills.common_query_skill.monotonic',
+                        return_value=1000):
+            self.ask('What\'s the meaning of life')
+        with mock.patch('mycroft.skills.common_query_skill.monotonic',
+                        return_value=1061):
+            self.ask('What\'s the meaning of life')
+        self.assertEqual(self.skill.CQS_match_query_phrase.call_count, 2)
+
+        self.skill.clear_query_cache()
+        self.ask('What\'s the meaning of life')
+        self.assertEqual(self.skill.CQS_match_query_phrase.call_count, 3)
+
+    @mock.patch('mycroft.skills.common_query_skill.QUERY_PROGRESS_INTERVAL',
+                0.05)
+    def test_progress(self):
+        def slow_match(phrase):
+            sleep(0.3)
+            return None
+        self.skill.CQS_match_query_phrase.side_effect = slow_match
+        response = self.ask('What\'s the meaning of life')
+        self.assertFalse(response.data['searching'])
+        searching = [c[0][0] for c in self.bus.emit.call_args_list[:-1]]
+        self.assertGreater(len(searching), 2)
+        self.assertTrue(all(m.data['searching'] for m in searching))
+
+    @mock.patch('mycroft.skills.common_query_skill.QUERY_PROGRESS_INTERVAL',
+                0.05)
+    @mock.patch('mycroft.skills.common_query_skill.QUERY_MAX_SEARCH_TIME',
+                0.2)
+    def test_max_search_time(self):
+        def slow_match(phrase):
+            sleep(0.5)
+            return ('What\'s the meaning of life', CQSMatchLevel.EXACT, '42')
+        self.skill.CQS_match_query_phrase.side_effect = slow_match
+        self.ask('What\'s the meaning of life')
+        responses = [c[0][0] for c in self.bus.emit.call_args_list]
+        # Progress stops at the time limit, answered as not found
+        self.assertFalse(responses[-1].data['searching'])
+        self.assertLess(len(responses), 0.5 / 0.05)
+        self.assertTrue(all('answer' not in m.data for m in responses))
+
+    def test_remove_noise(self):
+        self.skill._noise_words = frozenset(['what', 'is', 'the'])
+        self.assertEqual(self.skill.remove_noise('what is the  time is it'),
+                         'time it')
+
+
 class CQSTest(CommonQuerySkill):
     """Simple skill for testing the CommonQuerySkill"""
 
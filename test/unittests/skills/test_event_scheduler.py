@@ -2,8 +2,14 @@
     Test cases regarding the event scheduler.
 """
 
+import json
+import os
 import unittest
 import time
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+from threading import Event
 from pyee import ExecutorEventEmitter
 
 from unittest.mock import MagicMock, patch
@@ -11,7 +17,21 @@ from mycroft.skills.event_scheduler import (EventScheduler,
                                             EventSchedulerInterface)
 
 
+def _use_config_dir(test_case):
+    """Keep the schedule files of a test in a temporary directory."""
+    config_dir = mkdtemp()
+    test_case.addCleanup(rmtree, config_dir)
+    config_patch = patch('xdg.BaseDirectory.load_first_config',
+                         return_value=config_dir)
+    config_patch.start()
+    test_case.addCleanup(config_patch.stop)
+    return Path(config_dir)
+
+
 class TestEventScheduler(unittest.TestCase):
+    def setUp(self):
+        _use_config_dir(self)
+
     @patch('threading.Thread')
     @patch('json.load')
     @patch('json.dump')
@@ -101,6 +121,190 @@ class TestEventScheduler(unittest.TestCase):
         self.assertEqual(emitter.emit.call_args[0][0].data, {})
         es.shutdown()
 
+    @patch('json.load')
+    @patch('json.dump')
+    @patch('builtins.open')
+    def test_wakeup(self, mock_open, mock_dump, mock_load):
+        """
+            Test that the thread wakes up for a newly scheduled event.
+        """
+        mock_load.return_value = ''
+        mock_open.return_value = MagicMock()
+        emitted = Event()
+        emitter = MagicMock()
+        emitter.emit.side_effect = lambda message: emitted.set()
+        sched_time = time.time() + 0.2
+        # Without being woken the thread would sleep far past the timeout
+        with patch('mycroft.skills.event_scheduler.MAX_SLEEP', 60):
+            es = EventScheduler(emitter)
+            self.addCleanup(es.shutdown)
+            es.schedule_event('test', sched_time, None)
+            self.assertTrue(emitted.wait(30))
+        self.assertGreaterEqual(time.time(), sched_time)
+        self.assertNotIn('test', es.events)
+
+    @patch('mycroft.skills.event_scheduler.EventScheduler.run')
+    @patch('json.load')
+    @patch('json.dump')
+    @patch('builtins.open')
+    def test_order(self, mock_open, mock_dump, mock_load, mock_run):
+        """
+            Test that passed events trigger in order and repeat.
+        """
+        mock_load.return_value = ''
+        mock_open.return_value = MagicMock()
+        emitter = MagicMock()
+        es = EventScheduler(emitter)
+        now = time.time()
+        es.schedule_event('second', now - 1, None)
+        es.schedule_event('repeat', now - 2, 60)
+        es.schedule_event('removed', now - 3, None)
+        es.schedule_event('future', now + 1000, None)
+        es.remove_event('removed')
+
+        es.check_state()
+        emitted = [c[0][0].msg_type for c in emitter.emit.call_args_list]
+        self.assertEqual(emitted, ['repeat', 'second'])
+        self.assertEqual(sorted(es.events), ['future', 'repeat'])
+        self.assertGreater(es.events['repeat'][0][0], now)
+        es.shutdown()
+
+
+class TestScheduleJournal(unittest.TestCase):
+    def setUp(self):
+        self.config_dir = _use_config_dir(self)
+        self.schedule_file = self.config_dir.joinpath('schedule.json')
+        self.journal_file = self.config_dir.joinpath('schedule.journal')
+
+    def _crash(self, scheduler):
+        """Stop the scheduler thread without storing the schedule."""
+        with scheduler.event_lock:
+            scheduler.is_running = False
+            scheduler._wakeup.notify()
+        scheduler.join()
+        scheduler._journal.close()
+
+    def test_replay(self):
+        es = EventScheduler(MagicMock())
+        es.schedule_event('test', 900000000000, None, {'a': 1})
+        es.schedule_event('test-2', 900000000000, None)
+        es.schedule_event('test-3', 900000000000, None)
+        es.update_event('test', {'a': 2})
+        es.remove_event('test-2')
+        self._crash(es)
+        self.assertFalse(self.schedule_file.exists())
+
+        es = EventScheduler(MagicMock())
+        self.addCleanup(es.shutdown)
+        self.assertEqual(es.events,
+                         {'test': [(900000000000, None, {'a': 2}, None)],
+                          'test-3': [(900000000000, None, {}, None)]})
+
+    def test_broken_entry(self):
+        es = EventScheduler(MagicMock())
+        es.schedule_event('test', 900000000000, None)
+        self._crash(es)
+        with self.journal_file.open('a') as f:
+            f.write('["schedule", "test-2", 9000')
+
+        es = EventScheduler(MagicMock())
+        self.addCleanup(es.shutdown)
+        self.assertEqual(list(es.events), ['test'])
+
+    def test_compact(self):
+        es = EventScheduler(MagicMock())
+        with patch('mycroft.skills.event_scheduler.JOURNAL_COMPACT_SIZE', 2):
+            es.schedule_event('test', 900000000000, None)
+            es._maintain_journal()
+            self.assertFalse(self.schedule_file.exists())
+            es.schedule_event('test-2', 900000000000, None)
+            es._maintain_journal()
+        self.assertEqual(sorted(json.loads(self.schedule_file.read_text())),
+                         ['test', 'test-2'])
+        self.assertEqual(self.journal_file.read_text(), '')
+
+        # Changes after compaction are replayed on top of the file
+        es.remove_event('test')
+        self._crash(es)
+        # Changes already in the file, left in the journal by a crash
+        # before it was cleared, aren't replayed
+        with self.journal_file.open('a') as f:
+            f.write(json.dumps([2, 'schedule', 'test-2', 900000000000, None,
+                                {}, None]) + '\n')
+        es = EventScheduler(MagicMock())
+        self.addCleanup(es.shutdown)
+        self.assertEqual(es.events,
+                         {'test-2': [(900000000000, None, {}, None)]})
+
+    def test_shutdown(self):
+        es = EventScheduler(MagicMock())
+        es.schedule_event('test', 900000000000, None)
+        es.shutdown()
+        self.assertEqual(json.loads(self.schedule_file.read_text()),
+                         {'test': [[900000000000, None, {}, None]]})
+        self.assertEqual(self.journal_file.read_text(), '')
+
+    def test_crash_before_replace(self):
+        """Journal isn't replayed twice onto the previously stored file."""
+        es = EventScheduler(MagicMock())
+        es.schedule_event('test', 900000000000, None)
+        es.store()
+        es.schedule_event('test-2', 900000000000, None)
+        # The checkpoint is written but the file isn't replaced
+        replace = os.replace
+
+        def fail_schedule_replace(src, dst):
+            if dst == es.schedule_file:
+                raise OSError('crash')
+            replace(src, dst)
+
+        with patch('os.replace', side_effect=fail_schedule_replace):
+            es.store()
+        self.assertEqual(len(json.loads(
+            self.config_dir.joinpath('schedule.checkpoint').read_text())), 2)
+        self._crash(es)
+
+        es = EventScheduler(MagicMock())
+        self.addCleanup(es.shutdown)
+        self.assertEqual(es.events,
+                         {'test': [(900000000000, None, {}, None)],
+                          'test-2': [(900000000000, None, {}, None)]})
+
+    def test_repeating_not_persisted(self):
+        es = EventScheduler(MagicMock())
+        es.schedule_event('test-repeat', 900000000000, 60, {'a': 1})
+        es.store()
+        es.schedule_event('test-repeat-2', 900000000000, 60, {'a': 1})
+        self._crash(es)
+
+        # The skills schedule their repeating events again when loaded
+        es = EventScheduler(MagicMock())
+        self.addCleanup(es.shutdown)
+        self.assertEqual(es.events, {})
+        es.schedule_event('test-repeat', 900000000000, 60, {'a': 2})
+        self.assertEqual(es.events['test-repeat'],
+                         [(900000000000, 60, {'a': 2}, None)])
+
+    def test_replay_duplicates(self):
+        es = EventScheduler(MagicMock())
+        es.schedule_event('test', 900000000000, None)
+        es.store()
+        # Identical events are all kept, in the file and in the journal
+        es.schedule_event('test', 900000000000, None)
+        es.schedule_event('test', 900000000000, None)
+        self._crash(es)
+
+        es = EventScheduler(MagicMock())
+        self.assertEqual(es.events,
+                         {'test': [(900000000000, None, {}, None)] * 3})
+        # Numbering continues after the stored changes
+        es.schedule_event('test-2', 900000000000, None)
+        self._crash(es)
+        es = EventScheduler(MagicMock())
+        self.addCleanup(es.shutdown)
+        self.assertEqual(len(es.events['test']), 3)
+        self.assertIn('test-2', es.events)
+
 
 class TestEventSchedulerInterface(unittest.TestCase):
     def test_shutdown(self):
@@ -0,0 +1,150 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from threading import Event, Thread
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from mycroft.messagebus import Message
+from mycroft.skills.mycroft_skill.event_container import EventContainer
+from mycroft.skills.mycroft_skill.handler_executor import HandlerExecutor
+
+from ..mocks import MessageBusMock
+
+TIMEOUT = 5
+
+
+class TestHandlerExecutor(TestCase):
+    def setUp(self):
+        self.executor = HandlerExecutor('test_skill', workers=1, max_queued=2)
+        self.addCleanup(self.executor.shutdown)
+        self.release = Event()
+        self.addCleanup(self.release.set)
+
+    def _block(self, started):
+        """Occupy the worker until released."""
+        def handler(message):
+            started.set()
+            self.release.wait(TIMEOUT)
+        return handler
+
+    def test_run(self):
+        done = Event()
+        self.assertTrue(self.executor.submit(lambda m: done.set(),
+                                             Message('test')))
+        self.assertTrue(done.wait(TIMEOUT))
+
+    @patch('mycroft.skills.mycroft_skill.handler_executor.LOG')
+    def test_queue_limit(self, mock_log):
+        started = Event()
+        self.executor.submit(self._block(started), Message('test'))
+        started.wait(TIMEOUT)
+        # The worker is busy, handlers past the limit are queued anyway
+        handled = []
+        for _ in range(4):
+            self.assertTrue(self.executor.submit(handled.append,
+                                                 Message('test')))
+        mock_log.warning.assert_called_once_with(
+            'Handler queue of test_skill is over 2 handlers')
+
+        metrics = self.executor.metrics()['normal']
+        self.assertEqual(metrics['queue_depth'], 4)
+        self.assertEqual(metrics['peak_queue_depth'], 4)
+        self.assertEqual(metrics['overflowed'], 2)
+
+        self.release.set()
+        self.executor.shutdown()
+        self.executor._lane.executor.shutdown(wait=True)
+        self.assertEqual(len(handled), 4)
+
+    def test_concurrent_handlers(self):
+        """A handler can wait for another handler of the same skill."""
+        executor = HandlerExecutor('test_skill')
+        self.addCleanup(executor.shutdown)
+        answered = Event()
+        done = Event()
+
+        def request(message):
+            if answered.wait(TIMEOUT):
+                done.set()
+
+        executor.submit(request, Message('test_skill:RequestIntent'))
+        executor.submit(lambda m: answered.set(), Message('answer'))
+        self.assertTrue(done.wait(TIMEOUT))
+
+    def test_priority_lane(self):
+        started = Event()
+        stopped = Event()
+        self.executor.submit(self._block(started), Message('test'))
+        started.wait(TIMEOUT)
+        self.executor.submit(print, Message('test'))
+        # Priority handlers aren't queued behind the busy worker
+        self.executor.submit(lambda m: stopped.set(), Message('mycroft.stop'),
+                             priority=True)
+        self.assertTrue(stopped.wait(TIMEOUT))
+        self.assertEqual(self.executor.metrics()['priority']['handled'], 1)
+        self.assertEqual(self.executor.metrics()['normal']['queue_depth'], 1)
+
+    def test_wait_time(self):
+        started = Event()
+        done = Event()
+        self.executor.submit(self._block(started), Message('test'))
+        started.wait(TIMEOUT)
+        self.executor.submit(lambda m: done.set(), Message('test'))
+        self.release.set()
+        done.wait(TIMEOUT)
+        metrics = self.executor.metrics()['normal']
+        self.assertEqual(metrics['handled'], 2)
+        self.assertGreater(metrics['max_wait'], 0)
+        self.assertGreater(metrics['avg_wait'], 0)
+
+    def test_shutdown(self):
+        self.executor.shutdown()
+        self.assertFalse(self.executor.submit(print, Message('test')))
+
+
+class TestEventContainerExecutor(TestCase):
+    def test_once_removed_on_dispatch(self):
+        bus = Mock()
+        executor = HandlerExecutor('test_skill')
+        self.addCleanup(executor.shutdown)
+        container = EventContainer(bus, executor)
+        container.add('test.event', print, once=True)
+        name, registered = container.events[0]
+        with patch.object(executor, 'submit') as mock_submit:
+            registered(Message('test.event'))
+            # Removed before the handler is run by the executor
+            self.assertEqual(container.events, [])
+            mock_submit.assert_called_once()
+            # Registering again before the handler runs keeps the new one
+            container.add('test.event', print, once=True)
+            mock_submit.call_args[0][0](Message('test.event'))
+        self.assertEqual(len(container.events), 1)
+
+    def test_dispatch(self):
+        bus = MessageBusMock()
+        executor = HandlerExecutor('test_skill')
+        self.addCleanup(executor.shutdown)
+        container = EventContainer(bus, executor)
+        handled = Event()
+        container.add('mycroft.stop', lambda m: handled.set())
+        self.assertEqual(bus.event_handlers, ['mycroft.stop'])
+
+        with patch.object(executor, 'submit',
+                          wraps=executor.submit) as mock_submit:
+            name, registered = container.events[0]
+            registered(Message('mycroft.stop'))
+            self.assertTrue(handled.wait(TIMEOUT))
+            # mycroft.stop is handled in the priority lane
+            self.assertTrue(mock_submit.call_args[0][2])
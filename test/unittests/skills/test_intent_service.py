@@ -257,6 +257,31 @@ class TestIntentServiceApi(TestCase):
         self.assertEqual(reply.data['intent']['intent_type'],
                          'skill:testIntent')
 
+    def test_register_vocab_batch(self):
+        msg = Message('register_vocab_batch',
+                      {'vocab': {'testKeyword': [['test', 'exam']]},
+                       'regex': ['(?P<testName>Bob)']})
+        self.intent_service.handle_register_vocab_batch(msg)
+        intent = IntentBuilder('skill:testIntent').require('testKeyword')
+        self.intent_service.handle_register_intent(
+            Message('register_intent', intent.__dict__))
+
+        # Both the keyword and its alias match
+        for utterance in ('test', 'exam'):
+            msg = Message('intent.service.adapt.get',
+                          data={'utterance': utterance})
+            self.intent_service.handle_get_adapt(msg)
+            reply = get_last_message(self.intent_service.bus)
+            self.assertEqual(reply.data['intent']['intent_type'],
+                             'skill:testIntent')
+
+        self.assertEqual(self.intent_service.registered_vocab, [
+            {'entity_value': 'test', 'entity_type': 'testKeyword'},
+            {'entity_value': 'exam', 'entity_type': 'testKeyword',
+             'alias_of': 'test'},
+            {'regex': '(?P<testName>Bob)'}
+        ])
+
     def test_get_adapt_intent(self):
         self.setup_simple_adapt_intent()
         # Check that the intent is returned
@@ -81,3 +81,23 @@ class KeywordRegistrationTest(unittest.TestCase):
         intent_service = IntentServiceInterface(self.emitter)
         intent_service.register_adapt_regex('.*')
         self.check_emitter([{'regex': '.*'}])
+
+    def test_register_keywords(self):
+        intent_service = IntentServiceInterface(self.emitter)
+        keywords = {'test_intent': [['test', 'test2'], ['other']]}
+        intent_service.register_adapt_keywords(keywords)
+        self.assertEqual(self.emitter.get_types(), ['register_vocab_batch'])
+        self.assertEqual(self.emitter.get_results(), [{'vocab': keywords}])
+
+    def test_register_regexes(self):
+        intent_service = IntentServiceInterface(self.emitter)
+        intent_service.register_adapt_regexes(['(?P<A>.*)', '(?P<B>.*)'])
+        self.assertEqual(self.emitter.get_types(), ['register_vocab_batch'])
+        self.assertEqual(self.emitter.get_results(),
+                         [{'regex': ['(?P<A>.*)', '(?P<B>.*)']}])
+
+    def test_register_nothing(self):
+        intent_service = IntentServiceInterface(self.emitter)
+        intent_service.register_adapt_keywords({})
+        intent_service.register_adapt_regexes([])
+        self.assertEqual(self.emitter.get_types(), [])
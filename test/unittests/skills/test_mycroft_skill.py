@@ -92,7 +92,7 @@ class TestMycroftSkill(unittest.TestCase):
         )
         self.addCleanup(local_settings_patch.stop)
         local_settings_mock = local_settings_patch.start()
-        local_settings_mock.return_value = True
+        local_settings_mock.return_value = {}
 
         return local_settings_mock
 
@@ -560,6 +560,20 @@ class TestMycroftSkill(unittest.TestCase):
         self.assertFalse(s.voc_match("My hovercraft is full of eels",
                                      "turn_off_test"))
 
+    def test_voc_match_cache(self):
+        s = SimpleSkill1()
+        s.root_dir = abspath(dirname(__file__))
+
+        self.assertTrue(s.voc_match("turn off the lights", "turn_off_test"))
+        # The cache holds the vocabulary phrases
+        phrases = s.voc_match_cache[s.lang + 'turn_off_test']
+        self.assertIsInstance(phrases, list)
+        self.assertIn('turn off', phrases)
+        # Replacing the cached phrases is picked up
+        s.voc_match_cache[s.lang + 'turn_off_test'] = ['lights out']
+        self.assertTrue(s.voc_match("lights out please", "turn_off_test"))
+        self.assertFalse(s.voc_match("turn off the lights", "turn_off_test"))
+
     def test_voc_match_exact(self):
         s = SimpleSkill1()
         s.root_dir = abspath(dirname(__file__))
@@ -14,15 +14,23 @@
 #
 import json
 import tempfile
+from copy import deepcopy
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
+from threading import Thread
+from time import sleep
 from unittest import TestCase
-from unittest.mock import call, Mock, patch
+from unittest.mock import call, MagicMock, Mock, patch
 
+from mycroft.api import Api
 from mycroft.skills.settings import (
+    DOWNLOAD_INTERVAL_MAX,
+    DOWNLOAD_INTERVAL_MIN,
     get_local_settings,
     save_settings,
     SkillSettingsDownloader,
-    SettingsMetaUploader
+    SettingsMetaUploader,
+    SettingsStore
 )
 from ..base import MycroftUnitTestBase
 
@@ -245,6 +253,46 @@ class TestSettingsDownloader(MycroftUnitTestBase):
         self.assertTrue(
             self.downloader.download_timer.cancel.called_once_with())
 
+    def test_only_changed_skills_notified(self):
+        self.downloader.last_download_result = {
+            'test_skill|99.99': {"test_setting": 'test_value'},
+            'other_skill|99.99': {"test_setting": 'test_value'}
+        }
+        remote_skill_settings = {
+            'test_skill|99.99': {"test_setting": 'test_value'},
+            'other_skill|99.99': {"test_setting": 'foo'}
+        }
+        self.downloader.api.get_skill_settings = Mock(
+            return_value=remote_skill_settings)
+        self.downloader.download()
+        self._check_message_bus_events(
+            {'other_skill|99.99': {"test_setting": 'foo'}})
+
+    def test_unchanged_etag(self):
+        self.downloader.settings_etag = 'abc'
+        self.downloader.api.skill_settings_etag = 'abc'
+        self.downloader.api.get_skill_settings = Mock(
+            return_value={'test_skill|99.99': {"test_setting": 'foo'}})
+        self.downloader.download()
+        self._check_no_message_bus_events()
+
+    def test_interval(self):
+        self.downloader.last_download_result = {}
+        self.downloader.api.get_skill_settings = Mock(
+            return_value={'test_skill|99.99': {"test_setting": 'foo'}})
+        self.downloader.download()
+        self.timer_mock.assert_called_with(DOWNLOAD_INTERVAL_MIN,
+                                           self.downloader.download)
+        # Backs off while nothing changes
+        for _ in range(10):
+            self.downloader.download()
+        self.timer_mock.assert_called_with(DOWNLOAD_INTERVAL_MAX,
+                                           self.downloader.download)
+        # Speeds up when asked to update
+        self.downloader.download(Mock())
+        self.timer_mock.assert_called_with(DOWNLOAD_INTERVAL_MIN,
+                                           self.downloader.download)
+
     def _check_api_called(self):
         self.assertListEqual(
             [call.get_skill_settings()],
@@ -275,6 +323,107 @@ class TestSettingsDownloader(MycroftUnitTestBase):
         )
 
 
+class SettingsBackend(HTTPServer):
+    """Stand-in for the backend serving the skill settings of a device."""
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SettingsRequestHandler)
+        self.settings = {}
+        self.version = 0
+        self.responses = []  # Status codes sent
+
+    def set_settings(self, settings):
+        self.settings = settings
+        self.version += 1
+
+
+class SettingsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        backend = self.server
+        etag = '"{}"'.format(backend.version)
+        if self.path != '/v1/device/1234/skill/settings':
+            self.send_response(404)
+            self.end_headers()
+        elif self.headers.get('If-None-Match') in (etag, etag.strip('"')):
+            self.send_response(304)
+            self.end_headers()
+        else:
+            body = json.dumps(backend.settings).encode('utf-8')
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def send_response(self, code, message=None):
+        self.server.responses.append(code)
+        super().send_response(code, message)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSettingsSync(MycroftUnitTestBase):
+    """Download settings from a stand-in backend."""
+    mock_package = 'mycroft.skills.settings.'
+
+    def setUp(self):
+        super().setUp()
+        self.backend = SettingsBackend()
+        Thread(target=self.backend.serve_forever, daemon=True).start()
+        self.addCleanup(self.backend.server_close)
+        self.addCleanup(self.backend.shutdown)
+
+        server_config = {
+            'url': 'http://127.0.0.1:{}'.format(self.backend.server_port),
+            'version': 'v1'
+        }
+        identity = MagicMock(uuid='1234', access='token', refresh=None)
+        for target, value in (
+                ('mycroft.api.Configuration.get',
+                 Mock(return_value={'server': server_config})),
+                ('mycroft.api.IdentityManager.get',
+                 Mock(return_value=identity)),
+                (self.mock_package + 'is_paired', Mock(return_value=True)),
+                (self.mock_package + 'Timer', Mock()),
+                (self.mock_package + 'REMOTE_CACHE',
+                 self.temp_dir.joinpath('remote_cache.json'))):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for cache in (Api.params_to_etag, Api.etag_to_response):
+            cache_patch = patch.dict(cache, clear=True)
+            cache_patch.start()
+            self.addCleanup(cache_patch.stop)
+
+        self.downloader = SkillSettingsDownloader(self.message_bus_mock)
+
+    def test_sync(self):
+        self.backend.set_settings({'skill-a|21.02': {'color': 'red'},
+                                   'skill-b|21.02': {'size': 1}})
+        self.downloader.download()
+        self.assertEqual(self.backend.responses, [200])
+        self.assertEqual(self.message_bus_mock.message_data,
+                         [{'skill-a|21.02': {'color': 'red'}},
+                          {'skill-b|21.02': {'size': 1}}])
+
+        # Unchanged settings aren't sent again
+        self.downloader.download()
+        self.assertEqual(self.backend.responses, [200, 304])
+        self.assertEqual(len(self.message_bus_mock.message_data), 2)
+
+        # Only the changed skill is notified
+        self.backend.set_settings({'skill-a|21.02': {'color': 'blue'},
+                                   'skill-b|21.02': {'size': 1}})
+        self.downloader.download()
+        self.assertEqual(self.backend.responses, [200, 304, 200])
+        self.assertEqual(self.message_bus_mock.message_data[2:],
+                         [{'skill-a|21.02': {'color': 'blue'}}])
+        cache = self.temp_dir.joinpath('remote_cache.json')
+        self.assertEqual(json.loads(cache.read_text()),
+                         self.backend.settings)
+
+
 class TestSettings(TestCase):
     def setUp(self) -> None:
         temp_dir = tempfile.mkdtemp()
@@ -312,3 +461,57 @@ class TestSettings(TestCase):
             file_contents = settings_file.read()
 
         self.assertEqual(file_contents, '{"foo": "bar"}')
+
+    def test_store_settings_atomic(self):
+        settings_path = self.temp_dir.joinpath('settings.json')
+        settings_path.write_text('{"foo": "bar"}')
+        # Settings that can't be stored leave the file intact
+        save_settings(self.skill_mock.root_dir, dict(foo=object()))
+        self.assertEqual(settings_path.read_text(), '{"foo": "bar"}')
+        self.assertEqual([p.name for p in self.temp_dir.iterdir()],
+                         ['settings.json'])
+
+
+class TestSettingsStore(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.settings_path = self.temp_dir.joinpath('settings.json')
+        self.settings = SettingsStore(str(self.temp_dir), {'foo': 'bar'})
+        self.addCleanup(self.settings.cancel)
+
+    def test_write_behind(self):
+        with patch('mycroft.skills.settings.SETTINGS_WRITE_DELAY', 0.1):
+            self.settings['count'] = 1
+            self.settings['count'] = 2
+            self.assertTrue(self.settings.dirty)
+            self.assertFalse(self.settings_path.exists())
+            sleep(0.5)
+        self.assertFalse(self.settings.dirty)
+        self.assertEqual(json.loads(self.settings_path.read_text()),
+                         {'foo': 'bar', 'count': 2})
+
+    def test_flush(self):
+        self.settings.update(count=1)
+        self.settings.flush()
+        self.assertFalse(self.settings.dirty)
+        self.assertEqual(json.loads(self.settings_path.read_text()),
+                         {'foo': 'bar', 'count': 1})
+
+    def test_mutations(self):
+        self.settings.get('foo')
+        self.settings.setdefault('foo', 'baz')
+        self.settings.pop('missing', None)
+        self.assertFalse(self.settings.dirty)
+        for mutate in (lambda s: s.setdefault('new', 1),
+                       lambda s: s.pop('new'),
+                       lambda s: s.__delitem__('foo'),
+                       lambda s: s.clear()):
+            mutate(self.settings)
+            self.assertTrue(self.settings.dirty)
+            self.settings.cancel()
+
+    def test_copy(self):
+        copied = deepcopy(self.settings)
+        self.assertIs(type(copied), dict)
+        self.assertEqual(copied, self.settings)
+        self.assertFalse(self.settings.dirty)
@@ -30,15 +30,29 @@ class Skill(MycroftSkill):
         return 'TestResult'
 
 
-def load_test_skill():
+class EchoSkill(Skill):
+    """Test skill with API methods for testing direct calls."""
+    @skill_api_method
+    def echo(self, *args, **kwargs):
+        """Return the arguments."""
+        self.received = (args, kwargs)
+        return {'args': args, 'kwargs': kwargs}
+
+    @skill_api_method
+    def fail(self):
+        """Raise an exception."""
+        raise ValueError('Failed')
+
+
+def load_test_skill(skill_class=Skill, skill_id='test_skill'):
     """Helper for setting up the test skill.
 
     Returns:
         (MycroftSkill): created test skill
     """
     bus = mock.Mock()
-    test_skill = Skill()
-    test_skill.skill_id = 'test_skill'
+    test_skill = skill_class()
+    test_skill.skill_id = skill_id
     test_skill.bind(bus)
     return test_skill
 
@@ -132,6 +146,8 @@ class TestApiObject(TestCase):
         """Ensure that calling the methods works as expected."""
         test_skill = load_test_skill()
         test_api = create_skill_api_from_skill(test_skill)
+        # Call the skill as if it's loaded in another process
+        SkillApi.unregister_local(test_skill.skill_id)
 
         expected_response = 'all is good'
         sent_message = None
@@ -152,3 +168,42 @@ class TestApiObject(TestCase):
         self.assertEqual(sent_message.msg_type, 'test_skill.test_method')
         self.assertEqual(sent_message.data['args'], ('hello',))
         self.assertEqual(sent_message.data['kwargs'], {'person': 'you'})
+
+
+class TestLocalApi(TestCase):
+    """Tests for calling skills loaded in the same process."""
+    def setUp(self):
+        self.skill = load_test_skill(EchoSkill, 'echo_skill')
+        self.addCleanup(SkillApi.unregister_local, 'echo_skill')
+        SkillApi.connect_bus(mock.Mock())
+
+    def test_get(self):
+        api = SkillApi.get('echo_skill')
+        self.assertTrue(hasattr(api, 'echo'))
+        self.assertTrue(hasattr(api, 'fail'))
+        SkillApi.bus.wait_for_response.assert_not_called()
+
+    def test_call(self):
+        api = SkillApi.get('echo_skill')
+        arg = {'items': [1, 2]}
+        result = api.echo(arg, (3, 4), key='value')
+        SkillApi.bus.wait_for_response.assert_not_called()
+        # Arguments and result are copied like over the bus
+        self.assertEqual(result, {'args': [arg, [3, 4]],
+                                  'kwargs': {'key': 'value'}})
+        self.assertIsNot(self.skill.received[0][0], arg)
+        self.assertIsNot(result['args'][0], self.skill.received[0][0])
+
+    def test_error(self):
+        api = SkillApi.get('echo_skill')
+        self.assertIsNone(api.fail())
+        with self.assertRaises(TypeError):
+            api.echo(object())
+
+    def test_unregistered(self):
+        api = SkillApi.get('echo_skill')
+        SkillApi.unregister_local('echo_skill')
+        SkillApi.bus.wait_for_response.return_value = Message(
+            '', data={'result': 'over the bus'})
+        self.assertEqual(api.echo(), 'over the bus')
+        self.assertIsNone(SkillApi.local_methods.get('echo_skill.echo'))
@@ -0,0 +1,99 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from mycroft.skills.skill_data import ResourceIndex, VocabularyMatcher
+
+
+class TestVocabularyMatcher(TestCase):
+    def test_match_words(self):
+        matcher = VocabularyMatcher(['turn off', 'switch off', 'yes'])
+        self.assertTrue(matcher.match('please turn off the lights'))
+        self.assertTrue(matcher.match('yes'))
+        self.assertFalse(matcher.match('return office'))
+        self.assertFalse(matcher.match('yesterday'))
+        self.assertFalse(matcher.match('switch'))
+
+    def test_exact(self):
+        matcher = VocabularyMatcher(['yes ', 'sure'])
+        self.assertTrue(matcher.match('yes', exact=True))
+        self.assertFalse(matcher.match('yes please', exact=True))
+
+    def test_regex_phrases(self):
+        matcher = VocabularyMatcher(['colou?r', 'a|b'])
+        self.assertTrue(matcher.match('what color is it'))
+        self.assertTrue(matcher.match('choose b'))
+        self.assertFalse(matcher.match('choose c'))
+
+    def test_top_level_alternation(self):
+        """Every alternative of a phrase is matched as complete words."""
+        matcher = VocabularyMatcher(['turn off|switch off', 'yes'])
+        self.assertTrue(matcher.match('switch off the lights'))
+        self.assertTrue(matcher.match('turn off the lights'))
+        self.assertFalse(matcher.match('return office'))
+        self.assertFalse(matcher.match('switch offset'))
+
+    def test_empty(self):
+        matcher = VocabularyMatcher([])
+        self.assertFalse(matcher.match('anything'))
+        self.assertFalse(matcher.match('anything', exact=True))
+
+
+class TestResourceIndex(TestCase):
+    def setUp(self):
+        self.root = Path(mkdtemp())
+        self.addCleanup(rmtree, str(self.root))
+        for path in ('dialog/en-us/hello.dialog', 'dialog/shared.dialog',
+                     'locale/en-us/vocab/Hello.voc',
+                     'locale/de-de/hello.dialog', 'ui/pages/page.qml'):
+            self.root.joinpath(path).parent.mkdir(parents=True,
+                                                  exist_ok=True)
+            self.root.joinpath(path).touch()
+        self.index = ResourceIndex(str(self.root))
+
+    def test_old_layout(self):
+        self.assertEqual(self.index.find('hello.dialog', 'en-us', 'dialog'),
+                         str(self.root.joinpath('dialog/en-us/hello.dialog')))
+        self.assertEqual(self.index.find('shared.dialog', 'en-us', 'dialog'),
+                         str(self.root.joinpath('dialog/shared.dialog')))
+
+    def test_locale_layout(self):
+        self.assertEqual(self.index.find('Hello.voc', 'en-us', 'vocab'),
+                         str(self.root.joinpath(
+                             'locale/en-us/vocab/Hello.voc')))
+        self.assertEqual(self.index.find('hello.dialog', 'de-de', 'dialog'),
+                         str(self.root.joinpath(
+                             'locale/de-de/hello.dialog')))
+
+    def test_nested_name(self):
+        self.assertEqual(self.index.find('pages/page.qml', 'en-us', 'ui'),
+                         str(self.root.joinpath('ui/pages/page.qml')))
+
+    def test_missing(self):
+        self.assertIsNone(self.index.find('missing.dialog', 'en-us',
+                                          'dialog'))
+        self.assertIsNone(self.index.find('hello.dialog', 'fr-fr'))
+
+    def test_indexed_once(self):
+        self.index.find('missing.dialog', 'en-us', 'dialog')
+        # Files added after indexing aren't picked up
+        self.root.joinpath('dialog/en-us/missing.dialog').touch()
+        self.assertIsNone(self.index.find('missing.dialog', 'en-us',
+                                          'dialog'))
+        self.assertIsNotNone(ResourceIndex(str(self.root)).find(
+            'missing.dialog', 'en-us', 'dialog'))
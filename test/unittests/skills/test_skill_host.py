@@ -0,0 +1,177 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from time import monotonic, sleep
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from mycroft.messagebus import Message
+from mycroft.skills.skill_host import SkillHost, SkillHostPool
+
+from ..mocks import MessageBusMock
+
+
+def _idle_host(host_id, skill_directories):
+    """Stand-in for a skill host running until terminated."""
+    while True:
+        sleep(1)
+
+
+def _failing_host(host_id, skill_directories):
+    """Stand-in for a skill host crashing on start."""
+    raise SystemExit(1)
+
+
+class IdleHostPool(SkillHostPool):
+    target = staticmethod(_idle_host)
+
+
+class FailingHostPool(SkillHostPool):
+    target = staticmethod(_failing_host)
+
+
+@patch('mycroft.skills.skill_host.SkillLoader')
+class TestSkillHost(TestCase):
+    def setUp(self):
+        self.bus = MessageBusMock()
+
+    def _create_host(self, loader_mock):
+        def create_loader(bus, skill_dir):
+            loader = Mock(skill_id=skill_dir.split('/')[-1], loaded=True)
+            loader.instance.converse = lambda message: True
+            return loader
+        loader_mock.side_effect = create_loader
+        return SkillHost(self.bus, 1, ['/skills/skill-a', '/skills/skill-b'])
+
+    def test_handlers(self, loader_mock):
+        host = self._create_host(loader_mock)
+        self.assertEqual(sorted(host.skill_loaders), ['skill-a', 'skill-b'])
+        self.assertEqual(self.bus.event_handlers,
+                         ['skill.converse.request', 'skillmanager.deactivate',
+                          'skillmanager.keep', 'skillmanager.activate',
+                          'skillmanager.host.reload'])
+
+    def test_converse(self, loader_mock):
+        host = self._create_host(loader_mock)
+        host.handle_converse_request(
+            Message('skill.converse.request',
+                    {'skill_id': 'skill-a', 'utterances': ['hello'],
+                     'lang': 'en-us'}))
+        self.assertEqual(self.bus.message_types, ['skill.converse.response'])
+        self.assertEqual(self.bus.message_data,
+                         [{'skill_id': 'skill-a', 'result': True}])
+
+    def test_converse_other_process(self, loader_mock):
+        host = self._create_host(loader_mock)
+        host.handle_converse_request(
+            Message('skill.converse.request', {'skill_id': 'skill-c'}))
+        self.assertEqual(self.bus.message_types, [])
+
+    def test_deactivate_except(self, loader_mock):
+        host = self._create_host(loader_mock)
+        host.deactivate_except(Message('skillmanager.keep',
+                                       {'skill': 'skill-a'}))
+        host.skill_loaders['skill-a'].deactivate.assert_not_called()
+        host.skill_loaders['skill-b'].deactivate.assert_called_once_with()
+
+    def test_reload_modified(self, loader_mock):
+        host = self._create_host(loader_mock)
+        host.skill_loaders['skill-a'].reload_needed.return_value = True
+        host.skill_loaders['skill-b'].reload_needed.return_value = False
+        host.reload_modified()
+        host.skill_loaders['skill-a'].reload.assert_called_once_with()
+        host.skill_loaders['skill-b'].reload.assert_not_called()
+
+    def test_handle_reload(self, loader_mock):
+        host = self._create_host(loader_mock)
+        for loader in host.skill_loaders.values():
+            loader.reload_needed.return_value = True
+        host.handle_reload(Message('skillmanager.host.reload',
+                                   {'host': 2, 'skills': ['skill-a']}))
+        host.skill_loaders['skill-a'].reload.assert_not_called()
+        host.handle_reload(Message('skillmanager.host.reload',
+                                   {'host': 1, 'skills': ['skill-a']}))
+        host.skill_loaders['skill-a'].reload.assert_called_once_with()
+        host.skill_loaders['skill-b'].reload.assert_not_called()
+
+
+def _wait_for_exit(process):
+    end = monotonic() + 10
+    while process.exitcode is None and monotonic() < end:
+        sleep(0.05)
+
+
+class TestSkillHostPool(TestCase):
+    def test_start_stop(self):
+        pool = IdleHostPool(preload=[])
+        self.addCleanup(pool.stop)
+        pool.start_host(1, ['/skills/skill-a'])
+        status = pool.status()
+        self.assertEqual(len(status), 1)
+        self.assertEqual(status[0]['host'], 1)
+        self.assertTrue(status[0]['alive'])
+        self.assertEqual(status[0]['skills'], ['skill-a'])
+        self.assertGreater(status[0]['memory'], 0)
+
+        process = pool.hosts[1].process
+        pool.restart_host(1)
+        self.assertFalse(process.is_alive())
+        self.assertEqual(pool.status()[0]['restarts'], 1)
+
+        pool.stop()
+        self.assertEqual(pool.status(), [])
+
+    def test_restart_crashed(self):
+        pool = FailingHostPool(preload=[])
+        self.addCleanup(pool.stop)
+        pool.start_host(2, ['/skills/skill-a'])
+        process = pool.hosts[2].process
+        _wait_for_exit(process)
+        with patch('mycroft.skills.skill_host.RESTART_DELAY', 0):
+            pool.check()  # Schedules the restart
+            pool.check()
+        self.assertIsNot(pool.hosts[2].process, process)
+        self.assertEqual(pool.hosts[2].restarts, 1)
+
+    @patch('mycroft.skills.skill_host.MAX_RESTARTS', 2)
+    def test_restart_backoff(self):
+        pool = FailingHostPool(preload=[])
+        self.addCleanup(pool.stop)
+        pool.start_host(2, ['/skills/skill-a'])
+        delays = []
+        for _ in range(2):
+            host = pool.hosts[2]
+            _wait_for_exit(host.process)
+            pool.check()
+            delays.append(host.restart_at - monotonic())
+            host.restart_at = 0  # Skip the wait
+            pool.check()
+        # The delay doubles with every restart
+        self.assertAlmostEqual(delays[0], 1, delta=0.5)
+        self.assertAlmostEqual(delays[1], 2, delta=0.5)
+
+        # Given up after MAX_RESTARTS
+        host = pool.hosts[2]
+        _wait_for_exit(host.process)
+        pool.check()
+        self.assertTrue(host.failed)
+        self.assertIs(pool.hosts[2], host)
+        status = pool.status()[0]
+        self.assertTrue(status['failed'])
+        self.assertEqual(status['restarts'], 2)
+
+        # A requested restart gives the host another chance
+        pool.restart_host(2)
+        self.assertFalse(pool.hosts[2].failed)
+        self.assertEqual(pool.hosts[2].restarts, 0)
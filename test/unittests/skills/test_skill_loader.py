@@ -16,7 +16,10 @@
 from time import time
 from unittest.mock import call, MagicMock, Mock, patch
 
-from mycroft.skills.skill_loader import _get_last_modified_time, SkillLoader
+from mycroft.messagebus import Message
+from mycroft.skills.skill_loader import (
+    _get_last_modified_time, SkillLoader, SkillLoadProfile
+)
 from ..base import MycroftUnitTestBase
 
 ONE_MINUTE = 60
@@ -35,7 +38,7 @@ class TestSkillLoader(MycroftUnitTestBase):
         self._mock_skill_instance()
         # TODO: un-mock these when they are more testable
         self.loader._load_skill_source = Mock(
-            return_value=Mock()
+            return_value=MagicMock()
         )
         self.loader._check_for_first_run = Mock()
 
@@ -133,6 +136,25 @@ class TestSkillLoader(MycroftUnitTestBase):
         ]
         self.assertListEqual(log_messages, self.log_mock.method_calls)
 
+    def test_skill_load_profile(self):
+        skill = MagicMock()
+        skill.intent_service.registered_intents = [('a', None), ('b', None)]
+        skill.intent_service.vocab_count = 5
+        self.loader._load_skill_source.return_value.create_skill = Mock(
+            return_value=skill)
+        with patch(self.mock_package + 'SettingsMetaUploader'):
+            self.loader.load()
+
+        profile = self.loader.load_profile.serialize()
+        self.assertEqual(profile['intents'], 2)
+        self.assertEqual(profile['vocab'], 5)
+        self.assertEqual(set(profile),
+                         set(SkillLoadProfile.STEPS) |
+                         {'total', 'intents', 'vocab'})
+        self.assertAlmostEqual(
+            profile['total'],
+            sum(profile[step] for step in SkillLoadProfile.STEPS))
+
     def test_skill_load_blacklisted(self):
         """Skill should not be loaded if it is blacklisted"""
         self.loader.config['skills']['blacklisted_skills'] = ['test_skill']
@@ -153,3 +175,177 @@ class TestSkillLoader(MycroftUnitTestBase):
             call.error('Skill test_skill failed to load')
         ]
         self.assertListEqual(log_messages, self.log_mock.method_calls)
+
+
+class FakeBus:
+    """Bus dispatching emitted messages to the registered handlers."""
+    def __init__(self):
+        self.handlers = {}
+        self.emitted = []
+
+    def emit(self, message):
+        self.emitted.append(message)
+        for handler in list(self.handlers.get(message.msg_type, [])):
+            handler(message)
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def remove(self, event, handler):
+        self.handlers[event].remove(handler)
+
+    def types(self):
+        return [m.msg_type for m in self.emitted]
+
+
+class FakeSkill:
+    """Skill registering an intent and a handler for it."""
+    name = 'TestSkill'
+    reload_skill = True
+
+    def __init__(self):
+        self.handled = []
+        self.settings = {}
+        self.intent_service = Mock(registered_intents=[], vocab_count=0)
+
+    def set_handler_executor(self, executor):
+        pass
+
+    def bind(self, bus):
+        self._bus = bus
+
+    def load_data_files(self):
+        pass
+
+    def _register_decorated(self):
+        pass
+
+    def register_resting_screen(self):
+        pass
+
+    def initialize(self):
+        self._bus.emit(Message('register_intent',
+                               {'name': 'test_skill:HelloIntent'}))
+        self._bus.on('test_skill:HelloIntent', self.handled.append)
+
+    def default_shutdown(self):
+        pass
+
+
+class TestLazySkillLoader(MycroftUnitTestBase):
+    mock_package = 'mycroft.skills.skill_loader.'
+
+    def setUp(self):
+        super().setUp()
+        manifest_dir_patch = patch(
+            'mycroft.skills.skill_manifest.MANIFEST_DIR',
+            self.temp_dir.joinpath('manifests'))
+        manifest_dir_patch.start()
+        self.addCleanup(manifest_dir_patch.stop)
+        self.skill_directory = self.temp_dir.joinpath('test_skill')
+        self.skill_directory.mkdir()
+        self.skill_directory.joinpath('__init__.py').write_text('# skill')
+        self.bus = FakeBus()
+        self.skills = []
+
+    def _create_loader(self):
+        def create_skill():
+            self.skills.append(FakeSkill())
+            return self.skills[-1]
+
+        loader = SkillLoader(self.bus, str(self.skill_directory))
+        loader.config['skills']['lazy_loading'] = True
+        loader._load_skill_source = Mock(
+            return_value=Mock(create_skill=create_skill))
+        loader._check_for_first_run = Mock()
+        return loader
+
+    def _record_manifest(self):
+        with patch(self.mock_package + 'SettingsMetaUploader'):
+            self.assertTrue(self._create_loader().load())
+        self.bus.emitted = []
+        self.bus.handlers = {}
+
+    def test_no_manifest(self):
+        loader = self._create_loader()
+        self.assertFalse(loader.load_lazily())
+        self.assertFalse(loader.lazy)
+
+    def test_load_lazily(self):
+        self._record_manifest()
+        loader = self._create_loader()
+        self.assertTrue(loader.load_lazily())
+        self.assertTrue(loader.lazy)
+        self.assertFalse(loader.loaded)
+        loader._load_skill_source.assert_not_called()
+        self.assertEqual(self.bus.types(),
+                         ['register_intent', 'mycroft.skills.loaded'])
+        self.assertTrue(self.bus.emitted[-1].data['lazy'])
+
+    def test_activate_on_intent(self):
+        self._record_manifest()
+        loader = self._create_loader()
+        loader.load_lazily()
+        self.bus.emitted = []
+        other_listener = Mock()
+        self.bus.on('test_skill:HelloIntent', other_listener)
+        with patch(self.mock_package + 'SettingsMetaUploader'):
+            self.bus.emit(Message('test_skill:HelloIntent', {'x': 1}))
+
+        self.assertTrue(loader.loaded)
+        self.assertFalse(loader.lazy)
+        # The registration made from the manifest isn't repeated
+        self.assertNotIn('register_intent', self.bus.types())
+        # and the trigger isn't broadcast again
+        self.assertEqual(self.bus.types().count('test_skill:HelloIntent'), 1)
+        other_listener.assert_called_once()
+        # The triggering message reached the skill once
+        skill = self.skills[-1]
+        self.assertEqual([m.data for m in skill.handled], [{'x': 1}])
+        self.bus.emit(Message('test_skill:HelloIntent', {'x': 2}))
+        self.assertEqual(len(skill.handled), 2)
+
+    def test_settings_changed(self):
+        self._record_manifest()
+        loader = self._create_loader()
+        loader.load_lazily()
+        self.bus.emit(Message('mycroft.skills.settings.changed',
+                              {'@|other_skill': {}}))
+        self.bus.emit(Message('mycroft.skills.settings.changed',
+                              {'@|test_skill-extra': {},
+                               'my_test_skill|21.02': {}}))
+        self.assertTrue(loader.lazy)
+        with patch(self.mock_package + 'SettingsMetaUploader'):
+            self.bus.emit(Message('mycroft.skills.settings.changed',
+                                  {'@|test_skill': {}}))
+        self.assertTrue(loader.loaded)
+
+    def test_settings_changed_gid_with_branch(self):
+        self._record_manifest()
+        loader = self._create_loader()
+        loader.load_lazily()
+        with patch(self.mock_package + 'SettingsMetaUploader'):
+            self.bus.emit(Message('mycroft.skills.settings.changed',
+                                  {'test_skill|21.02': {}}))
+        self.assertTrue(loader.loaded)
+
+    def test_recorder_unwrapped(self):
+        loader = self._create_loader()
+        with patch(self.mock_package + 'SettingsMetaUploader'):
+            self.assertTrue(loader.load())
+        self.assertIs(self.skills[-1]._bus, self.bus)
+        self.assertIsNone(loader._recorder)
+
+    def test_modified_skill(self):
+        self._record_manifest()
+        self.skill_directory.joinpath('__init__.py').write_text('# changed')
+        self.assertFalse(self._create_loader().load_lazily())
+
+    def test_unload_lazy(self):
+        self._record_manifest()
+        loader = self._create_loader()
+        loader.load_lazily()
+        loader.unload()
+        self.assertFalse(loader.lazy)
+        self.assertEqual(self.bus.types()[-1], 'detach_skill')
+        self.assertEqual(self.bus.handlers['test_skill:HelloIntent'], [])
@@ -13,11 +13,15 @@
 # limitations under the License.
 #
 from os import path
+from time import sleep
 from unittest import TestCase
 from unittest.mock import Mock, patch
 
-from mycroft.skills.skill_loader import SkillLoader
-from mycroft.skills.skill_manager import SkillManager, UploadQueue
+from mycroft.messagebus import Message
+from mycroft.skills.skill_loader import SkillLoader, SkillLoadProfile
+from mycroft.skills.skill_manager import (
+    DeferredBus, SkillManager, UploadQueue
+)
 from ..base import MycroftUnitTestBase
 from ..mocks import mock_msm
 
@@ -59,6 +63,52 @@ class TestUploadQueue(TestCase):
             l.instance.settings_meta.upload.assert_called_once_with()
 
 
+class TestDeferredBus(TestCase):
+    def test_release(self):
+        bus = Mock()
+        deferred = DeferredBus(bus)
+        first = Message('register_intent', {'name': 'first'})
+        deferred.emit(first)
+        deferred.on('event', 'handler')
+        bus.emit.assert_not_called()
+        bus.on.assert_called_once_with('event', 'handler')
+
+        deferred.release()
+        bus.emit.assert_called_once_with(first)
+        second = Message('register_intent', {'name': 'second'})
+        deferred.emit(second)
+        bus.emit.assert_called_with(second)
+
+    def test_requests_pass_through(self):
+        """Messages expecting an answer aren't held back during load."""
+        bus = Mock()
+        deferred = DeferredBus(bus)
+        deferred.emit(Message('register_vocab', {}))
+        request = Message('skill.api.method', {})
+        deferred.emit(request)
+        bus.emit.assert_called_once_with(request)
+
+
+def _fake_loader_class(load_times):
+    """Create a SkillLoader replacement emitting a message when loaded."""
+    class FakeLoader:
+        def __init__(self, bus, skill_directory):
+            self.bus = bus
+            self.skill_directory = skill_directory
+            self.skill_id = path.basename(skill_directory)
+            self.load_profile = None
+
+        def load_lazily(self):
+            return False
+
+        def load(self):
+            sleep(load_times.get(self.skill_id, 0))
+            self.bus.emit(Message('register_intent',
+                                  data={'id': self.skill_id}))
+            return True
+    return FakeLoader
+
+
 class TestSkillManager(MycroftUnitTestBase):
     mock_package = 'mycroft.skills.skill_manager.'
     use_msm_mock = True
@@ -119,6 +169,11 @@ class TestSkillManager(MycroftUnitTestBase):
             'skillmanager.deactivate',
             'skillmanager.keep',
             'skillmanager.activate',
+            'skillmanager.load.report',
+            'skillmanager.handlers.metrics',
+            'skillmanager.hosts',
+            'skillmanager.host.restart',
+            'skillmanager.host.loaded',
             'mycroft.paired',
             'mycroft.skills.settings.update'
         ]
@@ -224,6 +279,42 @@ class TestSkillManager(MycroftUnitTestBase):
         skill_data = message_data['test_skill']
         self.assertDictEqual(dict(active=True, id='test_skill'), skill_data)
 
+    def test_send_load_report(self):
+        fast_loader = Mock(skill_id='fast_skill', loaded=True)
+        fast_loader.load_profile = SkillLoadProfile()
+        fast_loader.load_profile.times['import'] = 0.1
+        self.skill_loader_mock.loaded = True
+        self.skill_loader_mock.load_profile = SkillLoadProfile()
+        self.skill_loader_mock.load_profile.times['initialize'] = 0.5
+        self.skill_loader_mock.load_profile.intents = 3
+        self.skill_manager.skill_loaders['fast_skill'] = fast_loader
+        self.skill_manager.skill_loaders['lazy_skill'] = Mock(
+            load_profile=None)
+
+        self.skill_manager.send_load_report(
+            Message('skillmanager.load.report'))
+        self.assertListEqual(['skillmanager.load.report.response'],
+                             self.message_bus_mock.message_types)
+        report = self.message_bus_mock.message_data[0]['skills']
+        self.assertEqual([entry['id'] for entry in report],
+                         ['test_skill', 'fast_skill'])
+        self.assertEqual(report[0]['initialize'], 0.5)
+        self.assertEqual(report[0]['total'], 0.5)
+        self.assertEqual(report[0]['intents'], 3)
+
+    def test_send_handler_metrics(self):
+        metrics = {'normal': {'queue_depth': 2}, 'priority': {}}
+        self.skill_loader_mock.instance.handler_executor.metrics.return_value \
+            = metrics
+        self.skill_manager.skill_loaders['lazy_skill'] = Mock(instance=None)
+
+        self.skill_manager.send_handler_metrics(
+            Message('skillmanager.handlers.metrics'))
+        self.assertListEqual(['skillmanager.handlers.metrics.response'],
+                             self.message_bus_mock.message_types)
+        self.assertEqual(self.message_bus_mock.message_data[0],
+                         {'skills': {'test_skill': metrics}})
+
     def test_stop(self):
         self.skill_manager.stop()
 
@@ -341,6 +432,8 @@ class TestSkillManager(MycroftUnitTestBase):
         patch_obj = self.mock_package + 'SkillLoader'
         self.skill_manager.skill_loaders = {}
         with patch(patch_obj, spec=True) as loader_mock:
+            loader_mock.return_value.load_lazily.return_value = False
+            loader_mock.return_value.load_profile = None
             self.skill_manager._load_on_startup()
             loader_mock.return_value.load.assert_called_once_with()
             self.assertEqual(
@@ -352,6 +445,66 @@ class TestSkillManager(MycroftUnitTestBase):
             self.message_bus_mock.message_types
         )
 
+    def test_load_on_startup_lazy(self):
+        self.skill_dir.mkdir(parents=True)
+        self.skill_dir.joinpath('__init__.py').touch()
+        patch_obj = self.mock_package + 'SkillLoader'
+        self.skill_manager.skill_loaders = {}
+        with patch(patch_obj, spec=True) as loader_mock:
+            loader_mock.return_value.load_lazily.return_value = True
+            loader_mock.return_value.load_profile = None
+            self.skill_manager._load_on_startup()
+            loader_mock.return_value.load.assert_not_called()
+        # Settings meta is uploaded once the skill is actually loaded
+        self.assertEqual(len(self.skill_manager.upload_queue), 0)
+
+    def test_load_on_startup_hosted(self):
+        self.skill_dir.mkdir(parents=True)
+        self.skill_dir.joinpath('__init__.py').touch()
+        self.skill_manager.config['skills']['hosts'] = {
+            'count': 2, 'placement': {'test_skill': 2}}
+        self.skill_manager.skill_loaders = {}
+        with patch(self.mock_package + 'SkillHostPool') as pool_mock:
+            def host_loaded(host_id, skill_dirs):
+                self.assertNotIn('mycroft.skills.initialized',
+                                 self.message_bus_mock.message_types)
+                self.skill_manager._handle_host_loaded(
+                    Message('skillmanager.host.loaded', {'host': host_id}))
+            pool_mock.return_value.start_host.side_effect = host_loaded
+            self.skill_manager._load_on_startup()
+        pool_mock.return_value.start_host.assert_called_once_with(
+            2, [str(self.skill_dir)])
+        self.assertEqual(self.skill_manager.skill_loaders, {})
+        # Initialized once the host has loaded its skills
+        self.assertIn('mycroft.skills.initialized',
+                      self.message_bus_mock.message_types)
+
+        # Modified hosted skills are reloaded by their host
+        self.skill_manager._reload_modified_skills([str(self.skill_dir)])
+        self.assertEqual(self.message_bus_mock.message_types[-1],
+                         'skillmanager.host.reload')
+        self.assertEqual(self.message_bus_mock.message_data[-1],
+                         {'host': 2, 'skills': ['test_skill']})
+
+        # The skill host handles converse for its skills
+        message = Message('skill.converse.request',
+                          dict(skill_id='test_skill', utterances=['hey you'],
+                               lang='en-US'))
+        self.skill_manager.handle_converse_request(message)
+        self.assertNotIn('skill.converse.response',
+                         self.message_bus_mock.message_types)
+
+        # Removing the skill stops the host without skills
+        self.skill_manager._unload_removed_skills([])
+        pool_mock.return_value.stop_host.assert_called_once_with(2)
+
+    def test_host_placement(self):
+        self.skill_manager.config['skills']['hosts'] = {
+            'count': 2, 'placement': {'a': 1, 'b': 3}}
+        self.assertEqual(self.skill_manager._host_for('/skills/a'), 1)
+        self.assertIsNone(self.skill_manager._host_for('/skills/b'))
+        self.assertIsNone(self.skill_manager._host_for('/skills/c'))
+
     def test_load_newly_installed_skill(self):
         self.skill_dir.mkdir(parents=True)
         self.skill_dir.joinpath('__init__.py').touch()
@@ -383,3 +536,74 @@ class TestSkillManager(MycroftUnitTestBase):
         self.skill_manager.skill_updater = updater_mock
         self.skill_manager._update_skills()
         updater_mock.update_skills.assert_called_once_with()
+
+    def _create_skill_dirs(self, names):
+        for name in names:
+            skill_dir = self.temp_dir.joinpath(name)
+            skill_dir.mkdir(parents=True)
+            skill_dir.joinpath('__init__.py').touch()
+        self.skill_manager.skill_loaders = {}
+
+    def test_parallel_load_order(self):
+        self._create_skill_dirs(['alpha', 'beta', 'foobar', 'gamma'])
+        # Later skills finish loading first
+        load_times = {'alpha': 0.2, 'beta': 0.1, 'foobar': 0.15}
+        loader_class = _fake_loader_class(load_times)
+        with patch(self.mock_package + 'SkillLoader', loader_class):
+            self.skill_manager._load_on_startup()
+
+        # Priority skill first, then sorted, regardless of load time
+        registered = [data['id'] for data in
+                      self.message_bus_mock.message_data[:-1]]
+        self.assertEqual(registered, ['foobar', 'alpha', 'beta', 'gamma'])
+        self.assertEqual(self.message_bus_mock.message_types[-1],
+                         'mycroft.skills.initialized')
+        self.assertEqual(len(self.skill_manager.skill_loaders), 4)
+        self.assertEqual(len(self.skill_manager.upload_queue), 4)
+
+    def test_load_timeout(self):
+        self._create_skill_dirs(['alpha', 'beta'])
+        self.skill_manager.config['skills']['load_timeout'] = 0.1
+        loader_class = _fake_loader_class({'alpha': 0.5})
+        with patch(self.mock_package + 'SkillLoader', loader_class):
+            self.skill_manager._load_on_startup()
+            # Startup didn't wait for the slow skill
+            self.assertEqual(self.message_bus_mock.message_types,
+                             ['register_intent', 'mycroft.skills.initialized'])
+            self.assertEqual(len(self.skill_manager.upload_queue), 1)
+            sleep(0.6)
+
+        # The slow skill completes in the background
+        self.assertEqual(self.message_bus_mock.message_data[-1],
+                         {'id': 'alpha'})
+        self.assertEqual(len(self.skill_manager.upload_queue), 2)
+
+    def test_scan_with_watcher(self):
+        self._create_skill_dirs(['alpha', 'beta'])
+        alpha = str(self.temp_dir.joinpath('alpha'))
+        beta = str(self.temp_dir.joinpath('beta'))
+        loaders = {alpha: Mock(spec=SkillLoader), beta: Mock(spec=SkillLoader)}
+        self.skill_manager.skill_loaders = dict(loaders)
+        watcher = Mock(failed=False)
+        self.skill_manager._watcher = watcher
+
+        watcher.collect.return_value = (True, [alpha])
+        with patch.object(self.skill_manager, '_get_skill_directories',
+                          wraps=self.skill_manager._get_skill_directories
+                          ) as get_skill_dirs:
+            self.skill_manager._scan_skills()
+            # Only the modified skill is checked for reload
+            loaders[alpha].reload_needed.assert_called_once_with()
+            loaders[beta].reload_needed.assert_not_called()
+
+            # Without changes no directory scan is done
+            watcher.collect.return_value = (False, [])
+            self.skill_manager._scan_skills()
+            self.assertEqual(get_skill_dirs.call_count, 1)
+
+    def test_scan_watcher_failed(self):
+        watcher = Mock(failed=True)
+        self.skill_manager._watcher = watcher
+        self.skill_manager._scan_skills()
+        watcher.stop.assert_called_once_with()
+        self.assertIsNone(self.skill_manager._watcher)
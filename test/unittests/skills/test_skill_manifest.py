@@ -0,0 +1,120 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+from unittest.mock import patch
+
+from mycroft.messagebus import Message
+from mycroft.skills.skill_manifest import (
+    load_manifest, ManifestRecorder, save_manifest
+)
+
+from ..mocks import MessageBusMock
+
+INTENT = ('register_intent', {'name': 'test_skill:HelloIntent',
+                              'requires': [('HelloKeyword',
+                                            'HelloKeyword')]})
+
+
+class TestManifestRecorder(TestCase):
+    def setUp(self):
+        self.bus = MessageBusMock()
+        self.recorder = ManifestRecorder(self.bus, 'test_skill')
+
+    def test_record(self):
+        self.recorder.emit(Message(*INTENT))
+        self.recorder.on('test_skill:HelloIntent', print)
+        self.recorder.on('mycroft.stop', print)
+        self.assertEqual(self.bus.message_types, ['register_intent'])
+        self.assertEqual(self.bus.event_handlers,
+                         ['test_skill:HelloIntent', 'mycroft.stop'])
+        # Data is recorded as sent over the bus
+        self.assertEqual(self.recorder.messages,
+                         [('register_intent',
+                           {'name': 'test_skill:HelloIntent',
+                            'requires': [['HelloKeyword',
+                                          'HelloKeyword']]})])
+        self.assertEqual(self.recorder.triggers, ['test_skill:HelloIntent'])
+        self.assertTrue(self.recorder.lazy_loadable)
+
+    def test_stop(self):
+        self.recorder.stop()
+        self.recorder.emit(Message(*INTENT))
+        self.recorder.on('test_skill:HelloIntent', print)
+        self.assertEqual(self.bus.message_types, ['register_intent'])
+        self.assertEqual(self.recorder.messages, [])
+        self.assertEqual(self.recorder.triggers, [])
+
+    def test_not_lazy_loadable(self):
+        self.recorder.emit(Message(*INTENT))
+        self.assertTrue(self.recorder.lazy_loadable)
+        # Listening to events not addressed to the skill
+        self.recorder.on('question:query', print)
+        self.assertFalse(self.recorder.lazy_loadable)
+
+        recorder = ManifestRecorder(self.bus, 'test_skill')
+        recorder.emit(Message(*INTENT))
+        recorder.emit(Message('speak', {'utterance': 'hello'}))
+        self.assertFalse(recorder.lazy_loadable)
+
+        # Nothing to trigger the skill
+        recorder = ManifestRecorder(self.bus, 'test_skill')
+        recorder.emit(Message('register_vocab', {'entity_value': 'hello',
+                                                 'entity_type': 'Hello'}))
+        self.assertFalse(recorder.lazy_loadable)
+
+    def test_suppress(self):
+        recorder = ManifestRecorder(self.bus, 'test_skill',
+                                    suppress=[('register_intent',
+                                               {'name': 'test_skill:Other'})])
+        recorder.emit(Message('register_intent',
+                              {'name': 'test_skill:Other'}))
+        recorder.emit(Message(*INTENT))
+        self.assertEqual(self.bus.message_data, [INTENT[1]])
+        self.assertEqual(len(recorder.messages), 2)
+
+
+class TestManifestStorage(TestCase):
+    def setUp(self):
+        self.manifest_dir = Path(mkdtemp())
+        dir_patch = patch('mycroft.skills.skill_manifest.MANIFEST_DIR',
+                          self.manifest_dir)
+        dir_patch.start()
+        self.addCleanup(dir_patch.stop)
+        self.addCleanup(rmtree, str(self.manifest_dir))
+
+    def test_save_load(self):
+        recorder = ManifestRecorder(MessageBusMock(), 'test_skill')
+        recorder.emit(Message(*INTENT))
+        recorder.on('test_skill:HelloIntent', print)
+        save_manifest('test_skill', recorder.create_manifest('abc', 'Test'))
+
+        manifest = load_manifest('test_skill', 'abc')
+        self.assertEqual(manifest['name'], 'Test')
+        self.assertTrue(manifest['lazy'])
+        self.assertEqual(manifest['triggers'], ['test_skill:HelloIntent'])
+        self.assertEqual(manifest['messages'],
+                         [list(m) for m in recorder.messages])
+
+    def test_outdated(self):
+        save_manifest('test_skill', {'hash': 'abc'})
+        self.assertIsNone(load_manifest('test_skill', 'def'))
+
+    def test_missing_or_broken(self):
+        self.assertIsNone(load_manifest('test_skill', 'abc'))
+        self.manifest_dir.joinpath('test_skill.json').write_text('{')
+        self.assertIsNone(load_manifest('test_skill', 'abc'))
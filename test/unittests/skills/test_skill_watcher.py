@@ -0,0 +1,115 @@
+# Copyright 2021 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import monotonic, sleep
+from unittest import TestCase, skipUnless
+
+from mycroft.skills.skill_watcher import (
+    IN_CLOSE_WRITE, IN_Q_OVERFLOW, Inotify, SkillDirectoryWatcher
+)
+
+
+def _inotify_available():
+    try:
+        Inotify().close()
+    except OSError:
+        return False
+    return True
+
+
+@skipUnless(_inotify_available(), 'inotify is not available')
+class TestSkillDirectoryWatcher(TestCase):
+    def setUp(self):
+        self.skills_dir = Path(mkdtemp())
+        self.skill_dir = self.skills_dir.joinpath('test-skill')
+        self.skill_dir.joinpath('vocab').mkdir(parents=True)
+        self.skill_dir.joinpath('__init__.py').touch()
+        self.watcher = SkillDirectoryWatcher(str(self.skills_dir),
+                                             debounce=0.2)
+        self.watcher.start()
+        # Initial state reports the skills as changed
+        sleep(0.25)
+        self.assertEqual(self.watcher.collect(), (True, []))
+
+    def tearDown(self):
+        self.watcher.stop()
+        rmtree(str(self.skills_dir))
+
+    def _collect_settled(self, timeout=3.0):
+        """Collect until changes are reported or timeout."""
+        end = monotonic() + timeout
+        while monotonic() < end:
+            skills_changed, modified = self.watcher.collect()
+            if skills_changed or modified:
+                return skills_changed, modified
+            sleep(0.05)
+        return False, []
+
+    def test_modified_file(self):
+        self.skill_dir.joinpath('vocab', 'Hello.voc').write_text('hello')
+        self.assertEqual(self._collect_settled(),
+                         (False, [str(self.skill_dir)]))
+
+    def test_debounce(self):
+        vocab_file = self.skill_dir.joinpath('vocab', 'Hello.voc')
+        for i in range(5):
+            vocab_file.write_text('hello {}'.format(i))
+            sleep(0.05)
+        # Still within debounce time of the last change
+        self.assertEqual(self.watcher.collect(), (False, []))
+        self.assertEqual(self._collect_settled(),
+                         (False, [str(self.skill_dir)]))
+        self.assertEqual(self.watcher.collect(), (False, []))
+
+    def test_ignored_files(self):
+        self.skill_dir.joinpath('settings.json').write_text('{}')
+        self.skill_dir.joinpath('.hidden').write_text('x')
+        pycache = self.skill_dir.joinpath('__pycache__')
+        pycache.mkdir()
+        pycache.joinpath('x.pyc').write_text('x')
+        self.assertEqual(self._collect_settled(timeout=0.5), (False, []))
+
+    def test_new_skill(self):
+        new_skill = self.skills_dir.joinpath('new-skill')
+        new_skill.mkdir()
+        new_skill.joinpath('__init__.py').touch()
+        skills_changed, _ = self._collect_settled()
+        self.assertTrue(skills_changed)
+
+        # The new skill is watched as well
+        sleep(0.25)
+        self.watcher.collect()
+        new_skill.joinpath('settingsmeta.yaml').write_text('skillMetadata:')
+        self.assertEqual(self._collect_settled(),
+                         (False, [str(new_skill)]))
+
+    def test_new_subdirectory(self):
+        dialog_dir = self.skill_dir.joinpath('dialog')
+        dialog_dir.mkdir()
+        self._collect_settled()
+        dialog_dir.joinpath('hello.dialog').write_text('hello')
+        self.assertEqual(self._collect_settled(),
+                         (False, [str(self.skill_dir)]))
+
+    def test_overflow(self):
+        self.watcher._handle_event(-1, IN_Q_OVERFLOW, '')
+        self.assertEqual(self._collect_settled(),
+                         (True, [str(self.skill_dir)]))
+
+    def test_unknown_watch(self):
+        self.watcher._handle_event(-1, IN_CLOSE_WRITE, 'x.py')
+        self.assertEqual(self._collect_settled(timeout=0.5), (False, []))
@@ -1,10 +1,13 @@
 """Unit tests for the functionality in the TTS cache module."""
 from pathlib import Path
 from tempfile import mkdtemp
+from time import sleep
 from unittest import TestCase
 from unittest.mock import Mock, MagicMock, patch
 
-from mycroft.tts.cache import hash_sentence, TextToSpeechCache
+from mycroft.tts.cache import (
+    CacheMaintenance, config_fingerprint, hash_sentence, TextToSpeechCache
+)
 
 
 def _mock_mimic2_api():
@@ -29,6 +32,20 @@ class TestCache(TestCase):
         sentence_hash = hash_sentence(sentence)
         self.assertEqual("4d6a0c4cf3f07eadd5ba147c67c6896f", sentence_hash)
 
+    def test_config_fingerprint(self):
+        config = dict(voice="ap", url="testurl")
+        self.assertEqual(config_fingerprint(config, 'en-us'),
+                         config_fingerprint(dict(config), 'en-US'))
+        self.assertNotEqual(config_fingerprint(config, 'en-us'),
+                            config_fingerprint(config, 'de-de'))
+        self.assertNotEqual(config_fingerprint(config),
+                            config_fingerprint(dict(config, voice="kal")))
+        # The location of the preloaded cache doesn't change the voice
+        self.assertEqual(
+            config_fingerprint(config),
+            config_fingerprint(dict(config, preloaded_cache="/tmp/x"))
+        )
+
     @patch("mycroft.tts.cache.requests.get")
     def test_persistent_cache(self, requests_mock):
         preloaded_file_path = self._write_preloaded_file()
@@ -95,6 +112,40 @@ class TestCache(TestCase):
         cache_contents = [path for path in self.cache_dir.iterdir()]
         self.assertListEqual([], cache_contents)
 
+    def test_load_temporary_cache(self):
+        voices = {
+            'ap': TextToSpeechCache(tts_config=dict(voice='ap'),
+                                    tts_name="Test", audio_file_type="wav"),
+            'kal': TextToSpeechCache(tts_config=dict(voice='kal'),
+                                     tts_name="Test", audio_file_type="wav")
+        }
+        for voice, tts_cache in voices.items():
+            tts_cache.temporary_cache_dir = self.cache_dir
+            tts_cache.define_audio_file('kermit').save(voice.encode())
+        tts_cache.define_phoneme_file('kermit').save([['pau', 0.1]])
+        legacy_file = self.cache_dir.joinpath('fozzie.wav')
+        legacy_file.write_bytes(b'old voice')
+
+        for voice, tts_cache in voices.items():
+            tts_cache.load_temporary_cache()
+            self.assertIn('kermit', tts_cache)
+            audio_file, _ = tts_cache.cached_sentences['kermit']
+            self.assertEqual(audio_file.path.read_bytes(), voice.encode())
+        self.assertIsNone(voices['ap'].cached_sentences['kermit'][1])
+        self.assertIsNotNone(voices['kal'].cached_sentences['kermit'][1])
+        self.assertFalse(legacy_file.exists())
+
+    def test_statistics_per_voice(self):
+        def create_cache(voice):
+            return TextToSpeechCache(tts_config=dict(voice=voice),
+                                     tts_name="StatsTest",
+                                     audio_file_type="wav")
+        create_cache('ap').statistics.hits += 1
+        create_cache('kal').statistics.misses += 1
+        self.assertEqual(create_cache('ap').statistics.hits, 1)
+        self.assertEqual(create_cache('ap').statistics.misses, 0)
+        self.assertEqual(create_cache('kal').statistics.hit_rate, 0.0)
+
     @patch('mycroft.tts.cache.curate_cache')
     def test_curate_cache(self, curate_mock):
         tts_cache = TextToSpeechCache(
@@ -169,3 +220,138 @@ class TestCacheContains(TestCase):
     def test_hash_exists_and_files_bad(self):
         self.assertFalse('piggy' in self.tts_cache)
         self.assertFalse('gobo' in self.tts_cache)
+
+
+def _fake_codec(cmdline, **_):
+    """Write the input file to the output file of a codec commandline."""
+    source, destination = cmdline[-1], cmdline[-2]
+    with open(source, 'rb') as source_file:
+        data = source_file.read()
+    with open(destination, 'wb') as destination_file:
+        destination_file.write(b'compressed ' + data)
+
+
+@patch('mycroft.tts.cache.subprocess.check_call', side_effect=_fake_codec)
+class TestCacheCompression(TestCase):
+    def setUp(self):
+        self.cache_dir = Path(mkdtemp())
+        self.tts_cache = TextToSpeechCache(
+            tts_config=dict(cache_compression='flac'),
+            tts_name="Test",
+            audio_file_type="wav"
+        )
+        self.tts_cache.temporary_cache_dir = self.cache_dir
+
+    def tearDown(self):
+        for file_path in self.cache_dir.iterdir():
+            file_path.unlink()
+        self.cache_dir.rmdir()
+
+    def _add_sentence(self, sentence_hash):
+        audio_file = self.tts_cache.define_audio_file(sentence_hash)
+        audio_file.save(b'audio')
+        self.tts_cache.cached_sentences[sentence_hash] = (audio_file, None)
+        return audio_file
+
+    def test_unsupported_compression(self, _):
+        tts_cache = TextToSpeechCache(
+            tts_config=dict(cache_compression='zip'),
+            tts_name="Test",
+            audio_file_type="wav"
+        )
+        self.assertIsNone(tts_cache.compression)
+        tts_cache = TextToSpeechCache(
+            tts_config=dict(cache_compression='flac'),
+            tts_name="Test",
+            audio_file_type="mp3"
+        )
+        self.assertIsNone(tts_cache.compression)
+
+    def test_compress_new_entries(self, check_call_mock):
+        original_file = self._add_sentence('kermit')
+        self.tts_cache.compress_new_entries()
+
+        audio_file, _ = self.tts_cache.cached_sentences['kermit']
+        self.assertTrue(audio_file.is_compressed)
+        self.assertEqual(audio_file.path.suffix, '.flac')
+        self.assertEqual(audio_file.path.read_bytes(), b'compressed audio')
+        # The original is kept until the next pass since it may be queued
+        self.assertTrue(original_file.exists())
+        self.tts_cache.compress_new_entries()
+        self.assertFalse(original_file.exists())
+        self.assertEqual(check_call_mock.call_count, 1)
+
+    def test_compression_failure(self, check_call_mock):
+        check_call_mock.side_effect = FileNotFoundError
+        self._add_sentence('kermit')
+        self._add_sentence('gobo')
+        self.tts_cache.compress_new_entries()
+        self.assertEqual(check_call_mock.call_count, 1)
+        for audio_file, _ in self.tts_cache.cached_sentences.values():
+            self.assertFalse(audio_file.is_compressed)
+            self.assertTrue(audio_file.exists())
+
+    def test_load_prefers_compressed(self, _):
+        self._add_sentence('kermit')
+        self.tts_cache.compress_new_entries()
+        self.tts_cache.cached_sentences = {}
+        self.tts_cache.load_temporary_cache()
+
+        audio_file, _ = self.tts_cache.cached_sentences['kermit']
+        self.assertTrue(audio_file.is_compressed)
+        self.assertEqual([path.suffix for path in self.cache_dir.iterdir()],
+                         ['.flac'])
+
+
+class TestCacheMaintenance(TestCase):
+    def _create_cache(self, removed=0, compressed=0):
+        cache = Mock()
+        cache.curate.return_value = removed
+        cache.compress_new_entries.return_value = compressed
+        return cache
+
+    def test_run_once(self):
+        caches = [self._create_cache(removed=2),
+                  self._create_cache(compressed=3)]
+        maintenance = CacheMaintenance(lambda: caches)
+        self.assertTrue(maintenance.run_once())
+        for cache in caches:
+            cache.curate.assert_called_once_with()
+            cache.compress_new_entries.assert_called_once_with()
+        self.assertEqual(maintenance.statistics.runs, 1)
+        self.assertEqual(maintenance.statistics.files_removed, 2)
+        self.assertEqual(maintenance.statistics.files_compressed, 3)
+
+    def test_postponed_while_busy(self):
+        cache = self._create_cache()
+        busy = True
+        maintenance = CacheMaintenance(lambda: [cache],
+                                       is_busy=lambda: busy)
+        self.assertFalse(maintenance.run_once())
+        cache.curate.assert_not_called()
+        self.assertEqual(maintenance.statistics.skipped, 1)
+
+        busy = False
+        self.assertTrue(maintenance.run_once())
+        cache.curate.assert_called_once_with()
+
+    def test_failing_cache(self):
+        failing = self._create_cache()
+        failing.curate.side_effect = OSError
+        working = self._create_cache(removed=1)
+        maintenance = CacheMaintenance(lambda: [failing, working])
+        self.assertTrue(maintenance.run_once())
+        self.assertEqual(maintenance.statistics.files_removed, 1)
+
+    def test_background_thread(self):
+        cache = self._create_cache()
+        maintenance = CacheMaintenance(lambda: [cache], interval=0.01)
+        maintenance.start()
+        try:
+            for _ in range(100):
+                if maintenance.statistics.runs:
+                    break
+                sleep(0.01)
+        finally:
+            maintenance.stop()
+        self.assertGreater(maintenance.statistics.runs, 0)
@@ -0,0 +1,153 @@
+import unittest
+from unittest import mock
+
+from mycroft.tts.chunking import ChunkingPolicy
+from mycroft.tts.cache import hash_sentence
+from mycroft.tts.tts import TTS
+
+
+class TestSplitFirstChunk(unittest.TestCase):
+    def test_short_sentence_kept(self):
+        policy = ChunkingPolicy()
+        self.assertEqual(policy.split_first_chunk('It is 14 degrees.'),
+                         ('It is 14 degrees.', ''))
+
+    def test_split_at_clause(self):
+        policy = ChunkingPolicy(first_chunk_min_words=3,
+                                first_chunk_max_words=8)
+        sentence = ('Today will be mostly sunny, with a high of 21 degrees '
+                    'and a low of 12.')
+        self.assertEqual(policy.split_first_chunk(sentence),
+                         ('Today will be mostly sunny',
+                          'with a high of 21 degrees and a low of 12.'))
+
+    def test_clause_too_short(self):
+        policy = ChunkingPolicy(first_chunk_min_words=3,
+                                first_chunk_max_words=4)
+        sentence = 'Well, here is the weather report for today.'
+        self.assertEqual(policy.split_first_chunk(sentence),
+                         ('Well, here is the', 'weather report for today.'))
+
+    def test_remainder_too_short(self):
+        policy = ChunkingPolicy(first_chunk_min_words=3,
+                                first_chunk_max_words=4)
+        self.assertEqual(policy.split_first_chunk('one two three four five'),
+                         ('one two three four five', ''))
+
+    def test_disabled(self):
+        policy = ChunkingPolicy(first_chunk_max_words=0)
+        sentence = 'one two three four five six seven eight nine ten eleven'
+        self.assertEqual(policy.split_first_chunk(sentence), (sentence, ''))
+
+
+class TestApply(unittest.TestCase):
+    def test_sentences_kept_without_max_chunk_size(self):
+        policy = ChunkingPolicy(first_chunk_min_words=2,
+                                first_chunk_max_words=4)
+        sentences = ['one two, three four five six.', 'Second.', 'Third.']
+        self.assertEqual(policy.apply(sentences),
+                         ['one two', 'three four five six.', 'Second.',
+                          'Third.'])
+
+    def test_chunks_grow(self):
+        policy = ChunkingPolicy(first_chunk_max_words=0, max_chunk_chars=40,
+                                growth=2.0)
+        sentences = ['Short one.', 'Two here.', 'Three.', 'Four is longer.',
+                     'Five.', 'Six is the last one.']
+        chunks = policy.apply(sentences)
+        self.assertEqual(chunks, ['Short one.', 'Two here. Three.',
+                                  'Four is longer. Five.',
+                                  'Six is the last one.'])
+        self.assertTrue(all(len(chunk) <= 40 for chunk in chunks))
+
+    def test_empty(self):
+        self.assertEqual(ChunkingPolicy().apply(['', '  ']), [])
+
+    def test_updated(self):
+        policy = ChunkingPolicy(max_chunk_chars=100)
+        updated = policy.updated({'first_chunk_max_words': 5,
+                                  'unknown': True})
+        self.assertEqual(updated.first_chunk_max_words, 5)
+        self.assertEqual(updated.max_chunk_chars, 100)
+        self.assertEqual(policy.first_chunk_max_words, 0)
+
+    def test_default_keeps_sentences(self):
+        sentences = ['one two three four five six seven eight nine ten '
+                     'eleven twelve.', 'Second.', 'Third.']
+        self.assertEqual(ChunkingPolicy().apply(sentences), sentences)
+
+    def test_kept_sentences(self):
+        policy = ChunkingPolicy(first_chunk_min_words=2,
+                                first_chunk_max_words=4,
+                                max_chunk_chars=200)
+        sentences = ['one two, three four five six.', 'Second.', 'Cached.',
+                     'Third.', 'Fourth.']
+        self.assertEqual(policy.apply(sentences,
+                                      keep=lambda s: s == 'Cached.'),
+                         ['one two', 'three four five six.', 'Second.',
+                          'Cached.', 'Third. Fourth.'])
+        # A kept first sentence isn't split either
+        self.assertEqual(policy.apply(sentences[:2], keep=lambda s: True),
+                         sentences[:2])
+
+
+class MockTTS(TTS):
+    chunking_policy = ChunkingPolicy(first_chunk_min_words=2,
+                                     first_chunk_max_words=4,
+                                     max_chunk_chars=200)
+
+    def __init__(self, lang, config):
+        super().__init__(lang, config, mock.Mock(), 'wav')
+
+    def get_tts(self, sentence, wav_file):
+        return wav_file, None
+
+
+@mock.patch('mycroft.tts.tts.PlaybackThread')
+class TestTTSChunking(unittest.TestCase):
+    def test_preprocess_utterance(self, _):
+        tts = MockTTS('en-US', {})
+        chunks = tts.preprocess_utterance(
+            'Here are the results, three recipes found. The first is '
+            'pancakes. The second is an omelette.')
+        # Chunks grow from the short first chunk
+        self.assertEqual(chunks, ['Here are the results',
+                                  'three recipes found.',
+                                  'The first is pancakes. The second is an '
+                                  'omelette.'])
+
+    def test_config_override(self, _):
+        tts = MockTTS('en-US', {'chunking': {'max_chunk_chars': None}})
+        chunks = tts.preprocess_utterance(
+            'Here are the results, three recipes found. The first is '
+            'pancakes.')
+        self.assertEqual(chunks, ['Here are the results',
+                                  'three recipes found.',
+                                  'The first is pancakes.'])
+
+    def test_preloaded_sentence_is_cache_hit(self, _):
+        tts = MockTTS('en-US', {})
+        tts.get_tts = mock.Mock(side_effect=lambda s, f: (f, None))
+        cached = 'The first is pancakes.'
+        # Put the sentence in the cache as if it was preloaded
+        sentence_hash = hash_sentence(cached)
+        audio_file = tts.cache.define_audio_file(sentence_hash)
+        audio_file.path.parent.mkdir(parents=True, exist_ok=True)
+        audio_file.path.write_bytes(b'RIFF')
+        self.addCleanup(audio_file.path.unlink)
+        tts.cache.cached_sentences[sentence_hash] = (audio_file, None)
+
+        chunks = tts.preprocess_utterance(
+            'Here are the results, three recipes found. The first is '
+            'pancakes. The second is an omelette.')
+        self.assertEqual(chunks, ['Here are the results',
+                                  'three recipes found.',
+                                  'The first is pancakes.',
+                                  'The second is an omelette.'])
+        with mock.patch('mycroft.tts.tts.TTS.queue'), \
+                mock.patch('mycroft.tts.tts.create_signal'):
+            for chunk in chunks:
+                tts.execute(chunk)
+        self.assertNotIn(mock.call(cached, mock.ANY),
+                         tts.get_tts.call_args_list)
+        self.assertEqual(tts.get_tts.call_count, 3)
@@ -0,0 +1,44 @@
+import unittest
+from unittest import mock
+
+from mycroft.tts.festival_tts import Festival, FestivalSynthesizer
+
+
+class TestFestivalSynthesizer(unittest.TestCase):
+    @mock.patch('mycroft.tts.festival_tts.os.path.exists', return_value=True)
+    @mock.patch('mycroft.tts.festival_tts.subprocess.Popen')
+    def test_synthesize(self, mock_popen, _):
+        process = mock_popen.return_value
+        process.stdout = iter([b'festival: loading\n',
+                               b'mycroft-festival-done\n'])
+        synthesizer = FestivalSynthesizer({'lang': 'english'})
+        self.assertEqual(mock_popen.call_args[0][0],
+                         ['festival', '--pipe', '--language', 'english'])
+        synthesizer.synthesize('say "hi"', '/tmp/abc.wav')
+        command = process.stdin.write.call_args[0][0].decode()
+        self.assertIn('(Utterance Text "say \\"hi\\"")', command)
+        self.assertIn('"/tmp/abc.wav"', command)
+
+    @mock.patch('mycroft.tts.festival_tts.subprocess.Popen')
+    def test_festival_exited(self, mock_popen):
+        mock_popen.return_value.stdout = iter([])
+        synthesizer = FestivalSynthesizer({'lang': 'english'})
+        with self.assertRaises(RuntimeError):
+            synthesizer.synthesize('hello', '/tmp/abc.wav')
+
+
+@mock.patch('mycroft.tts.tts.PlaybackThread')
+class TestFestival(unittest.TestCase):
+    @mock.patch('mycroft.tts.festival_tts.subprocess')
+    def test_get_tts_text2wave(self, mock_subprocess, _):
+        tts = Festival('en-US', {})
+        wav, phonemes = tts.get_tts('hello', 'abc.wav')
+        self.assertIsNone(phonemes)
+        mock_subprocess.run.assert_called_once_with(
+            ['text2wave', '-o', 'abc.wav'], input=b'hello', check=True)
+
+    def test_get_tts_worker_pool(self, _):
+        tts = Festival('en-US', {})
+        tts.worker_pool = mock.Mock()
+        self.assertEqual(tts.get_tts('hello', 'abc.wav'), ('abc.wav', None))
+        tts.worker_pool.synthesize.assert_called_once_with('hello', 'abc.wav')
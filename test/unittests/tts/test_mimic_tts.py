@@ -1,9 +1,13 @@
+import ctypes.util
+import os
 import stat
+from tempfile import TemporaryDirectory
 
 import unittest
 from unittest import mock
 
-from mycroft.tts.mimic_tts import (Mimic, download_subscriber_voices,
+from mycroft.tts.mimic_tts import (Mimic, MimicLibrarySynthesizer,
+                                   download_subscriber_voices,
                                    get_mimic_binary,
                                    get_subscriber_voices)
 
@@ -30,6 +34,23 @@ class TestMimic(unittest.TestCase):
             m.args + ['-o', 'abc.wav', '-t', 'hello'])
         self.assertEqual(phonemes, [['s', '1'], ['pau', '2']])
 
+    @mock.patch('mycroft.tts.mimic_tts.subprocess')
+    def test_get_tts_worker_pool(self, mock_subprocess, _, mock_device_api):
+        mock_device_api.return_value = device_instance_mock
+        m = Mimic('en-US', {})
+        m.worker_pool = mock.Mock()
+        m.worker_pool.synthesize.return_value = [['s', '1'], ['pau', '2']]
+        wav, phonemes = m.get_tts('hello', 'abc.wav')
+        m.worker_pool.synthesize.assert_called_once_with('hello', 'abc.wav')
+        self.assertFalse(mock_subprocess.check_output.called)
+        self.assertEqual(phonemes, [['s', '1'], ['pau', '2']])
+
+        # SSML is left to the executable
+        mock_subprocess.check_output.return_value = b's:1'
+        m.get_tts('<prosody rate="0.7">hello</prosody>', 'abc.wav')
+        self.assertEqual(m.worker_pool.synthesize.call_count, 1)
+        self.assertTrue(mock_subprocess.check_output.called)
+
     def test_viseme(self, _, mock_device_api):
         mock_device_api.return_value = device_instance_mock
         m = Mimic('en-US', {})
@@ -97,3 +118,21 @@ class TestMimic(unittest.TestCase):
                 st_mock.st_mode = 0
                 make_executable('/test')
                 mock_chmod.assert_called_with('/test', stat.S_IEXEC)
+
+
+@unittest.skipUnless(ctypes.util.find_library('ttsmimic'),
+                     'libttsmimic is not installed')
+class TestMimicLibrarySynthesizer(unittest.TestCase):
+    def test_synthesize(self):
+        synthesizer = MimicLibrarySynthesizer({'voice': 'ap',
+                                               'duration_stretch': 1.2})
+        with TemporaryDirectory() as tmp_dir:
+            wav_file = os.path.join(tmp_dir, 'hello.wav')
+            phonemes = synthesizer.synthesize('hello', wav_file)
+            self.assertTrue(os.path.getsize(wav_file) > 0)
+        names = [name for name, _ in phonemes]
+        self.assertEqual(names[0], 'pau')
+        self.assertIn('l', names)
+        # End times are increasing
+        ends = [float(end) for _, end in phonemes]
+        self.assertEqual(ends, sorted(ends))
@@ -0,0 +1,137 @@
+from queue import Empty
+import time
+import unittest
+from unittest import mock
+
+from mycroft.tts import PlaybackThread
+from mycroft.tts.speech_queue import SpeechPriority, SpeechQueue
+
+
+def _entry(data, priority=None, listen=False):
+    entry = ('wav', data, None, 0, listen)
+    return entry if priority is None else entry + (priority,)
+
+
+class TestSpeechPriority(unittest.TestCase):
+    def test_from_value(self):
+        self.assertEqual(SpeechPriority.from_value(None),
+                         SpeechPriority.NORMAL)
+        self.assertEqual(SpeechPriority.from_value('high'),
+                         SpeechPriority.HIGH)
+        self.assertEqual(SpeechPriority.from_value('LOW'),
+                         SpeechPriority.LOW)
+        self.assertEqual(SpeechPriority.from_value('urgent'),
+                         SpeechPriority.NORMAL)
+        self.assertEqual(SpeechPriority.from_value(90), SpeechPriority.LOW)
+        self.assertEqual(SpeechPriority.from_value(5), SpeechPriority.HIGH)
+        self.assertEqual(SpeechPriority.from_value(['high']),
+                         SpeechPriority.NORMAL)
+        self.assertEqual(SpeechPriority.from_value({'level': 0}),
+                         SpeechPriority.NORMAL)
+
+
+class TestSpeechQueue(unittest.TestCase):
+    def test_order(self):
+        queue = SpeechQueue()
+        queue.put(_entry('news 1', SpeechPriority.LOW))
+        queue.put(_entry('news 2', SpeechPriority.LOW))
+        queue.put(_entry('answer'))
+        queue.put(_entry('alarm', SpeechPriority.HIGH))
+        queue.put(_entry('answer 2', SpeechPriority.NORMAL))
+
+        played = [queue.get()[1] for _ in range(5)]
+        self.assertEqual(played,
+                         ['alarm', 'answer', 'answer 2', 'news 1', 'news 2'])
+        with self.assertRaises(Empty):
+            queue.get(timeout=0)
+
+    def test_put_back(self):
+        queue = SpeechQueue()
+        queue.put(_entry('news 1', SpeechPriority.LOW))
+        queue.put(_entry('news 2', SpeechPriority.LOW))
+        interrupted = queue.get()
+        queue.put(_entry('alarm', SpeechPriority.HIGH))
+        queue.put_back(interrupted)
+
+        played = [queue.get()[1] for _ in range(3)]
+        self.assertEqual(played, ['alarm', 'news 1', 'news 2'])
+
+    def test_on_put(self):
+        queue = SpeechQueue()
+        queue.on_put = mock.Mock()
+        entry = _entry('answer')
+        queue.put(entry)
+        queue.on_put.assert_called_once_with(entry)
+
+
+@mock.patch('mycroft.tts.tts.report_timing')
+@mock.patch('mycroft.tts.tts.play_wav')
+class TestPlaybackPreemption(unittest.TestCase):
+    def setUp(self):
+        self.queue = SpeechQueue()
+        self.playback = PlaybackThread(self.queue)
+        self.bus = mock.Mock()
+        self.playback.set_bus(self.bus)
+        self.played = []
+
+    def tearDown(self):
+        self.playback.stop()
+        self.playback.join()
+
+    def _fake_player(self, durations):
+        """Create a play_wav replacement playing for a given duration.
+
+        durations maps audio to a list of durations of successive plays.
+        """
+        def play_wav(data, environment):
+            self.played.append(data)
+            duration = (durations[data].pop(0) if durations.get(data)
+                        else 0)
+            process = mock.Mock()
+            process.terminated = False
+
+            def wait():
+                end = time.monotonic() + duration
+                while time.monotonic() < end and not process.terminated:
+                    time.sleep(0.01)
+
+            def terminate():
+                process.terminated = True
+            process.wait.side_effect = wait
+            process.terminate.side_effect = terminate
+            return process
+        return play_wav
+
+    def test_high_priority_interrupts(self, play_wav_mock, _):
+        play_wav_mock.side_effect = self._fake_player({'news 1': [5]})
+        self.queue.put(_entry('news 1', SpeechPriority.LOW))
+        self.queue.put(_entry('news 2', SpeechPriority.LOW))
+        self.playback.start()
+        time.sleep(0.2)
+        self.queue.put(_entry('alarm', SpeechPriority.HIGH))
+        time.sleep(0.5)
+        self.assertEqual(self.played,
+                         ['news 1', 'alarm', 'news 1', 'news 2'])
+
+    def test_stale_interrupt_ignored(self, play_wav_mock, _):
+        play_wav_mock.side_effect = self._fake_player({})
+        # Left over from an interruption of audio that already finished
+        self.playback._interrupted = True
+        self.queue.put(_entry('answer'))
+        self.playback.start()
+        time.sleep(0.3)
+        self.assertEqual(self.played, ['answer'])
+
+    def test_normal_priority_waits_for_sentence(self, play_wav_mock, _):
+        play_wav_mock.side_effect = self._fake_player({'news 1': [0.3]})
+        self.queue.put(_entry('news 1', SpeechPriority.LOW))
+        self.queue.put(_entry('news 2', SpeechPriority.LOW))
+        self.playback.start()
+        time.sleep(0.1)
+        self.queue.put(_entry('answer', listen=True))
+        time.sleep(0.6)
+        self.assertEqual(self.played, ['news 1', 'answer', 'news 2'])
+        # Listening is triggered once all speech has been played
+        listen_messages = [c[0][0] for c in self.bus.emit.call_args_list
+                           if c[0][0].msg_type == 'mycroft.mic.listen']
+        self.assertEqual(len(listen_messages), 1)
@@ -6,6 +6,7 @@ import unittest
 from unittest import mock
 
 import mycroft.tts
+from mycroft.tts.speech_queue import SpeechPriority
 
 mock_phoneme = mock.Mock(name='phoneme')
 mock_audio = "/tmp/mock_path"
@@ -94,6 +95,29 @@ class TestPlaybackThread(unittest.TestCase):
             playback.stop()
             playback.join()
 
+    def test_end_audio_skips_cache_maintenance(self):
+        playback = mycroft.tts.PlaybackThread(Queue())
+        mock_tts = mock.Mock()
+        playback.init(mock_tts)
+        playback.end_audio(True)
+        mock_tts.bus.emit.assert_called_with(
+            MsgTypeCheck('mycroft.mic.listen'))
+        # Curation is left to the background maintenance
+        mock_tts.cache.curate.assert_not_called()
+        mock_tts.cache.compress_new_entries.assert_not_called()
+
+    def test_cache_maintenance_waits_for_playback(self):
+        playback = mycroft.tts.PlaybackThread(Queue())
+        mock_tts = mock.Mock()
+        mock_tts.cache.curate.return_value = 0
+        mock_tts.cache.compress_new_entries.return_value = 0
+        playback.init(mock_tts)
+        playback._processing_queue = True
+        self.assertFalse(playback.cache_maintenance.run_once())
+        playback._processing_queue = False
+        self.assertTrue(playback.cache_maintenance.run_once())
+        mock_tts.cache.curate.assert_called_once_with()
+
 
 @mock.patch('mycroft.tts.tts.PlaybackThread')
 class TestTTS(unittest.TestCase):
@@ -109,7 +133,8 @@ class TestTTS(unittest.TestCase):
             tts.execute('Oh no, not again', 42)
         tts.get_tts.assert_called_with(
             'Oh no, not again',
-            '/tmp/dummy/8da7f22aeb16bc3846ad07b644d59359.wav'
+            '/tmp/dummy/{}_8da7f22aeb16bc3846ad07b644d59359.wav'.format(
+                tts.cache.fingerprint)
         )
         mycroft.tts.TTS.queue.put.assert_called_with(
             (
@@ -117,7 +142,8 @@ class TestTTS(unittest.TestCase):
                 mock_audio,
                 mock_viseme,
                 42,
-                False
+                False,
+                SpeechPriority.NORMAL
             )
         )
 
@@ -134,7 +160,8 @@ class TestTTS(unittest.TestCase):
             tts.execute('Oh no, not again', 42)
         tts.get_tts.assert_called_with(
             'Oh no, not again',
-            '/tmp/dummy/8da7f22aeb16bc3846ad07b644d59359.wav'
+            '/tmp/dummy/{}_8da7f22aeb16bc3846ad07b644d59359.wav'.format(
+                tts.cache.fingerprint)
         )
         mycroft.tts.TTS.queue.put.assert_called_with(
             (
@@ -142,7 +169,8 @@ class TestTTS(unittest.TestCase):
                 mock_audio,
                 mock_viseme,
                 42,
-                False
+                False,
+                SpeechPriority.NORMAL
             )
         )
 
@@ -0,0 +1,108 @@
+from io import StringIO
+import json
+import sys
+import unittest
+from unittest import mock
+
+from mycroft.tts.worker_pool import (serve, TTSWorker, TTSWorkerPool,
+                                     WorkerError)
+
+
+# Minimal worker implementing the protocol, "crash" makes it exit and
+# "fail" makes it report an error.
+WORKER_SCRIPT = '''
+import json, sys
+for line in sys.stdin:
+    request = json.loads(line)
+    if request.get('ping'):
+        response = {'pong': True}
+    elif request['sentence'] == 'crash':
+        sys.exit(1)
+    elif request['sentence'] == 'fail':
+        response = {'error': 'failed'}
+    else:
+        response = {'phonemes': request['sentence'].upper()}
+    print(json.dumps(response), flush=True)
+'''
+
+WORKER_COMMAND = [sys.executable, '-c', WORKER_SCRIPT]
+
+
+class TestTTSWorker(unittest.TestCase):
+    def setUp(self):
+        self.worker = TTSWorker(WORKER_COMMAND, timeout=10)
+        self.worker.start()
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def test_synthesize(self):
+        self.assertEqual(self.worker.synthesize('hello', '/tmp/x.wav'),
+                         'HELLO')
+
+    def test_error(self):
+        with self.assertRaises(WorkerError):
+            self.worker.synthesize('fail', '/tmp/x.wav')
+        # Worker remains usable after reporting an error
+        self.assertEqual(self.worker.synthesize('hi', '/tmp/x.wav'), 'HI')
+
+    def test_crash(self):
+        with self.assertRaises(WorkerError):
+            self.worker.synthesize('crash', '/tmp/x.wav')
+        self.worker.restart()
+        self.assertTrue(self.worker.is_alive)
+        self.assertEqual(self.worker.restarts, 1)
+        self.assertEqual(self.worker.synthesize('hi', '/tmp/x.wav'), 'HI')
+
+
+class TestTTSWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = TTSWorkerPool(WORKER_COMMAND, size=2, timeout=10,
+                                  check_interval=3600)
+        self.pool.start()
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_synthesize(self):
+        self.assertEqual(self.pool.synthesize('hello', '/tmp/x.wav'),
+                         'HELLO')
+
+    def test_restart_after_crash(self):
+        with self.assertRaises(WorkerError):
+            self.pool.synthesize('crash', '/tmp/x.wav')
+        self.assertEqual(sum(w.restarts for w in self.pool.workers), 1)
+        self.assertTrue(all(w.is_alive for w in self.pool.workers))
+        self.assertEqual(self.pool.synthesize('hi', '/tmp/x.wav'), 'HI')
+
+    def test_check_health(self):
+        crashed = self.pool.workers[0]
+        crashed.process.kill()
+        crashed.process.wait()
+        self.pool.check_health()
+        self.assertEqual(crashed.restarts, 1)
+        self.assertTrue(crashed.is_alive)
+
+    def test_start_failure(self):
+        pool = TTSWorkerPool(['/nonexistent/worker'])
+        with self.assertRaises(WorkerError):
+            pool.start()
+
+
+class TestServe(unittest.TestCase):
+    def test_serve(self):
+        synthesizer = mock.Mock()
+        synthesizer.synthesize.side_effect = [None, ValueError('bad')]
+        requests = StringIO(
+            '{"ping": true}\n'
+            '{"sentence": "hello", "wav_file": "/tmp/x.wav"}\n'
+            '{"sentence": "bad", "wav_file": "/tmp/x.wav"}\n')
+        responses = StringIO()
+        serve(synthesizer, requests, responses)
+
+        lines = [json.loads(line)
+                 for line in responses.getvalue().splitlines()]
+        self.assertEqual(lines[0], {'pong': True})
+        self.assertEqual(lines[1], {'phonemes': None})
+        self.assertIn('error', lines[2])
+        synthesizer.synthesize.assert_any_call('hello', '/tmp/x.wav')